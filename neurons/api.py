@@ -34,11 +34,16 @@ from storage.shared.utils import get_redis_password
 from storage.shared.subtensor import get_current_block
 from storage.validator.config import config, check_config, add_args
 from storage.validator.state import should_checkpoint
-from storage.validator.encryption import encrypt_data, setup_encryption_wallet
+from storage.validator.encryption import (
+    encrypt_data,
+    setup_encryption_wallet,
+    precompute_wallet_envelope,
+)
 from storage.validator.store import store_broadband
 from storage.validator.retrieve import retrieve_broadband
 from storage.validator.database import retrieve_encryption_payload
 from storage.validator.cid import generate_cid_string
+from storage.validator.crs import CRSPool
 from storage.validator.encryption import decrypt_data_with_private_key
 
 
@@ -132,6 +137,10 @@ class neuron:
         self.encryption_wallet.coldkey  # Unlock the coldkey.
         bt.logging.info(f"loading encryption wallet {self.encryption_wallet}")
 
+        # Derive the envelope key once up front instead of on every store step.
+        bt.logging.debug("deriving encryption wallet envelope key")
+        precompute_wallet_envelope(self.encryption_wallet)
+
         # Init metagraph.
         bt.logging.debug("loading metagraph")
         self.metagraph = bt.metagraph(
@@ -151,6 +160,14 @@ class neuron:
             password=redis_password,
         )
         self.db_semaphore = asyncio.Semaphore()
+        self.statistics_buffer = None
+        # Point encoding each miner last answered with, see `get_point_encoding`
+        self.point_encodings = {}
+        # CRSs for stores, generated ahead of time in a background thread
+        self.crs_pool = CRSPool(
+            depth=self.config.neuron.crs_pool_depth, curve=self.config.neuron.curve
+        )
+        self.crs_pool.start()
 
         # Init Weights.
         bt.logging.debug("loading moving_averaged_scores")
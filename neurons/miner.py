@@ -26,6 +26,7 @@ import base64
 import asyncio
 import threading
 import traceback
+from contextlib import ExitStack
 import bittensor as bt
 from typing import Dict
 from redis import asyncio as aioredis
@@ -39,16 +40,16 @@ from storage.shared.ecc import (
     ECCommitment,
     ecc_point_to_hex,
     hex_to_ecc_point,
+    negotiate_point_encoding,
 )
 
 from storage.shared.utils import (
     b64_encode,
-    chunk_data,
-    safe_key_search,
     get_redis_password,
 )
 
 from storage.shared.checks import check_environment
+from storage.shared.merkle import build_chunk_merkle_tree
 
 from storage.miner import (
     run,
@@ -56,17 +57,25 @@ from storage.miner import (
 
 from storage.miner.utils import (
     compute_subsequent_commitment,
-    save_data_to_filesystem,
-    load_from_filesystem,
-    commit_data_with_seed,
+    load_chunk_from_filesystem,
+    find_blob_path,
+    get_blob_path,
+    SHARED_BLOB_DIRECTORY,
+    load_merkle_tree,
     init_wandb,
     update_storage_stats,
     load_request_log,
     log_request,
-    RateLimiter,
+    is_rate_limited,
     get_purge_ttl_script_path,
 )
 
+from storage.miner.blob import open_blob, padded_chunk_count
+from storage.miner.commitment import CommitmentEngine
+from storage.miner.executor import IOExecutor
+from storage.miner.pack import PackStore, parse_pack_ref
+from storage.miner.usage import StorageUsage
+
 from storage.miner.config import (
     config,
     check_config,
@@ -79,6 +88,10 @@ from storage.miner.database import (
     get_chunk_metadata,
     get_filepath,
     store_or_update_chunk_metadata,
+    store_merkle_leaves,
+    compact_pack_segments,
+    get_packed_copy,
+    purge_expired_chunks,
 )
 
 
@@ -251,11 +264,44 @@ class miner:
         self.requests_per_hour = []
         self.average_requests_per_hour = 0
 
-        # Init the miner's storage usage tracker
+        # Init the miner's storage usage tracker, walking the data directory once
+        self.storage_usage = StorageUsage(self.config.database.directory)
+        self.storage_usage.reconcile(pause=0)
+        self.start_storage_reconcile_timer()
         update_storage_stats(self)
 
-        self.rate_limiters = {}
-        self.request_log = load_request_log(self.config.miner.request_log_path)
+        # The rate limit counts requests in the log, so keep at least one past the limit
+        self.request_log = load_request_log(
+            self.config.miner.request_log_path,
+            max_entries=max(
+                self.config.miner.request_log_max_entries,
+                self.config.miner.max_requests_per_window + 1,
+            ),
+            max_callers=self.config.miner.request_log_max_callers,
+        )
+
+        # Worker pool for challenge commitments
+        self.commitment_engine = CommitmentEngine(self.config.miner.commitment_workers)
+
+        # Bounded thread pool for disk I/O and whole-payload hashing in the axon handlers
+        self.io_executor = IOExecutor(
+            max_workers=self.config.miner.io_workers,
+            fsync=self.config.miner.fsync,
+            fsync_interval=self.config.miner.fsync_interval,
+            usage=self.storage_usage,
+        )
+
+        # Optional append-only pack segments for small blobs
+        self.pack_store = None
+        if self.config.database.pack_max_blob_size > 0:
+            self.pack_store = PackStore(
+                self.config.database.directory, self.config.database.pack_segment_size
+            )
+            self.start_pack_compaction_timer()
+
+        # Optional deletion of data past its ttl
+        if self.config.database.expiry_interval > 0:
+            self.start_expiry_timer()
 
     def start_request_count_timer(self):
         """
@@ -294,13 +340,146 @@ class miner:
         self.request_count = 0
         self.start_request_count_timer()
 
+    def start_pack_compaction_timer(self):
+        """
+        Schedules the next pack compaction pass in a separate thread.
+        """
+        self.pack_compaction_timer = threading.Timer(
+            self.config.database.pack_compaction_interval, self.compact_pack_store
+        )
+        self.pack_compaction_timer.daemon = True
+        self.pack_compaction_timer.start()
+
+    def run_database_job(self, job, *args):
+        """
+        Runs a background database job on its own event loop and Redis connection, so it does
+        not compete with the axon handlers for theirs.
+
+        Args:
+            job (coroutine function): Called with the Redis connection followed by `args`.
+
+        Returns:
+            The job's result.
+        """
+
+        async def run_job():
+            database = aioredis.StrictRedis(
+                **self.database.connection_pool.connection_kwargs
+            )
+            try:
+                return await job(database, *args)
+            finally:
+                await database.close()
+
+        return asyncio.run(run_job())
+
+    def compact_pack_store(self):
+        """
+        Runs one pack compaction pass and schedules the next one.
+        """
+        try:
+            stats = self.run_database_job(
+                compact_pack_segments,
+                self.pack_store,
+                self.config.database.pack_compaction_ratio,
+                None,
+                self.storage_usage,
+            )
+            bt.logging.info(f"Pack compaction finished: {stats}")
+        except Exception as e:
+            bt.logging.error(f"Pack compaction failed: {e}")
+        if not self.should_exit:
+            self.start_pack_compaction_timer()
+
+    def start_storage_reconcile_timer(self):
+        """
+        Schedules the next background recount of the miner's disk usage.
+        """
+        self.storage_reconcile_timer = threading.Timer(
+            self.config.miner.storage_reconcile_interval, self.reconcile_storage_usage
+        )
+        self.storage_reconcile_timer.daemon = True
+        self.storage_reconcile_timer.start()
+
+    def reconcile_storage_usage(self):
+        """
+        Corrects drift in the incrementally tracked disk usage and schedules the next recount.
+        """
+        try:
+            drift = self.storage_usage.reconcile()
+            bt.logging.info(f"Miner storage usage reconciled, drift {drift} bytes")
+        except Exception as e:
+            bt.logging.error(f"Reconciling storage usage failed: {e}")
+        if not self.should_exit:
+            self.start_storage_reconcile_timer()
+
+    def start_expiry_timer(self):
+        """
+        Schedules the next purge of expired data in a separate thread.
+        """
+        self.expiry_timer = threading.Timer(
+            self.config.database.expiry_interval, self.purge_expired
+        )
+        self.expiry_timer.daemon = True
+        self.expiry_timer.start()
+
+    def purge_expired(self):
+        """
+        Releases the data of every hotkey past its ttl and schedules the next purge.
+        """
+        try:
+            released = self.run_database_job(
+                purge_expired_chunks, None, self.storage_usage
+            )
+            bt.logging.info(f"Released {released} expired chunks")
+        except Exception as e:
+            bt.logging.error(f"Purging expired chunks failed: {e}")
+        if not self.should_exit:
+            self.start_expiry_timer()
+
+    async def write_blob(self, data: bytes, data_hash: int) -> str:
+        """
+        Writes the single physical copy of a blob, shared by every hotkey that stores it.
+
+        Small blobs are appended to the pack store when it is enabled. Others go to their
+        content-addressed path, which is only written if no other hotkey stored them already.
+
+        Args:
+            data (bytes): The blob.
+            data_hash (int): The hash of the blob.
+
+        Returns:
+            str: The filepath (or pack reference) to record in the metadata.
+        """
+        if (
+            self.pack_store is not None
+            and len(data) <= self.config.database.pack_max_blob_size
+        ):
+            return await self.io_executor.append(self.pack_store, data)
+
+        filepath = get_blob_path(
+            self.config.database.directory,
+            SHARED_BLOB_DIRECTORY,
+            str(data_hash),
+            self.config.database.directory_fanout,
+        )
+        if await self.io_executor.run(os.path.isfile, filepath):
+            return filepath
+        return await self.io_executor.save(
+            data,
+            self.config.database.directory,
+            SHARED_BLOB_DIRECTORY,
+            str(data_hash),
+            fanout=self.config.database.directory_fanout,
+        )
+
     @property
     async def total_storage(self):
         """
-        Calculates the total size of data stored by the miner.
+        Returns the total size of data stored by the miner.
 
-        This method fetches all data keys from the Redis database and sums up the size of each data object.
-        It provides an estimate of the total amount of data currently held by the miner.
+        The size is tracked incrementally as blobs are written and deleted (see `StorageUsage`),
+        so this does not touch the database or the filesystem.
 
         Returns:
             int: Total size of data (in bytes) stored by the miner.
@@ -309,21 +488,7 @@ class miner:
             >>> miner.total_storage()
             102400  # Example output indicating 102,400 bytes of data stored
         """
-        # Fetch all keys from Redis
-        all_keys = await safe_key_search(self.database, "*")
-
-        # Filter out keys that contain a period (temporary, remove later)
-        filtered_keys = [key for key in all_keys if b"." not in key]
-        total_size = 0
-        for key in filtered_keys:
-            try:
-                key_dict = await self.database.hgetall(key)
-                first_hotkey = list(key_dict)[0]
-                size = int(json.loads(key_dict[first_hotkey]).get("size", 0))
-            except Exception as e:
-                size = 0
-            total_size += size
-        return total_size
+        return self.storage_usage.bytes
 
     def store_blacklist_fn(
         self, synapse: storage.protocol.Store
@@ -361,13 +526,12 @@ class miner:
         elif caller in self.config.blacklist.whitelist_hotkeys:
             return False, f"Hotkey {caller} in whitelist."
 
-        if caller not in self.rate_limiters:
-            self.rate_limiters[caller] = RateLimiter(
-                self.config.miner.max_requests_per_window,
-                self.config.miner.rate_limit_window,
-            )
-
-        if not self.rate_limiters[caller].is_allowed(caller):
+        if is_rate_limited(
+            self.request_log,
+            caller,
+            self.config.miner.max_requests_per_window,
+            self.config.miner.rate_limit_window,
+        ):
             window = self.config.miner.max_requests_per_window
             blocks = self.config.miner.rate_limit_window
             reason = f"Caller {caller} rate limited. Exceeded {window} requests in {blocks} blocks."
@@ -448,13 +612,12 @@ class miner:
         elif caller in self.config.blacklist.whitelist_hotkeys:
             return False, f"Hotkey {caller} in whitelist."
 
-        if caller not in self.rate_limiters:
-            self.rate_limiters[caller] = RateLimiter(
-                self.config.miner.max_requests_per_window,
-                self.config.miner.rate_limit_window,
-            )
-
-        if not self.rate_limiters[caller].is_allowed(caller):
+        if is_rate_limited(
+            self.request_log,
+            caller,
+            self.config.miner.max_requests_per_window,
+            self.config.miner.rate_limit_window,
+        ):
             window = self.config.miner.max_requests_per_window
             blocks = self.config.miner.rate_limit_window
             reason = f"Caller {caller} rate limited. Exceeded {window} requests in {blocks} blocks."
@@ -535,13 +698,12 @@ class miner:
         elif caller in self.config.blacklist.whitelist_hotkeys:
             return False, f"Hotkey {caller} in whitelist."
 
-        if caller not in self.rate_limiters:
-            self.rate_limiters[caller] = RateLimiter(
-                self.config.miner.max_requests_per_window,
-                self.config.miner.rate_limit_window,
-            )
-
-        if not self.rate_limiters[caller].is_allowed(caller):
+        if is_rate_limited(
+            self.request_log,
+            caller,
+            self.config.miner.max_requests_per_window,
+            self.config.miner.rate_limit_window,
+        ):
             window = self.config.miner.max_requests_per_window
             blocks = self.config.miner.rate_limit_window
             reason = f"Caller {caller} rate limited. Exceeded {window} requests in {blocks} blocks."
@@ -619,6 +781,7 @@ class miner:
         """
         bt.logging.info(f"received store request: {synapse.encrypted_data[:24]}")
         self.request_count += 1
+        synapse.point_encoding = negotiate_point_encoding(synapse.point_encoding)
 
         # Decode the data from base64 to raw bytes
         encrypted_byte_data = base64.b64decode(synapse.encrypted_data)
@@ -626,16 +789,19 @@ class miner:
 
         # Store the data with the hash as the key in the filesystem
         bt.logging.trace("entering hash_data()")
-        data_hash = hash_data(encrypted_byte_data)
+        data_hash = await self.io_executor.run(hash_data, encrypted_byte_data)
 
         # If already storing this hash, simply update the validator seeds and return challenge
         bt.logging.trace("checking if data already exists...")
-        
-        if not await self.database.hexists(data_hash, synapse.dendrite.hotkey):
-            # Store the data in the filesystem
-            filepath = save_data_to_filesystem(
-                encrypted_byte_data, self.config.database.directory, synapse.dendrite.hotkey, str(data_hash)
-            )
+
+        new_reference = not await self.database.hexists(
+            data_hash, synapse.dendrite.hotkey
+        )
+        if new_reference:
+            # Share the copy already stored for another hotkey, if any
+            filepath = await get_packed_copy(self.database, data_hash, self.pack_store)
+            if filepath is None:
+                filepath = await self.write_blob(encrypted_byte_data, data_hash)
             bt.logging.trace(f"stored data {data_hash} in filepath: {filepath}")
         else:
             filepath = await get_filepath(self.database, data_hash, synapse.dendrite.hotkey)
@@ -652,6 +818,35 @@ class miner:
             synapse.ttl,
         )
 
+        # The last other hotkey may have released the shared copy before our reference was recorded
+        if (
+            new_reference
+            and parse_pack_ref(filepath) is None
+            and not await self.io_executor.run(os.path.isfile, filepath)
+        ):
+            bt.logging.debug(f"shared copy of {data_hash} was released, rewriting")
+            filepath = await self.io_executor.save(
+                encrypted_byte_data,
+                self.config.database.directory,
+                SHARED_BLOB_DIRECTORY,
+                str(data_hash),
+                fanout=self.config.database.directory_fanout,
+            )
+
+        # Keep the chunk hash tree if the validator opted in to precomputed challenges
+        if synapse.merkle_chunk_size:
+            bt.logging.trace("entering build_chunk_merkle_tree()")
+            merkle_tree = await self.io_executor.run(
+                build_chunk_merkle_tree, encrypted_byte_data, synapse.merkle_chunk_size
+            )
+            await store_merkle_leaves(
+                self.database,
+                data_hash,
+                synapse.dendrite.hotkey,
+                synapse.merkle_chunk_size,
+                [merkle_tree.get_leaf(i) for i in range(merkle_tree.get_leaf_count())],
+            )
+
         # Commit to the entire data block
         bt.logging.trace("entering ECCommitment()")
         committer = ECCommitment(
@@ -659,7 +854,9 @@ class miner:
             hex_to_ecc_point(synapse.h, synapse.curve),
         )
         bt.logging.trace("entering commit()")
-        c, m_val, r = committer.commit(encrypted_byte_data + str(synapse.seed).encode())
+        c, m_val, r = await self.io_executor.run(
+            committer.commit, encrypted_byte_data + str(synapse.seed).encode()
+        )
         if self.config.miner.verbose:
             bt.logging.debug(f"committer: {committer}")
             bt.logging.debug(f"encrypted_byte_data: {encrypted_byte_data}")
@@ -669,7 +866,7 @@ class miner:
 
         # Send back some proof that we stored the data
         synapse.randomness = r
-        synapse.commitment = ecc_point_to_hex(c)
+        synapse.commitment = ecc_point_to_hex(c, synapse.point_encoding)
         bt.logging.trace(f"signed commitment: {synapse.commitment}")
 
         # Initialize the commitment hash with the initial commitment for chained proofs
@@ -725,6 +922,7 @@ class miner:
         # Retrieve the data itself from miner storage
         bt.logging.info(f"received challenge hash: {synapse.challenge_hash}")
         self.request_count += 1
+        synapse.point_encoding = negotiate_point_encoding(synapse.point_encoding)
 
         bt.logging.trace("entering get_chunk_metadata()")
         data = await get_chunk_metadata(
@@ -740,43 +938,31 @@ class miner:
 
         # Chunk the data according to the specified (random) chunk size
         filepath = data.get("filepath", None)
-        if filepath is None:
-            # fallback to load the data from the filesystem via database path construction
-            # use new path construction by hotkey and challenge hash
-            file_not_found = True
-            new_filepath = os.path.expanduser(
-                f"{self.config.database.directory}/{synapse.dendrite.hotkey}/{synapse.challenge_hash}"
+        if not filepath:
+            # fallback to load the data from the filesystem via path construction,
+            # trying the fan-out, flat per-hotkey and legacy layouts
+            filepath = find_blob_path(
+                self.config.database.directory,
+                synapse.dendrite.hotkey,
+                synapse.challenge_hash,
+                fanout=self.config.database.directory_fanout,
             )
-            if os.path.isfile(new_filepath):
-                file_not_found = False
-                filepath = new_filepath
-
-            if file_not_found:
-                # Use old path construction by just challenge hash
-                fallback_filepath = os.path.expanduser(
-                    f"{self.config.database.directory}/{synapse.challenge_hash}"
+            if filepath is None:
+                bt.logging.error(
+                    f"challenge() No file found for {synapse.challenge_hash} in {self.config.database.directory}."
                 )
-                if not os.path.isfile(fallback_filepath):
-                    bt.logging.error(
-                        f"challenge() No file found for {synapse.challenge_hash} in {fallback_filepath}."
-                    )
-                    synapse.axon.status_code = 404
-                    synapse.axon.status_message = "File not found"
-                    return synapse
-                else:
-                    filepath = fallback_filepath
-                    bt.logging.debug(
-                        f"challenge() File found for {synapse.challenge_hash} in {filepath}."
-                    )
-
-        bt.logging.trace("entering load_from_filesystem()")
-        try:
-            encrypted_data_bytes = load_from_filesystem(filepath)
-        except Exception as e:
-            bt.logging.error(f"Error loading file {filepath}: {e}")
-            synapse.axon.status_code = 404
-            synapse.axon.status_message = "File not found"
-            return synapse
+                synapse.axon.status_code = 404
+                synapse.axon.status_message = "File not found"
+                return synapse
+
+        # Answer from the store-time hash tree when the validator asks for it and we kept one
+        if synapse.mode == storage.protocol.CHALLENGE_MODE_PRECOMPUTED:
+            merkle_tree = load_merkle_tree(data, synapse.chunk_size)
+            if merkle_tree is not None:
+                return await self.challenge_precomputed(synapse, filepath, merkle_tree)
+            bt.logging.debug(
+                f"No store-time tree for {synapse.challenge_hash}, answering a full challenge"
+            )
 
         # Construct the next commitment hash using previous commitment and hash
         # of the data to prove storage over time
@@ -789,52 +975,70 @@ class miner:
             bt.logging.error(f"No seed found for {synapse.challenge_hash}")
             return synapse
 
-        bt.logging.trace("entering comput_subsequent_commitment()...")
-        new_seed = synapse.seed.encode()
-        next_commitment, proof = compute_subsequent_commitment(
-            encrypted_data_bytes, prev_seed, new_seed, verbose=self.config.miner.verbose
-        )
-        if self.config.miner.verbose:
-            bt.logging.debug(f"prev seed : {prev_seed}")
-            bt.logging.debug(f"new seed  : {new_seed}")
-            bt.logging.debug(f"proof     : {proof}")
-            bt.logging.debug(f"commitment: {next_commitment}\n")
-        synapse.commitment_hash = next_commitment
-        synapse.commitment_proof = proof
-
-        # update the commitment seed challenge hash in storage
-        bt.logging.trace(f"udpating challenge miner storage: {pformat(data)}")
-        await update_seed_info(
-            self.database,
-            chunk_hash=synapse.challenge_hash,
-            hotkey=synapse.dendrite.hotkey,
-            seed=new_seed.decode("utf-8"),
-        )
+        # Map the file instead of reading it, hashing and chunking work on views of it
+        with ExitStack() as stack:
+            bt.logging.trace("entering open_blob()")
+            try:
+                blob = stack.enter_context(open_blob(filepath))
+            except Exception as e:
+                bt.logging.error(f"Error loading file {filepath}: {e}")
+                synapse.axon.status_code = 404
+                synapse.axon.status_message = "File not found"
+                return synapse
+
+            bt.logging.trace("entering comput_subsequent_commitment()...")
+            new_seed = synapse.seed.encode()
+            next_commitment, proof = await self.io_executor.run(
+                compute_subsequent_commitment,
+                blob,
+                prev_seed,
+                new_seed,
+                verbose=self.config.miner.verbose,
+            )
+            if self.config.miner.verbose:
+                bt.logging.debug(f"prev seed : {prev_seed}")
+                bt.logging.debug(f"new seed  : {new_seed}")
+                bt.logging.debug(f"proof     : {proof}")
+                bt.logging.debug(f"commitment: {next_commitment}\n")
+            synapse.commitment_hash = next_commitment
+            synapse.commitment_proof = proof
+
+            # update the commitment seed challenge hash in storage
+            bt.logging.trace(f"udpating challenge miner storage: {pformat(data)}")
+            await update_seed_info(
+                self.database,
+                chunk_hash=synapse.challenge_hash,
+                hotkey=synapse.dendrite.hotkey,
+                seed=new_seed.decode("utf-8"),
+            )
 
-        # Chunk the data according to the provided chunk_size
-        bt.logging.trace("entering chunk_data()")
-        data_chunks = chunk_data(encrypted_data_bytes, synapse.chunk_size)
-
-        # Extract setup params
-        g = hex_to_ecc_point(synapse.g, synapse.curve)
-        h = hex_to_ecc_point(synapse.h, synapse.curve)
-
-        # Commit the data chunks based on the provided curve points
-        bt.logging.trace("entering ECCcommitment()")
-        committer = ECCommitment(g, h)
-        bt.logging.trace("entering commit_data_with_seed()")
-        randomness, chunks, commitments, merkle_tree = commit_data_with_seed(
-            committer,
-            data_chunks=data_chunks,
-            n_chunks=sys.getsizeof(encrypted_data_bytes) // synapse.chunk_size + 1,
-            seed=synapse.seed,
-        )
+            # Commit the data chunks based on the provided curve points. The engine shards
+            # the commitments across worker processes so the event loop stays responsive.
+            bt.logging.trace("entering commitment_engine.commit_file()")
+            (
+                randomness,
+                chunks,
+                commitments,
+                merkle_tree,
+            ) = await self.commitment_engine.commit_file(
+                synapse.g,
+                synapse.h,
+                synapse.curve,
+                blob=blob,
+                filepath=filepath,
+                chunk_size=synapse.chunk_size,
+                n_chunks=padded_chunk_count(len(blob), synapse.chunk_size),
+                seed=synapse.seed,
+                point_encoding=synapse.point_encoding,
+            )
+
+            # Prepare return values to validator, the chunk views must not outlive the blob
+            bt.logging.trace("entering b64_encode()")
+            synapse.commitment = commitments[synapse.challenge_index]
+            synapse.data_chunk = base64.b64encode(chunks[synapse.challenge_index])
+            synapse.randomness = randomness[synapse.challenge_index]
+            del chunks
 
-        # Prepare return values to validator
-        bt.logging.trace("entering b64_encode()")
-        synapse.commitment = commitments[synapse.challenge_index]
-        synapse.data_chunk = base64.b64encode(chunks[synapse.challenge_index])
-        synapse.randomness = randomness[synapse.challenge_index]
         synapse.merkle_proof = b64_encode(
             merkle_tree.get_proof(synapse.challenge_index)
         )
@@ -851,6 +1055,56 @@ class miner:
         bt.logging.info(f"returning challenge data {synapse.data_chunk[:24]}...")
         return synapse
 
+    async def challenge_precomputed(
+        self, synapse: storage.protocol.Challenge, filepath: str, merkle_tree
+    ) -> storage.protocol.Challenge:
+        """
+        Answers a challenge in precomputed mode. Only the challenged chunk is read from disk and
+        committed to, and the Merkle proof comes from the hash tree kept since store time, so the
+        cost scales with the chunk size rather than the file size. The chained commitment and the
+        stored seed are left untouched.
+
+        Args:
+            synapse (storage.protocol.Challenge): The challenge request.
+            filepath (str): Path of the stored file.
+            merkle_tree (MerkleTree): The store-time hash tree of the file.
+
+        Returns:
+            storage.protocol.Challenge: The synapse with the chunk, commitment, randomness, Merkle proof and root.
+        """
+        bt.logging.trace("entering load_chunk_from_filesystem()")
+        try:
+            chunk = await self.io_executor.run(
+                load_chunk_from_filesystem,
+                filepath,
+                synapse.challenge_index,
+                synapse.chunk_size,
+            )
+        except Exception as e:
+            bt.logging.error(f"Error loading file {filepath}: {e}")
+            synapse.axon.status_code = 404
+            synapse.axon.status_message = "File not found"
+            return synapse
+
+        committer = ECCommitment(
+            hex_to_ecc_point(synapse.g, synapse.curve),
+            hex_to_ecc_point(synapse.h, synapse.curve),
+        )
+        c, m_val, r = committer.commit(chunk + str(synapse.seed).encode())
+
+        synapse.commitment = ecc_point_to_hex(c, synapse.point_encoding)
+        synapse.data_chunk = base64.b64encode(chunk)
+        synapse.randomness = r
+        synapse.merkle_proof = b64_encode(
+            merkle_tree.get_proof(synapse.challenge_index)
+        )
+        synapse.merkle_root = merkle_tree.get_merkle_root()
+
+        bt.logging.info(
+            f"returning precomputed challenge data {synapse.data_chunk[:24]}..."
+        )
+        return synapse
+
     async def retrieve(
         self, synapse: storage.protocol.Retrieve
     ) -> storage.protocol.Retrieve:
@@ -898,54 +1152,48 @@ class miner:
 
         # Get the data from filesystem to retrieve
         filepath = data.get("filepath", None)
-        if filepath is None:
-            # fallback to load the data from the filesystem via database path construction
-            # use new path construction by hotkey and retrieve hash
-            file_not_found = True
-            new_filepath = os.path.expanduser(
-                f"{self.config.database.directory}/{synapse.dendrite.hotkey}/{synapse.data_hash}"
+        if not filepath:
+            # fallback to load the data from the filesystem via path construction,
+            # trying the fan-out, flat per-hotkey and legacy layouts
+            filepath = find_blob_path(
+                self.config.database.directory,
+                synapse.dendrite.hotkey,
+                synapse.data_hash,
+                fanout=self.config.database.directory_fanout,
             )
-            if os.path.isfile(new_filepath):
-                file_not_found = False
-                filepath = new_filepath
-
-            if file_not_found:
-                # Use old path construction by just retrieve hash
-                fallback_filepath = os.path.expanduser(
-                    f"{self.config.database.directory}/{synapse.data_hash}"
+            if filepath is None:
+                bt.logging.error(
+                    f"retrieve() No file found for {synapse.data_hash} in {self.config.database.directory}."
                 )
-                if not os.path.isfile(fallback_filepath):
-                    bt.logging.error(
-                        f"retrieve() No file found for {synapse.data_hash} in {fallback_filepath}."
-                    )
-                    synapse.axon.status_code = 404
-                    synapse.axon.status_message = "File not found"
-                    return synapse
-                else:
-                    filepath = fallback_filepath
-                    bt.logging.debug(
-                        f"retrieve() File found for {synapse.data_hash} in {filepath}."
-                    )
-
-        bt.logging.trace("entering load_from_filesystem()")
-        try:
-            encrypted_data_bytes = load_from_filesystem(filepath)
-        except Exception as e:
-            bt.logging.error(f"Error loading file {filepath}: {e}")
-            synapse.axon.status_code = 404
-            synapse.axon.status_message = "File not found"
-            return synapse
+                synapse.axon.status_code = 404
+                synapse.axon.status_message = "File not found"
+                return synapse
 
-        # incorporate a final seed challenge to verify they still have the data at retrieval time
-        bt.logging.trace("entering compute_subsequent_commitment()")
-        commitment, proof = compute_subsequent_commitment(
-            encrypted_data_bytes,
-            previous_seed=data.get("seed", "").encode(),
-            new_seed=synapse.seed.encode(),
-            verbose=self.config.miner.verbose,
-        )
-        synapse.commitment_hash = commitment
-        synapse.commitment_proof = proof
+        with ExitStack() as stack:
+            bt.logging.trace("entering open_blob()")
+            try:
+                blob = stack.enter_context(open_blob(filepath))
+            except Exception as e:
+                bt.logging.error(f"Error loading file {filepath}: {e}")
+                synapse.axon.status_code = 404
+                synapse.axon.status_message = "File not found"
+                return synapse
+
+            # incorporate a final seed challenge to verify they still have the data at retrieval time
+            bt.logging.trace("entering compute_subsequent_commitment()")
+            commitment, proof = await self.io_executor.run(
+                compute_subsequent_commitment,
+                blob,
+                previous_seed=data.get("seed", "").encode(),
+                new_seed=synapse.seed.encode(),
+                verbose=self.config.miner.verbose,
+            )
+            synapse.commitment_hash = commitment
+            synapse.commitment_proof = proof
+
+            # Return base64 data, encoded straight from the mapped file
+            bt.logging.trace("entering b64_encode()")
+            synapse.data = await self.io_executor.run(base64.b64encode, blob)
 
         # store new seed
         bt.logging.trace("entering update_seed_info()")
@@ -957,9 +1205,6 @@ class miner:
         )
         bt.logging.debug(f"udpated retrieve miner storage: {pformat(data)}")
 
-        # Return base64 data
-        bt.logging.trace("entering b64_encode()")
-        synapse.data = base64.b64encode(encrypted_data_bytes)
         bt.logging.info(f"returning retrieved data {synapse.data[:24]}...")
         return synapse
 
@@ -987,6 +1232,15 @@ class miner:
             bt.logging.debug("Stopping miner in background thread.")
             self.should_exit = True
             self.thread.join(5)
+            self.commitment_engine.shutdown()
+            self.io_executor.shutdown()
+            self.request_log.flush()
+            if self.pack_store is not None:
+                self.pack_compaction_timer.cancel()
+                self.pack_store.close()
+            if self.config.database.expiry_interval > 0:
+                self.expiry_timer.cancel()
+            self.storage_reconcile_timer.cancel()
             self.is_running = False
             bt.logging.debug("Stopped")
 
@@ -53,7 +53,19 @@ from storage.validator.weights import (
     set_weights_for_validator,
 )
 from storage.validator.forward import forward
-from storage.validator.encryption import setup_encryption_wallet
+from storage.validator.autopipeline import AutoPipelineRedis
+from storage.validator.bonding import StatisticsBuffer
+from storage.validator.crs import CRSPool
+from storage.validator.database import (
+    migrate_chunk_hotkeys_to_sets,
+    rebuild_hash_indexes,
+    rebuild_ttl_index,
+    reconcile_storage_counters,
+)
+from storage.validator.encryption import (
+    setup_encryption_wallet,
+    precompute_wallet_envelope,
+)
 
 
 def MockDendrite():
@@ -149,6 +161,10 @@ class neuron:
         self.encryption_wallet.coldkey  # Unlock the coldkey.
         bt.logging.info(f"loading encryption wallet {self.encryption_wallet}")
 
+        # Derive the envelope key once up front instead of on every store step.
+        bt.logging.debug("deriving encryption wallet envelope key")
+        precompute_wallet_envelope(self.encryption_wallet)
+
         # Init metagraph.
         bt.logging.debug("loading metagraph")
         self.metagraph = bt.metagraph(
@@ -168,6 +184,13 @@ class neuron:
             db=self.config.database.index,
             password=redis_password,
         )
+        if not self.config.database.disable_auto_pipeline:
+            self.database = AutoPipelineRedis(self.database)
+
+        # Optionally aggregate miner statistics and write them once per step
+        self.statistics_buffer = (
+            StatisticsBuffer() if self.config.neuron.buffer_statistics else None
+        )
         self.db_semaphore = asyncio.Semaphore()
 
         # Init Weights.
@@ -191,6 +214,18 @@ class neuron:
         # Init the event loop.
         self.loop = asyncio.get_event_loop()
 
+        # Move chunk replica membership to sets if this database predates them.
+        self.loop.run_until_complete(
+            migrate_chunk_hotkeys_to_sets(self.database, force=False)
+        )
+        # Backfill the chunk/challenge hash indexes for data stored before they existed.
+        self.loop.run_until_complete(rebuild_hash_indexes(self.database))
+        self.loop.run_until_complete(rebuild_ttl_index(self.database))
+        # Initialize the storage byte counters if this database predates them.
+        self.loop.run_until_complete(
+            reconcile_storage_counters(self.database, force=False)
+        )
+
         self.wandb = None
 
         self.prev_step_block = get_current_block(self.subtensor)
@@ -206,6 +241,13 @@ class neuron:
         self.subscription_thread: threading.Thread = None
         self.last_registered_block = 0
         self.rebalance_queue = []
+        # Point encoding each miner last answered with, see `get_point_encoding`
+        self.point_encodings = {}
+        # CRSs for stores and challenges, generated ahead of time in a background thread
+        self.crs_pool = CRSPool(
+            depth=self.config.neuron.crs_pool_depth, curve=self.config.neuron.curve
+        )
+        self.crs_pool.start()
         self.rebalance_script_path = get_rebalance_script_path(
             os.path.dirname(os.path.abspath(__file__))
         )
@@ -0,0 +1,139 @@
+import time
+import asyncio
+import argparse
+import numpy as np
+import bittensor as bt
+from redis import asyncio as aioredis
+
+from storage.shared.utils import get_redis_password
+from storage.validator.bonding import (
+    TIERS,
+    assign_tiers,
+    compute_all_tiers,
+    compute_tier,
+    rollover_storage_stats,
+    wilson_score_interval,
+    wilson_score_intervals,
+)
+
+
+def random_stats(num_miners: int, seed: int = 0) -> np.ndarray:
+    """
+    Columns follow TIER_STATS_FIELDS: successes/attempts per task, then total_successes.
+    """
+    rng = np.random.default_rng(seed)
+    attempts = rng.integers(0, 100, size=(num_miners, 3))
+    successes = rng.integers(0, attempts + 1)
+    total_successes = rng.integers(0, 20000, size=num_miners)
+    stats = np.empty((num_miners, 7), dtype=np.int64)
+    stats[:, 0:6:2] = successes
+    stats[:, 1:6:2] = attempts
+    stats[:, 6] = total_successes
+    return stats
+
+
+def scalar_tiers(stats: np.ndarray):
+    tiers = []
+    for row in stats.tolist():
+        score = wilson_score_interval(
+            row[0] + row[2] + row[4], row[1] + row[3] + row[5]
+        )
+        for tier, min_score, min_total_successes, _ in TIERS:
+            if score >= min_score and row[6] >= min_total_successes:
+                tiers.append(tier)
+                break
+    return tiers
+
+
+def vectorized_tiers(stats: np.ndarray):
+    scores = wilson_score_intervals(
+        stats[:, 0] + stats[:, 2] + stats[:, 4], stats[:, 1] + stats[:, 3] + stats[:, 5]
+    )
+    return [TIERS[i][0] for i in assign_tiers(scores, stats[:, 6])]
+
+
+def benchmark_compute(num_miners: int, repeats: int):
+    stats = random_stats(num_miners)
+    assert scalar_tiers(stats) == vectorized_tiers(stats)
+
+    for name, fn in [("scalar", scalar_tiers), ("vectorized", vectorized_tiers)]:
+        start = time.perf_counter()
+        for _ in range(repeats):
+            fn(stats)
+        elapsed = (time.perf_counter() - start) / repeats
+        print(
+            f"{name:>10} tier computation for {num_miners} miners: {elapsed * 1000:.2f} ms"
+        )
+
+
+async def seed_database(database: aioredis.Redis, stats: np.ndarray):
+    async with database.pipeline(transaction=False) as pipe:
+        for i, row in enumerate(stats.tolist()):
+            pipe.hset(
+                f"stats:benchmark-{i}",
+                mapping={
+                    "challenge_successes": row[0],
+                    "challenge_attempts": row[1],
+                    "retrieve_successes": row[2],
+                    "retrieve_attempts": row[3],
+                    "store_successes": row[4],
+                    "store_attempts": row[5],
+                    "total_successes": row[6],
+                    "tier": "Bronze",
+                    "storage_limit": TIERS[-1][3],
+                },
+            )
+        await pipe.execute()
+
+
+async def benchmark_database(args, num_miners: int):
+    database = aioredis.StrictRedis(
+        host=args.database_host,
+        port=args.database_port,
+        db=args.database_index,
+        password=get_redis_password(args.redis_password),
+    )
+    assert (
+        await database.dbsize() == 0
+    ), f"Database index {args.database_index} is not empty, pick an unused index."
+
+    stats = random_stats(num_miners)
+    try:
+        await seed_database(database, stats)
+        start = time.perf_counter()
+        miners = [miner async for miner in database.scan_iter("stats:*")]
+        await asyncio.gather(*[compute_tier(miner, database) for miner in miners])
+        await rollover_storage_stats(database)
+        print(f"per-miner compute_tier + rollover: {time.perf_counter() - start:.3f} s")
+
+        await seed_database(database, stats)
+        start = time.perf_counter()
+        await compute_all_tiers(database)
+        print(f"bulk compute_all_tiers:            {time.perf_counter() - start:.3f} s")
+    finally:
+        await database.flushdb()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark miner tier recomputation, scalar versus vectorized."
+    )
+    parser.add_argument("--num_miners", type=int, default=4096)
+    parser.add_argument("--repeats", type=int, default=10)
+    parser.add_argument(
+        "--with_redis",
+        action="store_true",
+        help="Also benchmark end to end against redis. Requires an empty database index, which is flushed afterwards.",
+    )
+    parser.add_argument("--redis_password", type=str, default=None)
+    parser.add_argument("--database_host", type=str, default="localhost")
+    parser.add_argument("--database_port", type=int, default=6379)
+    parser.add_argument("--database_index", type=int, default=15)
+    args = parser.parse_args()
+
+    # Keep per-miner trace logging out of the timings
+    bt.logging.set_trace(False)
+    bt.logging.set_debug(False)
+    benchmark_compute(args.num_miners, args.repeats)
+    if args.with_redis:
+        asyncio.run(benchmark_database(args, args.num_miners))
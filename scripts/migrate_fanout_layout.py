@@ -0,0 +1,86 @@
+import os
+import asyncio
+from redis import asyncio as aioredis
+import argparse
+import bittensor as bt
+from storage.shared.utils import get_redis_password
+from storage.shared.checks import check_environment
+from storage.miner.database import FANOUT_PROGRESS_PATH, migrate_to_fanout_layout
+
+
+async def main(args):
+    data_directory = os.path.expanduser(args.data_directory)
+    bt.logging.info(
+        f"Attempting migration of {data_directory} to a {args.fanout} level fan-out layout"
+    )
+
+    redis_password = get_redis_password(args.redis_password)
+    try:
+        await check_environment(
+            args.redis_conf_path, args.database_host, args.database_port, redis_password
+        )
+    except AssertionError as e:
+        bt.logging.warning(
+            f"Something is missing in your environment: {e}. Please check your configuration, use the README for help, and try again."
+        )
+        exit(1)
+
+    bt.logging.info(f"Loading database from {args.database_host}:{args.database_port}")
+    database = aioredis.StrictRedis(
+        host=args.database_host,
+        port=args.database_port,
+        db=args.database_index,
+        password=redis_password,
+    )
+    stats = await migrate_to_fanout_layout(
+        database,
+        data_directory,
+        args.fanout,
+        concurrency=args.concurrency,
+        batch_size=args.batch_size,
+        progress_path=args.progress_path,
+    )
+
+    if stats["missing"] or stats["failed"]:
+        bt.logging.error(
+            f"Migration finished with {stats['missing']} missing and {stats['failed']} failed blobs: {stats}"
+        )
+    else:
+        bt.logging.success(f"All data was migrated to the fan-out layout: {stats}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument(
+        "--redis_password",
+        type=str,
+        default=None,
+        help="password for the redis database",
+    )
+    parser.add_argument(
+        "--redis_conf_path",
+        type=str,
+        default="/etc/redis/redis.conf",
+        help="path to the redis configuration file",
+    )
+    parser.add_argument("--database_host", type=str, default="localhost")
+    parser.add_argument("--database_port", type=int, default=6379)
+    parser.add_argument("--database_index", type=int, default=0)
+    parser.add_argument("--data_directory", type=str, default="~/.data")
+    parser.add_argument(
+        "--fanout",
+        type=int,
+        default=2,
+        help="number of hash-prefix directory levels, must match --database.directory_fanout",
+    )
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--batch_size", type=int, default=500)
+    parser.add_argument(
+        "--progress_path",
+        type=str,
+        default=FANOUT_PROGRESS_PATH,
+        help="checkpoint file, rerun with the same path to resume an interrupted migration",
+    )
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
@@ -52,6 +52,7 @@ async def main(args):
         self = argparse.Namespace()
         self.metagraph = metagraph
         self.database = database
+        self.statistics_buffer = None
 
         await rebalance_data(self, k=2, dropped_hotkeys=hotkeys, hotkey_replaced=True)
 
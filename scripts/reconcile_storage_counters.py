@@ -0,0 +1,60 @@
+import asyncio
+from redis import asyncio as aioredis
+import argparse
+import bittensor as bt
+from storage.shared.utils import get_redis_password
+from storage.shared.checks import check_environment
+from storage.validator.database import (
+    reconcile_storage_counters,
+    total_validator_storage,
+)
+
+
+async def main(args):
+    redis_password = get_redis_password(args.redis_password)
+    try:
+        await check_environment(
+            args.redis_conf_path, args.database_host, args.database_port, redis_password
+        )
+    except AssertionError as e:
+        bt.logging.warning(
+            f"Something is missing in your environment: {e}. Please check your configuration, use the README for help, and try again."
+        )
+        exit(1)
+
+    bt.logging.info(f"Loading database from {args.database_host}:{args.database_port}")
+    database = aioredis.StrictRedis(
+        host=args.database_host,
+        port=args.database_port,
+        db=args.database_index,
+        password=redis_password,
+    )
+    drift = await reconcile_storage_counters(database)
+    total_storage = await total_validator_storage(database)
+    bt.logging.success(
+        f"Storage counters reconciled (drift {drift} bytes). Total validator storage (GB): {total_storage // (1024**3)}"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Recompute the validator per-hotkey and total storage byte counters."
+    )
+    parser.add_argument(
+        "--redis_password",
+        type=str,
+        default=None,
+        help="password for the redis database",
+    )
+    parser.add_argument(
+        "--redis_conf_path",
+        type=str,
+        default="/etc/redis/redis.conf",
+        help="path to the redis configuration file",
+    )
+    parser.add_argument("--database_host", type=str, default="localhost")
+    parser.add_argument("--database_port", type=int, default=6379)
+    parser.add_argument("--database_index", type=int, default=0)
+    args = parser.parse_args()
+
+    asyncio.run(main(args))
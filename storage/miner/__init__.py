@@ -18,5 +18,11 @@
 
 from . import config
 from . import utils
+from . import pack
+from . import blob
+from . import commitment
+from . import usage
+from . import request_log
+from . import executor
 from .run import run
 from .set_weights import set_weights
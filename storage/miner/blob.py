@@ -0,0 +1,82 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import sys
+import mmap
+import bittensor as bt
+from contextlib import contextmanager
+
+from .pack import parse_pack_ref
+
+
+@contextmanager
+def open_blob(filepath):
+    """
+    Memory-maps a stored file read-only for the duration of a `with` block.
+
+    Parameters:
+    - filepath (str): The path to the stored file, or a pack reference (see `PackStore`).
+
+    Yields:
+    - memoryview: A read-only view over the whole file. Slicing it (e.g. with `chunk_data`)
+      does not copy, and pages are only read from disk as they are touched.
+
+    Views derived from the blob must not outlive the block; convert what is needed afterwards
+    to bytes first. If one does, the mapping is left for the garbage collector to close.
+    """
+    packed = parse_pack_ref(filepath)
+    if packed is None:
+        path, offset, length = filepath, 0, None
+    else:
+        path, offset, length = packed
+    with open(os.path.expanduser(path), "rb") as file:
+        if length is None:
+            length = os.fstat(file.fileno()).st_size
+        if length == 0:
+            # Empty files cannot be mapped
+            yield memoryview(b"")
+            return
+        # Map offsets must be aligned, so packed blobs map from the granule they start in
+        start = offset - offset % mmap.ALLOCATIONGRANULARITY
+        mapped = mmap.mmap(
+            file.fileno(),
+            offset + length - start,
+            access=mmap.ACCESS_READ,
+            offset=start,
+        )
+        view = memoryview(mapped)
+        blob = view[offset - start :]
+        try:
+            yield blob
+        finally:
+            blob.release()
+            view.release()
+            try:
+                mapped.close()
+            except BufferError:
+                bt.logging.warning(f"Views of {filepath} outlived open_blob()")
+
+
+def padded_chunk_count(size, chunk_size):
+    """
+    Number of commitment slots for a file of `size` bytes, matching the historical
+    `sys.getsizeof(data) // chunk_size + 1` for `bytes` data of that length.
+    """
+    return (size + sys.getsizeof(b"")) // chunk_size + 1
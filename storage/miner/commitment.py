@@ -0,0 +1,294 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import asyncio
+import multiprocessing
+import bittensor as bt
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional, Sequence, Tuple
+
+from ..shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    ecc_point_to_hex,
+    get_committer,
+    hex_to_ecc_point,
+)
+from ..shared.merkle import (
+    MerkleTree,
+)
+from ..shared.utils import chunk_data
+from .blob import open_blob
+
+
+# Below this many chunks per shard the pickling and scheduling overhead outweighs the
+# parallel speedup, so small files use fewer (or a single) worker.
+MIN_CHUNKS_PER_SHARD = 16
+
+
+def commit_shard(
+    g_hex: str,
+    h_hex: str,
+    curve: str,
+    chunks: List[bytes],
+    seed,
+    point_encoding: int = POINT_ENCODING_LEGACY,
+):
+    """
+    Commits a contiguous shard of chunks. Runs inside a worker process.
+
+    Parameters:
+    - g_hex (str): Hex encoded base point g.
+    - h_hex (str): Hex encoded base point h.
+    - curve (str): Name of the curve the points belong to.
+    - chunks (list): The data chunks in this shard.
+    - seed: A seed value that is combined with each chunk before commitment.
+    - point_encoding (int): The `POINT_ENCODING_*` version of the returned commitment points.
+
+    Returns:
+    - list: A (randomness, commitment point in hex) pair per chunk, in order.
+    """
+    committer = get_committer(
+        hex_to_ecc_point(g_hex, curve),
+        hex_to_ecc_point(h_hex, curve),
+        n_commits=len(chunks),
+    )
+    seed = str(seed).encode()
+    results = []
+    for chunk in chunks:
+        c, m_val, r = committer.commit(b"".join((chunk, seed)))
+        results.append((r, ecc_point_to_hex(c, point_encoding)))
+    return results
+
+
+def commit_file_range(
+    g_hex: str,
+    h_hex: str,
+    curve: str,
+    filepath: str,
+    chunk_size: int,
+    start: int,
+    stop: int,
+    seed,
+    point_encoding: int = POINT_ENCODING_LEGACY,
+):
+    """
+    Commits chunks `start` to `stop` (exclusive) of a stored file. Runs inside a worker process,
+    which maps the file itself so no chunk data is pickled across processes.
+
+    Returns:
+    - list: A (randomness, commitment point in hex) pair per chunk, in order.
+    """
+    with open_blob(filepath) as blob:
+        return commit_shard(
+            g_hex,
+            h_hex,
+            curve,
+            list(chunk_data(blob[start * chunk_size : stop * chunk_size], chunk_size)),
+            seed,
+            point_encoding,
+        )
+
+
+def assemble_commitments(chunks: List[bytes], commitments, n_chunks: int):
+    """
+    Lays out per-chunk commitments the way `commit_data_with_seed` returns them and builds
+    the Merkle tree over the commitment points.
+
+    Parameters:
+    - chunks (iterable): The committed data chunks, in order.
+    - commitments (iterable): A (randomness, commitment point in hex) pair per chunk, in order.
+    - n_chunks (int): The number of chunks expected to be committed.
+
+    Returns:
+    - randomness (list), chunks (list), points (list), merkle_tree (MerkleTree)
+    """
+    merkle_tree = MerkleTree()
+    randomness, points = [None] * n_chunks, [None] * n_chunks
+    padded_chunks = [None] * n_chunks
+    for index, (chunk, (r, c_hex)) in enumerate(zip(chunks, commitments)):
+        randomness[index] = r
+        padded_chunks[index] = chunk
+        points[index] = c_hex
+        merkle_tree.add_leaf(c_hex)
+    merkle_tree.make_tree()
+    return randomness, padded_chunks, points, merkle_tree
+
+
+class CommitmentEngine:
+    """
+    Computes challenge commitments on a pool of worker processes.
+
+    The chunks of a challenged file are split into contiguous shards that are committed in
+    parallel, each worker building its own fixed-base tables when they pay off. The Merkle
+    tree is then built from the ordered results in the calling process. Awaiting `commit`
+    keeps the miner's event loop free to answer other requests in the meantime.
+
+    Workers are started lazily with the "spawn" start method, so they do not inherit the
+    miner's threads, sockets or event loop.
+
+    Args:
+        max_workers (int): Number of worker processes. 0 commits inline on the caller's
+            event loop, as before the engine existed.
+    """
+
+    def __init__(self, max_workers: int):
+        self.max_workers = max_workers
+        self._pool: Optional[ProcessPoolExecutor] = None
+
+    @property
+    def pool(self) -> ProcessPoolExecutor:
+        if self._pool is None:
+            bt.logging.info(
+                f"starting commitment engine with {self.max_workers} workers"
+            )
+            self._pool = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._pool
+
+    def shard(self, chunks: Sequence) -> List[Sequence]:
+        """
+        Splits chunks into at most `max_workers` contiguous shards of at least
+        `MIN_CHUNKS_PER_SHARD` chunks each (except when there are fewer chunks in total).
+        No chunks give no shards.
+        """
+        if not len(chunks):
+            return []
+        n_shards = max(1, min(self.max_workers, len(chunks) // MIN_CHUNKS_PER_SHARD))
+        size = -(-len(chunks) // n_shards)
+        return [chunks[i : i + size] for i in range(0, len(chunks), size)]
+
+    async def commit(
+        self,
+        g_hex: str,
+        h_hex: str,
+        curve: str,
+        data_chunks,
+        n_chunks: int,
+        seed,
+        point_encoding: int = POINT_ENCODING_LEGACY,
+    ) -> Tuple[list, list, list, MerkleTree]:
+        """
+        Commits chunks of data with a seed, with the same results as `commit_data_with_seed`.
+
+        Parameters:
+        - g_hex (str): Hex encoded base point g.
+        - h_hex (str): Hex encoded base point h.
+        - curve (str): Name of the curve the points belong to.
+        - data_chunks (iterable): The data chunks to be committed.
+        - n_chunks (int): The number of chunks expected to be committed.
+        - seed: A seed value that is combined with data chunks before commitment.
+        - point_encoding (int): The `POINT_ENCODING_*` version of the commitment points.
+
+        Returns:
+        - randomness (list): Randomness values associated with each data chunk's commitment.
+        - chunks (list): The list of original data chunks that were committed.
+        - points (list): Commitment points in hex format.
+        - merkle_tree (MerkleTree): A Merkle tree constructed from the commitment points.
+        """
+        chunks = list(data_chunks)
+        if self.max_workers <= 0:
+            commitments = commit_shard(
+                g_hex, h_hex, curve, chunks, seed, point_encoding
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            shards = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        self.pool,
+                        commit_shard,
+                        g_hex,
+                        h_hex,
+                        curve,
+                        shard,
+                        seed,
+                        point_encoding,
+                    )
+                    for shard in self.shard(chunks)
+                ]
+            )
+            commitments = [commitment for shard in shards for commitment in shard]
+        return assemble_commitments(chunks, commitments, n_chunks)
+
+    async def commit_file(
+        self,
+        g_hex: str,
+        h_hex: str,
+        curve: str,
+        blob: memoryview,
+        filepath: str,
+        chunk_size: int,
+        n_chunks: int,
+        seed,
+        point_encoding: int = POINT_ENCODING_LEGACY,
+    ) -> Tuple[list, list, list, MerkleTree]:
+        """
+        Like `commit`, for the chunks of a stored file mapped with `open_blob`. Workers map the
+        file themselves instead of receiving the chunk data.
+
+        Parameters:
+        - blob (memoryview): The file, as yielded by `open_blob(filepath)`.
+        - filepath (str): The path of the stored file.
+        - chunk_size (int): Size of each chunk in bytes.
+
+        Returns:
+        - The same 4-tuple as `commit`. The chunks are views into `blob`, so they must not be
+          used once the blob is closed.
+        """
+        if self.max_workers <= 0:
+            commitments = commit_shard(
+                g_hex,
+                h_hex,
+                curve,
+                list(chunk_data(blob, chunk_size)),
+                seed,
+                point_encoding,
+            )
+        else:
+            loop = asyncio.get_running_loop()
+            shards = await asyncio.gather(
+                *[
+                    loop.run_in_executor(
+                        self.pool,
+                        commit_file_range,
+                        g_hex,
+                        h_hex,
+                        curve,
+                        filepath,
+                        chunk_size,
+                        indices.start,
+                        indices.stop,
+                        seed,
+                        point_encoding,
+                    )
+                    for indices in self.shard(range(-(-len(blob) // chunk_size)))
+                ]
+            )
+            commitments = [commitment for shard in shards for commitment in shard]
+        return assemble_commitments(chunk_data(blob, chunk_size), commitments, n_chunks)
+
+    def shutdown(self):
+        """
+        Stops the worker processes. They are started again on the next `commit`.
+        """
+        if self._pool is not None:
+            self._pool.shutdown(wait=False, cancel_futures=True)
+            self._pool = None
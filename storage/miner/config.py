@@ -126,6 +126,49 @@ def add_args(cls, parser):
         help="Name of the request log file",
         default="requests_log.json",
     )
+    parser.add_argument(
+        "--miner.request_log_max_entries",
+        type=int,
+        help="Number of most recent requests kept per caller in the request log.",
+        default=256,
+    )
+    parser.add_argument(
+        "--miner.request_log_max_callers",
+        type=int,
+        help="Number of callers kept in the request log, the least recently seen are dropped first.",
+        default=4096,
+    )
+    parser.add_argument(
+        "--miner.commitment_workers",
+        type=int,
+        help="Number of worker processes computing challenge commitments. 0 computes them inline on the event loop.",
+        default=max(1, (os.cpu_count() or 2) - 1),
+    )
+    parser.add_argument(
+        "--miner.io_workers",
+        type=int,
+        help="Number of threads for blocking disk I/O and hashing in the request handlers.",
+        default=4,
+    )
+    parser.add_argument(
+        "--miner.fsync",
+        type=str,
+        choices=["none", "batch", "always"],
+        help="When stored data is flushed to disk: left to the OS, batched every fsync_interval, or on every write.",
+        default="none",
+    )
+    parser.add_argument(
+        "--miner.fsync_interval",
+        type=float,
+        help="Seconds between batched flushes when --miner.fsync is batch.",
+        default=1.0,
+    )
+    parser.add_argument(
+        "--miner.storage_reconcile_interval",
+        type=float,
+        help="Seconds between background recounts of the data directory size, correcting the incrementally tracked usage.",
+        default=6 * 3600,
+    )
     parser.add_argument(
         "--miner.max_requests_per_window",
         type=int,
@@ -159,6 +202,42 @@ def add_args(cls, parser):
         default="~/.data",
         help="The directory to store data in.",
     )
+    parser.add_argument(
+        "--database.directory_fanout",
+        type=int,
+        default=2,
+        help="Levels of hash-prefix subdirectories for new blobs (0 stores them flat per hotkey).",
+    )
+    parser.add_argument(
+        "--database.expiry_interval",
+        type=float,
+        default=0,
+        help="Seconds between purges of data past its ttl, freeing blobs no other hotkey references (0 disables purging).",
+    )
+    parser.add_argument(
+        "--database.pack_max_blob_size",
+        type=int,
+        default=0,
+        help="Blobs up to this many bytes are appended to pack segments instead of getting their own file (0 disables packing).",
+    )
+    parser.add_argument(
+        "--database.pack_segment_size",
+        type=int,
+        default=256 * 1024 * 1024,
+        help="Size in bytes at which a pack segment is sealed and a new one started.",
+    )
+    parser.add_argument(
+        "--database.pack_compaction_interval",
+        type=float,
+        default=3600,
+        help="Seconds between pack compaction passes.",
+    )
+    parser.add_argument(
+        "--database.pack_compaction_ratio",
+        type=float,
+        default=0.5,
+        help="Fraction of a sealed pack segment that must be expired or unreferenced before it is rewritten.",
+    )
     parser.add_argument(
         "--database.redis_password",
         type=str,
@@ -19,11 +19,17 @@
 import os
 import json
 import time
+import asyncio
 import bittensor as bt
 from typing import Optional, Dict, Any, Union, List
 from redis import asyncio as aioredis
+from redis.exceptions import WatchError
 from traceback import print_exception
 
+from .pack import PackStore, parse_pack_ref
+from .usage import StorageUsage
+from .utils import get_blob_path, load_from_filesystem
+
 
 async def store_chunk_metadata(
     r: "aioredis.Strictredis",
@@ -117,21 +123,32 @@ async def store_or_update_chunk_metadata(
         ttl (int, optional): The time-to-live for the chunk. Defaults to 30 days.
 
     This function checks if the chunk hash already exists in the database. If it does,
-    it updates the existing entry with the new seed information. If not, it stores the new metadata.
+    it updates the existing entry with the new seed information and ttl. If not, it stores the new metadata.
     """
     if await r.exists(chunk_hash):
         if not await r.hget(chunk_hash, hotkey):
             # It exists in old format only, convert to new format and delete old key
             await convert_to_new_format(r, chunk_hash)
-        # Update the existing entry with new seed information
-        await update_seed_info(r, chunk_hash, hotkey, seed)
+        if await r.hexists(chunk_hash, hotkey):
+            # Update the existing entry with new seed information, restarting its ttl
+            # like the validator does for a re-store
+            await update_seed_info(
+                r, chunk_hash, hotkey, seed, ttl=ttl or 60 * 60 * 24 * 30
+            )
+        else:
+            # Stored by other hotkeys only, keep this hotkey's own copy
+            await store_chunk_metadata(r, chunk_hash, filepath, hotkey, size, seed, ttl)
     else:
         # Add new entry in new format
         await store_chunk_metadata(r, chunk_hash, filepath, hotkey, size, seed, ttl)
 
 
 async def update_seed_info(
-    r: "aioredis.Strictredis", chunk_hash: str, hotkey: str, seed: str
+    r: "aioredis.Strictredis",
+    chunk_hash: str,
+    hotkey: str,
+    seed: str,
+    ttl: Optional[int] = None,
 ):
     """
     Updates the seed information for a specific chunk in the Redis database.
@@ -141,6 +158,7 @@ async def update_seed_info(
         chunk_hash (str): The unique hash identifying the chunk.
         hotkey (str): The caller hotkey value to be updated.
         seed (str): The new seed value to be updated.
+        ttl (int, optional): If given, the new time-to-live, counted from now.
 
     This function updates the seed information for the specified chunk hash.
     """
@@ -164,6 +182,9 @@ async def update_seed_info(
             metadata = json.loads(metadata)
         # Update the seed value
         metadata["seed"] = seed
+        if ttl is not None:
+            metadata["ttl"] = ttl
+            metadata["generated"] = time.time()
         # Convert back to string
         metadata = json.dumps(metadata)
         # Store the updated metadata
@@ -172,6 +193,35 @@ async def update_seed_info(
         print_exception(e)
 
 
+async def store_merkle_leaves(
+    r: "aioredis.Strictredis",
+    chunk_hash: str,
+    hotkey: str,
+    chunk_size: int,
+    leaves: List[str],
+):
+    """
+    Records the store-time hash tree of a chunk in its metadata, for precomputed challenges.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        chunk_hash (str): The unique hash identifying the chunk.
+        hotkey (str): The caller hotkey the metadata belongs to.
+        chunk_size (int): The leaf chunk size the tree was built with.
+        leaves (List[str]): The hexadecimal leaf hashes, in order.
+
+    Only the leaves are kept, the inner nodes are cheap to rebuild when a challenge arrives.
+    """
+    metadata = await r.hget(chunk_hash, hotkey)
+    if metadata is None:
+        bt.logging.warning(f"No metadata to attach merkle leaves to for {chunk_hash}")
+        return
+    metadata = json.loads(metadata)
+    metadata["merkle_chunk_size"] = chunk_size
+    metadata["merkle_leaves"] = "".join(leaves)
+    await r.hset(chunk_hash, hotkey, json.dumps(metadata))
+
+
 async def is_old_version(
     r: "aioredis.Strictredis", chunk_hash: str, hotkey: str = None
 ) -> bool:
@@ -289,6 +339,9 @@ async def get_total_storage_used(r: "aioredis.Strictredis") -> int:
     """
     Calculates the total storage used by all chunks in the Redis database.
 
+    This scans every key. The running miner tracks its usage incrementally with
+    `storage.miner.usage.StorageUsage` instead.
+
     Args:
         r (redis.Redis): The Redis connection instance.
 
@@ -338,7 +391,7 @@ async def migrate_data_directory(
 ) -> Optional[List[str]]:
     try:
         async for key in r.scan_iter("*"):
-            if await is_old_version(key):
+            if await is_old_version(r, key):
                 filepath = await r.hget(key, b"filepath")
                 filepath = filepath.decode("utf-8")
             else:
@@ -365,10 +418,10 @@ async def migrate_data_directory(
     failed_filepaths = []
     async for key in r.scan_iter("*"):
         # In case we still have laggards, convert to the new format
-        if await is_old_version(key):
+        if await is_old_version(r, key):
             await convert_to_new_format(r, key)
 
-        async for hotkey in await r.hkeys(key):
+        for hotkey in await r.hkeys(key):
             metadata = json.loads(await r.hget(key, hotkey))
             filepath = metadata.get("filepath")
 
@@ -405,3 +458,402 @@ async def migrate_data_directory(
         bt.logging.success("Successfully migrated all filepaths.")
 
     return failed_filepaths if return_failures else None
+
+
+FANOUT_PROGRESS_PATH = "migration_log/fanout_progress.json"
+
+
+def _load_fanout_progress(progress_path: str) -> Dict[str, Any]:
+    if os.path.isfile(progress_path):
+        with open(progress_path, "r") as f:
+            return json.load(f)
+    return {
+        "cursor": 0,
+        "stats": {"moved": 0, "skipped": 0, "missing": 0, "failed": 0},
+    }
+
+
+def _save_fanout_progress(progress_path: str, progress: Dict[str, Any]):
+    directory = os.path.dirname(progress_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{progress_path}.tmp"
+    with open(temp_path, "w") as f:
+        json.dump(progress, f)
+    os.replace(temp_path, progress_path)
+
+
+def _move_blob(source: str, target: str) -> bool:
+    if os.path.isfile(source):
+        os.makedirs(os.path.dirname(target), exist_ok=True)
+        os.replace(source, target)
+        return True
+    # Already moved by an interrupted run that did not get to update the index
+    return os.path.isfile(target)
+
+
+async def _update_filepath(
+    r: "aioredis.StrictRedis",
+    chunk_hash: bytes,
+    hotkey: bytes,
+    old_filepath: str,
+    new_filepath: str,
+) -> bool:
+    """
+    Points the metadata of `hotkey` at `new_filepath`, unless the miner rewrote it concurrently.
+    """
+    async with r.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(chunk_hash)
+                metadata_str = await pipe.hget(chunk_hash, hotkey)
+                if metadata_str is None:
+                    return False
+                metadata = json.loads(metadata_str)
+                if metadata.get("filepath") != old_filepath:
+                    return False
+                metadata["filepath"] = new_filepath
+                pipe.multi()
+                pipe.hset(chunk_hash, hotkey, json.dumps(metadata))
+                await pipe.execute()
+                return True
+            except WatchError:
+                continue
+
+
+async def _migrate_key_to_fanout(
+    r: "aioredis.StrictRedis", key: bytes, directory: str, fanout: int
+) -> Dict[str, int]:
+    stats = {"moved": 0, "skipped": 0, "missing": 0, "failed": 0}
+    if await is_old_version(r, key):
+        await convert_to_new_format(r, key)
+
+    data_hash = key.decode("utf-8")
+    for hotkey, metadata_str in (await r.hgetall(key)).items():
+        try:
+            filepath = json.loads(metadata_str).get("filepath")
+            hotkey_str = hotkey.decode("utf-8")
+            flat_filepath = get_blob_path(directory, hotkey_str, data_hash)
+            # Only blobs in the flat layout are moved, anything else keeps its recorded path
+            if filepath != flat_filepath:
+                stats["skipped"] += 1
+                continue
+
+            new_filepath = get_blob_path(directory, hotkey_str, data_hash, fanout)
+            if not await asyncio.to_thread(_move_blob, filepath, new_filepath):
+                stats["missing"] += 1
+                continue
+
+            if await _update_filepath(r, key, hotkey, filepath, new_filepath):
+                stats["moved"] += 1
+            else:
+                stats["skipped"] += 1
+        except Exception as e:
+            bt.logging.error(
+                f"Error migrating {data_hash} for {hotkey} with error: {e}"
+            )
+            stats["failed"] += 1
+    return stats
+
+
+async def migrate_to_fanout_layout(
+    r: "aioredis.StrictRedis",
+    directory: str,
+    fanout: int,
+    concurrency: int = 16,
+    batch_size: int = 500,
+    progress_path: str = FANOUT_PROGRESS_PATH,
+) -> Dict[str, int]:
+    """
+    Moves blobs from the flat `<directory>/<hotkey>/<hash>` layout into the hash-prefix fan-out
+    layout of `storage.miner.utils.get_blob_path`, and updates their metadata filepaths.
+
+    Keys are scanned in batches and migrated with at most `concurrency` keys in flight. The scan
+    cursor and running totals are checkpointed to `progress_path` after every batch, so an
+    interrupted migration resumes where it stopped; the file is removed once the scan completes.
+    Each step is idempotent, so keys revisited after a resume are safe. The miner may keep running:
+    filepaths are updated with an optimistic transaction and entries it rewrote are left alone.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        directory (str): The miner data directory, `--database.directory`.
+        fanout (int): Number of prefix directory levels, `--database.directory_fanout`.
+        concurrency (int): Maximum number of keys migrated at once.
+        batch_size (int): Number of keys requested per SCAN call.
+        progress_path (str): Where to checkpoint progress.
+
+    Returns:
+        dict: Counts of blobs moved, skipped (not in the flat layout), missing on disk and failed.
+    """
+    directory = os.path.expanduser(directory)
+    progress = _load_fanout_progress(progress_path)
+    stats = progress["stats"]
+    cursor = progress["cursor"]
+    if cursor:
+        bt.logging.info(f"Resuming fan-out migration from cursor {cursor} with {stats}")
+
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def migrate_key(key):
+        async with semaphore:
+            return await _migrate_key_to_fanout(r, key, directory, fanout)
+
+    while True:
+        cursor, keys = await r.scan(cursor, count=batch_size, _type="HASH")
+        for key_stats in await asyncio.gather(*[migrate_key(key) for key in keys]):
+            for name, count in key_stats.items():
+                stats[name] += count
+        if cursor == 0:
+            break
+        _save_fanout_progress(progress_path, {"cursor": cursor, "stats": stats})
+        bt.logging.debug(f"Fan-out migration checkpoint at cursor {cursor}: {stats}")
+
+    if os.path.isfile(progress_path):
+        os.remove(progress_path)
+    return stats
+
+
+def _is_expired(metadata: Dict[str, Any], now: float) -> bool:
+    generated = float(metadata.get("generated", 0))
+    ttl = int(metadata.get("ttl", 60 * 60 * 24 * 30))
+    return generated > 0 and generated + ttl < now
+
+
+async def compact_pack_segments(
+    r: "aioredis.StrictRedis",
+    pack_store: PackStore,
+    min_dead_ratio: float = 0.5,
+    now: Optional[float] = None,
+    usage: Optional[StorageUsage] = None,
+) -> Dict[str, int]:
+    """
+    Reclaims pack segment space held by expired and unreferenced blobs.
+
+    One pass:
+    1. Scans the index for packed blobs, releasing those past their ttl.
+    2. Unlinks the segments retired by the previous pass, after moving any reference to them that
+       was written back concurrently.
+    3. For each sealed segment whose share of unreferenced bytes is at least `min_dead_ratio`,
+       appends its live blobs to the active segment, repoints their metadata and retires it.
+
+    Metadata is only rewritten if it still holds the reference that was scanned, so the miner can
+    keep serving and storing while this runs.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        pack_store (PackStore): The miner's pack store.
+        min_dead_ratio (float): Fraction of a segment that must be reclaimable to rewrite it.
+        now (float, optional): Current time, for ttl expiry. Defaults to time.time().
+        usage (StorageUsage, optional): Tracker to report bytes written and freed to.
+
+    Returns:
+        dict: Counts of expired entries, moved blobs and compacted segments, and bytes freed.
+    """
+    now = now or time.time()
+    stats = {"expired": 0, "moved": 0, "segments": 0, "freed": 0}
+    retired = pack_store.retired_segments()
+
+    # segment -> {reference: [(chunk_hash, hotkey), ...]}
+    live: Dict[str, Dict[str, List]] = {}
+    async for key in r.scan_iter(_type="HASH"):
+        for hotkey, metadata_str in (await r.hgetall(key)).items():
+            try:
+                metadata = json.loads(metadata_str)
+                filepath = metadata.get("filepath") or ""
+            except (ValueError, AttributeError):
+                continue
+            packed = parse_pack_ref(filepath)
+            if packed is None:
+                continue
+            if _is_expired(metadata, now):
+                if await release_chunk(r, key, hotkey, filepath, usage):
+                    stats["expired"] += 1
+                continue
+            live.setdefault(packed[0], {}).setdefault(filepath, []).append(
+                (key, hotkey)
+            )
+
+    async def move_live_blobs(segment):
+        for ref, entries in live.get(segment, {}).items():
+            data = await asyncio.to_thread(load_from_filesystem, ref)
+            new_ref = await asyncio.to_thread(pack_store.append, data)
+            if usage is not None:
+                usage.add(len(data))
+            for key, hotkey in entries:
+                if await _update_filepath(r, key, hotkey, ref, new_ref):
+                    stats["moved"] += 1
+
+    for segment in retired:
+        await move_live_blobs(segment)
+    stats["freed"] = await asyncio.to_thread(pack_store.remove_retired, retired)
+    if usage is not None:
+        usage.add(-stats["freed"])
+
+    for segment in pack_store.sealed_segments():
+        size = os.path.getsize(segment)
+        live_size = sum(parse_pack_ref(ref)[2] for ref in live.get(segment, {}))
+        if size and (size - live_size) / size < min_dead_ratio:
+            continue
+        await move_live_blobs(segment)
+        pack_store.retire(segment)
+        stats["segments"] += 1
+        bt.logging.debug(
+            f"Compacted pack segment {segment}: {live_size} of {size} bytes live"
+        )
+    return stats
+
+
+async def get_blob_refcount(
+    r: "aioredis.StrictRedis", chunk_hash: str, filepath: str
+) -> int:
+    """
+    Counts the hotkeys whose metadata for a chunk points at a stored blob.
+
+    Every hotkey that stores the same data shares one physical copy, so this is the blob's
+    reference count. Keeping it implicit in the per-hotkey entries means it is updated atomically
+    with them and cannot drift.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        chunk_hash (str): The unique hash identifying the chunk.
+        filepath (str): The blob's path or pack reference.
+
+    Returns:
+        int: Number of hotkeys referencing the blob.
+    """
+    count = 0
+    for metadata_str in (await r.hgetall(chunk_hash)).values():
+        try:
+            if json.loads(metadata_str).get("filepath") == filepath:
+                count += 1
+        except (ValueError, AttributeError):
+            continue
+    return count
+
+
+async def get_packed_copy(
+    r: "aioredis.StrictRedis",
+    chunk_hash: str,
+    pack_store: Optional[PackStore] = None,
+) -> Optional[str]:
+    """
+    Returns the pack reference another hotkey already stored this chunk at, if any.
+
+    References into segments retired by `compact_pack_segments` are skipped, since the segment
+    may be unlinked before a reference recorded now would be moved.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        chunk_hash (str): The unique hash identifying the chunk.
+        pack_store (PackStore, optional): The miner's pack store, to skip its retired segments.
+
+    Returns:
+        str | None: A pack reference whose segment still exists and is not retired, or None.
+    """
+    retired = set(pack_store.retired_segments()) if pack_store is not None else set()
+    for metadata_str in (await r.hgetall(chunk_hash)).values():
+        try:
+            filepath = json.loads(metadata_str).get("filepath") or ""
+        except (ValueError, AttributeError):
+            continue
+        packed = parse_pack_ref(filepath)
+        if (
+            packed is not None
+            and packed[0] not in retired
+            and os.path.isfile(packed[0])
+        ):
+            return filepath
+    return None
+
+
+async def release_chunk(
+    r: "aioredis.StrictRedis",
+    chunk_hash: str,
+    hotkey: str,
+    filepath: Optional[str] = None,
+    usage: Optional[StorageUsage] = None,
+) -> bool:
+    """
+    Drops the metadata of a hotkey for a chunk, deleting the blob once no hotkey references it.
+
+    The blob is first renamed aside and the reference count checked again, so a `store` that
+    shared it in the meantime gets it back; `store` in turn rewrites a shared copy it finds
+    missing after recording its metadata. Packed blobs are left for `compact_pack_segments`.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        chunk_hash (str): The unique hash identifying the chunk.
+        hotkey (str): The hotkey whose reference is dropped.
+        filepath (str, optional): Only release if the metadata still points here.
+        usage (StorageUsage, optional): Tracker to report the bytes freed to.
+
+    Returns:
+        bool: Whether the metadata was removed.
+    """
+    async with r.pipeline(transaction=True) as pipe:
+        while True:
+            try:
+                await pipe.watch(chunk_hash)
+                metadata_str = await pipe.hget(chunk_hash, hotkey)
+                if metadata_str is None:
+                    return False
+                current = json.loads(metadata_str).get("filepath") or ""
+                if filepath is not None and current != filepath:
+                    return False
+                pipe.multi()
+                pipe.hdel(chunk_hash, hotkey)
+                await pipe.execute()
+                break
+            except WatchError:
+                continue
+
+    if not current or parse_pack_ref(current) is not None:
+        return True
+    if await get_blob_refcount(r, chunk_hash, current):
+        return True
+
+    released = f"{current}.released"
+    try:
+        await asyncio.to_thread(os.replace, current, released)
+    except FileNotFoundError:
+        return True
+    if await get_blob_refcount(r, chunk_hash, current):
+        await asyncio.to_thread(os.replace, released, current)
+    else:
+        size = os.path.getsize(released)
+        await asyncio.to_thread(os.remove, released)
+        if usage is not None:
+            usage.add(-size)
+    return True
+
+
+async def purge_expired_chunks(
+    r: "aioredis.StrictRedis",
+    now: Optional[float] = None,
+    usage: Optional[StorageUsage] = None,
+) -> int:
+    """
+    Releases every chunk entry past its ttl, see `release_chunk`.
+
+    Args:
+        r (redis.Redis): The Redis connection instance.
+        now (float, optional): Current time. Defaults to time.time().
+        usage (StorageUsage, optional): Tracker to report the bytes freed to.
+
+    Returns:
+        int: Number of entries released.
+    """
+    now = now or time.time()
+    released = 0
+    async for key in r.scan_iter(_type="HASH"):
+        for hotkey, metadata_str in (await r.hgetall(key)).items():
+            try:
+                metadata = json.loads(metadata_str)
+                expired = _is_expired(metadata, now)
+            except (ValueError, AttributeError, TypeError):
+                continue
+            if expired and await release_chunk(
+                r, key, hotkey, metadata.get("filepath") or "", usage
+            ):
+                released += 1
+    return released
@@ -0,0 +1,190 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import asyncio
+import functools
+import threading
+import bittensor as bt
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Set
+
+from .pack import PackStore, parse_pack_ref
+from .usage import StorageUsage
+from .utils import fsync_directory, get_blob_path, save_data_to_filesystem
+
+
+FSYNC_MODES = ("none", "batch", "always")
+
+
+def fsync_paths(paths):
+    """
+    Flushes files and their directories to disk, each directory once.
+
+    Parameters:
+    - paths (iterable): The file paths to flush. Files removed in the meantime are skipped.
+    """
+    directories = set()
+    for path in paths:
+        try:
+            fd = os.open(path, os.O_RDONLY)
+        except FileNotFoundError:
+            continue
+        try:
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        directories.add(os.path.dirname(path))
+    for directory in directories:
+        fsync_directory(directory)
+
+
+def _replace_file(data, directory, hotkey, filename, fsync=False, fanout=0):
+    # Saves like save_data_to_filesystem, also returning the change in bytes on disk
+    filepath = get_blob_path(directory, hotkey, filename, fanout)
+    try:
+        previous = os.path.getsize(filepath)
+    except FileNotFoundError:
+        previous = 0
+    filepath = save_data_to_filesystem(
+        data, directory, hotkey, filename, fsync=fsync, fanout=fanout
+    )
+    return filepath, len(data) - previous
+
+
+class IOExecutor:
+    """
+    Bounded thread pool for the miner's blocking disk I/O and whole-payload hashing.
+
+    The axon handlers await `run` (or `save`) instead of calling blocking functions directly,
+    so concurrent requests no longer serialize behind one slow disk write, and at most
+    `max_workers` of them touch the disk at once.
+
+    Writes go through `save_data_to_filesystem`, i.e. to a temporary file renamed into place,
+    or are appended to a pack segment by `append`.
+    Durability depends on `fsync`:
+        "none": leave flushing to the OS, as before.
+        "always": fsync each file and its directory before `save` returns.
+        "batch": `save` returns after the rename, and the files written within `fsync_interval`
+            seconds are flushed together by a single job.
+
+    Args:
+        max_workers (int): Number of I/O threads.
+        fsync (str): One of `FSYNC_MODES`.
+        fsync_interval (float): Seconds between batched flushes in "batch" mode.
+        usage (StorageUsage, optional): Tracker credited with the bytes written.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = 4,
+        fsync: str = "none",
+        fsync_interval=1.0,
+        usage: Optional[StorageUsage] = None,
+    ):
+        if fsync not in FSYNC_MODES:
+            raise ValueError(f"fsync must be one of {FSYNC_MODES}, got {fsync!r}")
+        self.fsync = fsync
+        self.fsync_interval = fsync_interval
+        self.usage = usage
+        self.executor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="miner-io"
+        )
+        self._dirty: Set[str] = set()
+        self._lock = threading.Lock()
+        self._flush_scheduled = False
+
+    async def run(self, fn: Callable, *args, **kwargs) -> Any:
+        """
+        Runs a blocking function on the I/O threads and returns its result.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            self.executor, functools.partial(fn, *args, **kwargs)
+        )
+
+    async def save(
+        self, data, directory: str, hotkey: str, filename: str, fanout: int = 0
+    ) -> str:
+        """
+        Saves data like `save_data_to_filesystem`, off the event loop.
+
+        Returns:
+            str: The full path to the saved file.
+        """
+        filepath, delta = await self.run(
+            _replace_file,
+            data,
+            directory,
+            hotkey,
+            filename,
+            fsync=self.fsync == "always",
+            fanout=fanout,
+        )
+        if self.usage is not None:
+            self.usage.add(delta)
+        if self.fsync == "batch":
+            self._mark_dirty(filepath)
+        return filepath
+
+    async def append(self, pack_store: PackStore, data) -> str:
+        """
+        Appends data to a pack segment, off the event loop, with the same durability as `save`.
+
+        Returns:
+            str: The pack reference of the blob.
+        """
+        filepath = await self.run(pack_store.append, data, fsync=self.fsync == "always")
+        if self.usage is not None:
+            self.usage.add(len(data))
+        if self.fsync == "batch":
+            self._mark_dirty(parse_pack_ref(filepath)[0])
+        return filepath
+
+    def _mark_dirty(self, path: str):
+        with self._lock:
+            self._dirty.add(path)
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            asyncio.get_running_loop().call_later(
+                self.fsync_interval, lambda: asyncio.ensure_future(self.flush())
+            )
+
+    async def flush(self):
+        """
+        Flushes the files written since the last batched flush.
+        """
+        self._flush_scheduled = False
+        with self._lock:
+            paths, self._dirty = self._dirty, set()
+        if paths:
+            try:
+                await self.run(fsync_paths, paths)
+            except Exception as e:
+                bt.logging.error(f"Batched fsync of {len(paths)} files failed: {e}")
+
+    def shutdown(self):
+        """
+        Flushes pending batched writes and stops the I/O threads.
+        """
+        with self._lock:
+            paths, self._dirty = self._dirty, set()
+        if paths:
+            fsync_paths(paths)
+        self.executor.shutdown(wait=True)
@@ -0,0 +1,186 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import re
+import threading
+from typing import List, Optional, Tuple
+
+
+PACK_DIRECTORY = "packs"
+PACK_SUFFIX = ".pack"
+
+# A blob inside a pack segment is referenced as "<segment path>#<offset>:<length>"
+_PACK_REF = re.compile(r"^(.+\.pack)#(\d+):(\d+)$")
+
+
+def format_pack_ref(segment: str, offset: int, length: int) -> str:
+    """
+    Builds the `filepath` stored in the metadata of a packed blob.
+    """
+    return f"{segment}#{offset}:{length}"
+
+
+def parse_pack_ref(filepath: str) -> Optional[Tuple[str, int, int]]:
+    """
+    Splits a packed blob `filepath` into its segment path, offset and length.
+
+    Parameters:
+    - filepath (str): A metadata filepath, either a plain file or a pack reference.
+
+    Returns:
+    - tuple | None: (segment, offset, length), or None for a plain file.
+    """
+    match = _PACK_REF.match(filepath)
+    if match is None:
+        return None
+    return match.group(1), int(match.group(2)), int(match.group(3))
+
+
+class PackStore:
+    """
+    Append-only segment files for small blobs.
+
+    Each blob is appended to the active segment, `<directory>/packs/<index>.pack`, and addressed
+    by the pack reference returned from `append`, which is stored as the blob's metadata
+    `filepath`. Readers (`open_blob`, `load_chunk_from_filesystem`) resolve references
+    transparently, so packed and plain blobs can live side by side. A new segment is started once
+    the active one reaches `segment_size` bytes.
+
+    Segments are never modified in place. Space held by expired or superseded blobs is reclaimed
+    by `storage.miner.database.compact_pack_segments`, which copies the live blobs of a sealed
+    segment forward and `retire`s it. Retired segments are only unlinked by the following
+    compaction pass, so requests that looked up the old reference just before it was rewritten
+    can still read it, and references written back in the meantime can be moved again.
+
+    Args:
+        directory (str): The miner data directory.
+        segment_size (int): Size in bytes at which the active segment is sealed.
+    """
+
+    def __init__(self, directory: str, segment_size: int = 256 * 1024 * 1024):
+        self.directory = os.path.join(os.path.expanduser(directory), PACK_DIRECTORY)
+        self.segment_size = segment_size
+        os.makedirs(self.directory, exist_ok=True)
+        self._lock = threading.Lock()
+        self._retired: List[str] = []
+
+        segments = self.segment_paths()
+        self._index = (
+            int(os.path.basename(segments[-1])[: -len(PACK_SUFFIX)]) if segments else 0
+        )
+        self._file = None
+        self._open_segment()
+
+    def segment_path(self, index: int) -> str:
+        return os.path.join(self.directory, f"{index:08d}{PACK_SUFFIX}")
+
+    def segment_paths(self) -> List[str]:
+        """
+        Returns the paths of all segments, oldest first.
+        """
+        return sorted(
+            os.path.join(self.directory, name)
+            for name in os.listdir(self.directory)
+            if name.endswith(PACK_SUFFIX)
+        )
+
+    @property
+    def active_segment(self) -> str:
+        return self.segment_path(self._index)
+
+    def sealed_segments(self) -> List[str]:
+        """
+        Returns the segments that no longer take appends and are not retired yet.
+        """
+        with self._lock:
+            active = self.active_segment
+            retired = set(self._retired)
+        return [
+            segment
+            for segment in self.segment_paths()
+            if segment != active and segment not in retired
+        ]
+
+    def _open_segment(self):
+        if self._file is not None:
+            self._file.close()
+        self._file = open(self.active_segment, "ab")
+        self._offset = self._file.tell()
+
+    def append(self, data, fsync: bool = False) -> str:
+        """
+        Appends a blob to the active segment.
+
+        Parameters:
+        - data (bytes): The blob.
+        - fsync (bool): Flush the segment to disk before returning. Defaults to False.
+
+        Returns:
+        - str: The pack reference to store as the blob's filepath.
+        """
+        with self._lock:
+            if self._offset and self._offset + len(data) > self.segment_size:
+                self._index += 1
+                self._open_segment()
+            offset = self._offset
+            self._file.write(data)
+            self._file.flush()
+            if fsync:
+                os.fsync(self._file.fileno())
+            self._offset += len(data)
+            return format_pack_ref(self.active_segment, offset, len(data))
+
+    def retire(self, segment: str):
+        """
+        Marks a sealed segment as unreferenced, excluding it from `sealed_segments`.
+        """
+        with self._lock:
+            self._retired.append(segment)
+
+    def retired_segments(self) -> List[str]:
+        with self._lock:
+            return list(self._retired)
+
+    def remove_retired(self, segments: List[str]) -> int:
+        """
+        Unlinks retired segments.
+
+        Parameters:
+        - segments (list): The segments to remove, from an earlier `retired_segments()`.
+
+        Returns:
+        - int: Number of bytes freed.
+        """
+        with self._lock:
+            self._retired = [s for s in self._retired if s not in segments]
+        freed = 0
+        for segment in segments:
+            try:
+                freed += os.path.getsize(segment)
+                os.remove(segment)
+            except FileNotFoundError:
+                pass
+        return freed
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
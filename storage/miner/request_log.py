@@ -0,0 +1,179 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import json
+import time
+import threading
+import bittensor as bt
+from collections import OrderedDict, deque
+from typing import Deque, List, Optional, Tuple
+
+
+class RequestLog:
+    """
+    Bounded, persistent log of the requests each caller sent to the miner.
+
+    Each caller keeps a ring buffer of its last `max_entries` `(synapse name, timestamp)` pairs,
+    and at most `max_callers` callers are kept, the least recently seen being dropped first.
+    Memory use is therefore bounded however long the miner runs, and `count` is cheap enough for
+    the rate limit in the blacklist functions.
+
+    Entries are appended to `path` as JSON lines, buffered until `flush`. Once the file holds
+    `compact_factor` times more lines than the buffers, it is rewritten with just their contents,
+    so the file and the start-up time stay bounded too. A log in the previous single-JSON-object
+    format is read once and rewritten in the new one.
+
+    Args:
+        path (str): The log file.
+        max_entries (int): Requests kept per caller.
+        max_callers (int): Callers kept.
+        compact_factor (int): Ratio of file lines to kept entries that triggers a compaction.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        max_entries: int = 256,
+        max_callers: int = 4096,
+        compact_factor: int = 4,
+    ):
+        self.path = path
+        self.max_entries = max_entries
+        self.max_callers = max_callers
+        self.compact_factor = compact_factor
+        self._requests: "OrderedDict[str, Deque[Tuple[str, float]]]" = OrderedDict()
+        self._pending: List[str] = []
+        self._lines = 0
+        self._lock = threading.Lock()
+        self._load()
+
+    def _record(self, caller: str, name: str, timestamp: float):
+        requests = self._requests.get(caller)
+        if requests is None:
+            requests = self._requests[caller] = deque(maxlen=self.max_entries)
+            if len(self._requests) > self.max_callers:
+                self._requests.popitem(last=False)
+        else:
+            self._requests.move_to_end(caller)
+        requests.append((name, timestamp))
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        legacy = False
+        try:
+            with open(self.path, "r") as f:
+                if f.read(1) == "{":
+                    # Previous format: one JSON object of caller -> [[name, timestamp], ...]
+                    f.seek(0)
+                    for caller, requests in json.load(f).items():
+                        for name, timestamp in requests[-self.max_entries :]:
+                            self._record(caller, name, timestamp)
+                    legacy = True
+                else:
+                    f.seek(0)
+                    for line in f:
+                        self._lines += 1
+                        try:
+                            caller, name, timestamp = json.loads(line)
+                        except ValueError:
+                            # Torn write at the tail
+                            continue
+                        self._record(caller, name, timestamp)
+        except Exception as e:
+            bt.logging.error(f"Error loading request log: {e}. Resetting.")
+            self._requests.clear()
+            legacy = True
+        if legacy or self._needs_compaction():
+            self.compact()
+
+    def log(self, caller: str, name: str, timestamp: Optional[float] = None):
+        """
+        Records a request from `caller` for the synapse `name`.
+        """
+        timestamp = time.time() if timestamp is None else timestamp
+        with self._lock:
+            self._record(caller, name, timestamp)
+            self._pending.append(json.dumps([caller, name, timestamp]) + "\n")
+
+    def count(
+        self, caller: str, name: Optional[str] = None, window: Optional[float] = None
+    ) -> int:
+        """
+        Counts the kept requests of a caller, optionally for one synapse and the last `window`
+        seconds only.
+        """
+        since = time.time() - window if window is not None else float("-inf")
+        with self._lock:
+            requests = list(self._requests.get(caller, ()))
+        return sum(
+            1
+            for request_name, timestamp in requests
+            if timestamp >= since and (name is None or request_name == name)
+        )
+
+    def callers(self) -> List[str]:
+        """
+        Returns the callers in the log, least recently seen first.
+        """
+        with self._lock:
+            return list(self._requests)
+
+    def _needs_compaction(self) -> bool:
+        entries = sum(len(requests) for requests in self._requests.values())
+        return self._lines > self.compact_factor * max(entries, self.max_entries)
+
+    def flush(self):
+        """
+        Appends the requests logged since the last flush to the file, compacting it if needed.
+        """
+        with self._lock:
+            pending, self._pending = self._pending, []
+        if pending:
+            directory = os.path.dirname(self.path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.writelines(pending)
+            self._lines += len(pending)
+        if self._needs_compaction():
+            self.compact()
+
+    def compact(self):
+        """
+        Rewrites the file with only the requests currently kept.
+        """
+        with self._lock:
+            lines = [
+                json.dumps([caller, name, timestamp]) + "\n"
+                for caller, requests in self._requests.items()
+                for name, timestamp in requests
+            ]
+            # Pending entries are already in the buffers
+            self._pending = []
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        temp_path = f"{self.path}.tmp"
+        with open(temp_path, "w") as f:
+            f.writelines(lines)
+        os.replace(temp_path, self.path)
+        self._lines = len(lines)
+        bt.logging.debug(f"Compacted request log to {len(lines)} entries")
@@ -16,7 +16,6 @@
 # OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
 # DEALINGS IN THE SOFTWARE.
 
-import json
 import time
 import wandb
 import asyncio
@@ -209,8 +208,7 @@ def run(self):
         if new_epoch or should_retry:
             bt.logging.info("Saving request log")
             try:
-                with open(self.config.miner.request_log_path, "w") as f:
-                    json.dump(self.request_log, f)
+                self.request_log.flush()
             except Exception as e:
                 bt.logging.warning(f"Unable to save request log to disk {e}")
 
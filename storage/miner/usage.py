@@ -0,0 +1,126 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import os
+import time
+import threading
+import bittensor as bt
+
+
+def walk_directory_size(
+    path: str, pause_every: int = 1000, pause: float = 0.001
+) -> int:
+    """
+    Sums the size of the regular files under a directory, yielding the disk regularly.
+
+    Parameters:
+    - path (str): The directory to walk.
+    - pause_every (int): Number of entries between pauses.
+    - pause (float): Seconds to sleep at each pause, so the walk does not starve request I/O.
+
+    Returns:
+    - int: The total size in bytes.
+    """
+    total_size = 0
+    visited = 0
+    pending = [os.path.expanduser(path)]
+    while pending:
+        try:
+            entries = os.scandir(pending.pop())
+        except FileNotFoundError:
+            continue
+        with entries:
+            for entry in entries:
+                visited += 1
+                if pause and visited % pause_every == 0:
+                    time.sleep(pause)
+                try:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.is_file(follow_symlinks=False):
+                        total_size += entry.stat(follow_symlinks=False).st_size
+                except FileNotFoundError:
+                    # Removed while walking
+                    continue
+    return total_size
+
+
+class StorageUsage:
+    """
+    Bytes the miner holds on disk under its data directory, tracked incrementally.
+
+    Every write and delete reports its size change through `add`, so reading `bytes` is constant
+    time however many blobs are stored. `reconcile` walks the directory to correct any drift,
+    e.g. from files changed outside the miner, and is meant to run rarely in the background.
+
+    Args:
+        directory (str): The miner data directory.
+    """
+
+    def __init__(self, directory: str):
+        self.directory = os.path.expanduser(directory)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self._walk_delta = None
+        self.last_reconciled = None
+
+    @property
+    def bytes(self) -> int:
+        return self._bytes
+
+    def add(self, delta: int):
+        """
+        Records a change in the bytes stored, positive for writes and negative for deletes.
+        """
+        if not delta:
+            return
+        with self._lock:
+            self._bytes += delta
+            if self._walk_delta is not None:
+                self._walk_delta += delta
+
+    def reconcile(self, pause: float = 0.001) -> int:
+        """
+        Recomputes the usage from the directory contents.
+
+        Changes reported while the walk runs are applied on top of its result, so writes and
+        deletes can continue meanwhile. Files changed during the walk may still be off by
+        their own size until the next reconciliation.
+
+        Args:
+            pause (float): Seconds to sleep every thousand entries, see `walk_directory_size`.
+
+        Returns:
+            int: The drift that was corrected, in bytes.
+        """
+        with self._lock:
+            self._walk_delta = 0
+        try:
+            size = walk_directory_size(self.directory, pause=pause)
+        finally:
+            with self._lock:
+                walk_delta, self._walk_delta = self._walk_delta, None
+                walked_at = self._bytes
+        with self._lock:
+            # Changes made since the walk ended were already added to _bytes directly.
+            size += walk_delta + self._bytes - walked_at
+            drift, self._bytes = size - self._bytes, size
+        self.last_reconciled = time.time()
+        bt.logging.debug(f"Reconciled miner storage usage, drift {drift} bytes")
+        return drift
@@ -17,24 +17,27 @@
 # DEALINGS IN THE SOFTWARE.
 
 import os
+import hashlib
 import json
 import time
 import shutil
+import tempfile
 import storage
 import wandb
 import copy
 import asyncio
 import multiprocessing
 import bittensor as bt
-from collections import deque
 
 from ..shared.ecc import (
     ecc_point_to_hex,
     hash_data,
+    hash_data_parts,
 )
-from ..shared.merkle import (
-    MerkleTree,
-)
+from ..shared.merkle import MerkleTree
+from .commitment import assemble_commitments
+from .pack import parse_pack_ref
+from .request_log import RequestLog
 
 
 def commit_data_with_seed(committer, data_chunks, n_chunks, seed):
@@ -58,33 +61,90 @@ def commit_data_with_seed(committer, data_chunks, n_chunks, seed):
     This function handles the conversion of commitment points to hex format and adds them to the
     Merkle tree. The completed tree represents the combined commitments.
     """
-    merkle_tree = MerkleTree()
+    chunks = list(data_chunks)
+    commitments = []
+    for chunk in chunks:
+        c, m_val, r = committer.commit(b"".join((chunk, str(seed).encode())))
+        commitments.append((r, ecc_point_to_hex(c)))
+    return assemble_commitments(chunks, commitments, n_chunks)
+
+
+# Content-addressed blobs, shared by every hotkey that stores the same data, live under this
+# directory in place of a hotkey directory
+SHARED_BLOB_DIRECTORY = "blobs"
+
+
+def get_blob_path(directory, hotkey, filename, fanout=0):
+    """
+    Builds the path a blob is stored at.
+
+    With `fanout` levels, the blob goes under that many two-character hash-prefix directories,
+    e.g. `<directory>/<hotkey>/3f/a2/<filename>` for 2 levels, so no directory holds more than
+    a few thousand entries. 0 is the flat `<directory>/<hotkey>/<filename>` layout.
+
+    Parameters:
+    - directory (str): The base data directory.
+    - hotkey (str): The hotkey associated with the data.
+    - filename (str): The name of the blob, usually its decimal data hash.
+    - fanout (int): Number of prefix directory levels. Defaults to 0.
+
+    Returns:
+    - str: The full path for the blob.
+    """
+    prefix = hashlib.sha3_256(filename.encode()).hexdigest()
+    levels = [prefix[2 * i : 2 * i + 2] for i in range(fanout)]
+    return os.path.join(os.path.expanduser(directory), hotkey, *levels, filename)
 
-    # Commit each chunk of data
-    randomness, chunks, points = [None] * n_chunks, [None] * n_chunks, [None] * n_chunks
-    for index, chunk in enumerate(data_chunks):
-        c, m_val, r = committer.commit(chunk + str(seed).encode())
-        c_hex = ecc_point_to_hex(c)
-        randomness[index] = r
-        chunks[index] = chunk
-        points[index] = c_hex
-        merkle_tree.add_leaf(c_hex)
-
-    # Create the tree from the leaves
-    merkle_tree.make_tree()
-    return randomness, chunks, points, merkle_tree
+
+def find_blob_path(directory, hotkey, filename, fanout=0):
+    """
+    Locates a blob whose metadata has no filepath, trying the shared content-addressed copy, then
+    the per-hotkey fan-out and flat layouts and finally the legacy `<directory>/<filename>` layout.
+
+    Returns:
+    - str | None: The first existing path, or None if the blob is in none of them.
+    """
+    candidates = [
+        get_blob_path(directory, SHARED_BLOB_DIRECTORY, filename, fanout),
+        get_blob_path(directory, hotkey, filename, fanout),
+        get_blob_path(directory, hotkey, filename),
+        os.path.join(os.path.expanduser(directory), filename),
+    ]
+    for candidate in candidates:
+        if os.path.isfile(candidate):
+            return candidate
+    return None
 
 
-def save_data_to_filesystem(data, directory, hotkey, filename):
+def fsync_directory(directory):
+    """
+    Flushes a directory entry to disk, making renames and new files in it durable.
+
+    Parameters:
+    - directory (str): The directory to flush.
+    """
+    fd = os.open(directory, os.O_RDONLY)
+    try:
+        os.fsync(fd)
+    finally:
+        os.close(fd)
+
+
+def save_data_to_filesystem(data, directory, hotkey, filename, fsync=False, fanout=0):
     """
     Saves data to the filesystem at the specified directory and filename. If the directory does
     not exist, it is created.
 
+    The data is written to a hidden temporary file in the same directory and renamed into place,
+    so readers never see a partially written file.
+
     Parameters:
     - data: The data to be saved.
     - directory (str): The directory path where the data should be saved.
     - hotkey (str): The hotkey associated with the data.
     - filename (str): The name of the file to save the data in.
+    - fsync (bool): Flush the file and directory to disk before returning. Defaults to False.
+    - fanout (int): Number of hash-prefix directory levels, see `get_blob_path`. Defaults to 0.
 
     Returns:
     - file_path (str): The full path to the saved file.
@@ -92,11 +152,27 @@ def save_data_to_filesystem(data, directory, hotkey, filename):
     This function is useful for persisting data to the disk.
     """
     # Ensure the directory exists
-    directory = os.path.join(os.path.expanduser(directory), hotkey)
+    file_path = get_blob_path(directory, hotkey, filename, fanout)
+    directory = os.path.dirname(file_path)
     os.makedirs(directory, exist_ok=True)
-    file_path = os.path.join(directory, filename)
-    with open(file_path, "wb") as file:
-        file.write(data)
+    fd, temp_path = tempfile.mkstemp(
+        dir=directory, prefix=f".{filename}.", suffix=".tmp"
+    )
+    try:
+        with os.fdopen(fd, "wb") as file:
+            # mkstemp creates owner-only files, keep the permissions plain writes had
+            os.fchmod(file.fileno(), 0o644)
+            file.write(data)
+            if fsync:
+                file.flush()
+                os.fsync(file.fileno())
+        os.replace(temp_path, file_path)
+    except BaseException:
+        if os.path.exists(temp_path):
+            os.remove(temp_path)
+        raise
+    if fsync:
+        fsync_directory(directory)
     return file_path
 
 
@@ -112,11 +188,64 @@ def load_from_filesystem(filepath):
 
     This function is a straightforward utility for reading binary data from a file.
     """
+    packed = parse_pack_ref(filepath)
+    if packed is not None:
+        segment, offset, length = packed
+        with open(os.path.expanduser(segment), "rb") as file:
+            file.seek(offset)
+            return file.read(length)
     with open(os.path.expanduser(filepath), "rb") as file:
         data = file.read()
     return data
 
 
+def load_chunk_from_filesystem(filepath, index, chunk_size):
+    """
+    Loads a single chunk of a stored file without reading the rest of it.
+
+    Parameters:
+    - filepath (str): The path to the stored file, or a pack reference.
+    - index (int): Index of the chunk to load.
+    - chunk_size (int): Size of each chunk in bytes.
+
+    Returns:
+    - data: The chunk, shorter than chunk_size for the last chunk of the file.
+    """
+    packed = parse_pack_ref(filepath)
+    if packed is not None:
+        segment, offset, length = packed
+        start = min(index * chunk_size, length)
+        with open(os.path.expanduser(segment), "rb") as file:
+            file.seek(offset + start)
+            return file.read(min(chunk_size, length - start))
+    with open(os.path.expanduser(filepath), "rb") as file:
+        file.seek(index * chunk_size)
+        data = file.read(chunk_size)
+    return data
+
+
+def load_merkle_tree(metadata, chunk_size):
+    """
+    Rebuilds the store-time hash tree kept in a chunk's metadata.
+
+    Parameters:
+    - metadata (dict): The chunk metadata, see `store_merkle_leaves`.
+    - chunk_size (int): The leaf chunk size the caller expects.
+
+    Returns:
+    - MerkleTree | None: The tree, or None if no tree was kept for this chunk size.
+    """
+    if metadata.get("merkle_chunk_size") != chunk_size:
+        return None
+    leaves = metadata.get("merkle_leaves", "")
+    if not leaves:
+        return None
+    merkle_tree = MerkleTree()
+    merkle_tree.add_leaf_digests(bytes.fromhex(leaves))
+    merkle_tree.make_tree()
+    return merkle_tree
+
+
 def compute_subsequent_commitment(data, previous_seed, new_seed, verbose=False):
     """
     Computes a new commitment based on provided data and a change from an old seed to a new seed.
@@ -124,7 +253,8 @@ def compute_subsequent_commitment(data, previous_seed, new_seed, verbose=False):
     altering the underlying data.
 
     Parameters:
-    - data: The original data for which the commitment is being updated.
+    - data: The original data for which the commitment is being updated. Any bytes-like
+      object, e.g. the memoryview from `open_blob`; it is hashed without being copied.
     - previous_seed: The seed used in the previous commitment.
     - new_seed: The seed to be used for the new commitment.
     - verbose (bool): If True, additional debug information will be printed. Defaults to False.
@@ -140,7 +270,7 @@ def compute_subsequent_commitment(data, previous_seed, new_seed, verbose=False):
         bt.logging.debug("type of data     :", type(data))
         bt.logging.debug("type of prev_seed:", type(previous_seed))
         bt.logging.debug("type of new_seed :", type(new_seed))
-    proof = hash_data(data + previous_seed)
+    proof = hash_data_parts(data, previous_seed)
     return hash_data(str(proof).encode("utf-8") + new_seed), proof
 
 
@@ -264,79 +394,67 @@ def update_storage_stats(self):
 
     This function updates the miner's storage statistics, including the free disk space, current storage usage,
     and percent disk usage. It's useful for understanding the storage capacity and usage of the system where
-    the miner is running.
+    the miner is running. The usage comes from the miner's incremental `StorageUsage` tracker rather than a
+    directory walk.
     """
 
     self.free_memory = get_free_disk_space()
     bt.logging.info(f"Free memory: {self.free_memory} bytes")
-    self.current_storage_usage = get_directory_size(self.config.database.directory)
+    self.current_storage_usage = self.storage_usage.bytes
     bt.logging.info(f"Miner storage usage: {self.current_storage_usage} bytes")
-    self.percent_disk_usage = self.current_storage_usage / (self.free_memory + self.current_storage_usage)
+    self.percent_disk_usage = self.current_storage_usage / (
+        self.free_memory + self.current_storage_usage
+    )
     bt.logging.info(f"Miner % disk usage : {100 * self.percent_disk_usage:.3f}%")
 
 
-def load_request_log(request_log_path: str) -> dict:
+def load_request_log(request_log_path: str, **kwargs) -> RequestLog:
     """
     Loads the request logger from disk if it exists.
 
     Args:
-        log_path (str): The path to the directory containing the request log.
+        request_log_path (str): The path to the request log file.
+        **kwargs: Bounds passed on to `RequestLog`.
 
     Returns:
-        Dict: The request log data, if it exists, or an empty dictionary.
-
-    This method loads the request log from disk if it exists. If not, it returns an empty dictionary.
-    """
-    if os.path.exists(request_log_path):
-        try:
-            with open(request_log_path, "r") as f:
-                request_log = json.load(f)
-        except Exception as e:
-            bt.logging.error(f"Error loading request log: {e}. Resetting.")
-            request_log = {}
-    else:
-        request_log = {}
-    return request_log
+        RequestLog: The request log, empty if there was none on disk.
+
+    This method loads the request log from disk if it exists, converting a log in the previous
+    single JSON object format.
+    """
+    return RequestLog(request_log_path, **kwargs)
 
 
-def log_request(synapse: "bt.Synapse", request_log: dict):
+def log_request(synapse: "bt.Synapse", request_log: RequestLog):
     """
     Log the request and store the timestamp of each request.
 
     Args:
         synapse (bt.Synapse): The synapse object with the request details.
-        request_log (dict): The dictionary to log request timestamps.
+        request_log (RequestLog): The log to record the request in.
 
     The function logs the time of each request in the request log and the request type.
     """
-    current_time = time.time()
-    caller = synapse.dendrite.hotkey
-    if caller not in request_log:
-        request_log[caller] = []
-
-    request_log[caller].append((synapse.name, current_time))
+    request_log.log(synapse.dendrite.hotkey, synapse.name)
     return request_log
 
 
-class RateLimiter:
-    def __init__(self, max_requests, time_window):
-        self.max_requests = max_requests
-        self.time_window = time_window
-        self.requests = deque()
+def is_rate_limited(
+    request_log: RequestLog, caller: str, max_requests: int, time_window: float
+) -> bool:
+    """
+    Checks whether a caller exceeded the rate limit, from the requests in the request log.
 
-    def is_allowed(self, caller):
-        current_time = time.time()
-        while (
-            self.requests
-            and current_time - self.requests[0]["timestamp"] > self.time_window
-        ):
-            self.requests.popleft()
+    Args:
+        request_log (RequestLog): The log the caller's requests, including this one, are recorded in.
+        caller (str): The hotkey of the caller.
+        max_requests (int): Maximum number of requests allowed within the time window.
+        time_window (float): The time window in seconds.
 
-        if len(self.requests) < self.max_requests:
-            self.requests.append({"caller": caller, "timestamp": current_time})
-            return True
-        else:
-            return False
+    Returns:
+        bool: True if the caller sent more than `max_requests` requests within the last `time_window`.
+    """
+    return request_log.count(caller, window=time_window) > max_requests
 
 
 def get_purge_ttl_script_path(current_dir):
@@ -394,6 +512,7 @@ def run_async_in_sync_context(
     def sync_wrapper(self):
         async def run_async_coro():
             await asyncio.gather(coroutine_function(*args))
+
         loop.run_until_complete(run_async_coro())
 
     process = multiprocessing.Process(target=sync_wrapper, args=args)
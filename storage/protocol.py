@@ -21,6 +21,13 @@ import pydantic
 import bittensor as bt
 
 
+# Challenge modes. In "full" mode the miner re-chunks and commits the whole file for every
+# challenge. In "precomputed" mode it answers from the chunk hash tree it built at store time
+# (see `Store.merkle_chunk_size`), reading and committing only the challenged chunk.
+CHALLENGE_MODE_FULL = "full"
+CHALLENGE_MODE_PRECOMPUTED = "precomputed"
+
+
 # Basically setup for a given piece of data
 class Store(bt.Synapse):
     # Data to store
@@ -42,6 +49,13 @@ class Store(bt.Synapse):
     commitment_hash: typing.Optional[str] = None  # includes seed
     ttl: typing.Optional[int] = None  # time to live (in seconds)
 
+    # Opt-in: chunk size of the hash tree the miner keeps for precomputed challenges
+    merkle_chunk_size: typing.Optional[int] = None
+
+    # Point encoding version (see `storage.shared.ecc`). The validator sends the highest version
+    # it accepts, the miner answers with the version it used. Peers predating the field use 0.
+    point_encoding: int = 0
+
     required_hash_fields: typing.List[str] = pydantic.Field(
         [
             "curve",
@@ -101,6 +115,13 @@ class Challenge(bt.Synapse):
     curve: str
     seed: typing.Union[str, int]  # random seed for the commitment
 
+    # Requested challenge mode. Miners without a store-time tree for this data (or that
+    # predate the field) answer a full challenge, which validators still accept.
+    mode: str = CHALLENGE_MODE_FULL
+
+    # Point encoding version, as in `Store.point_encoding`
+    point_encoding: int = 0
+
     # Returns
     # - commitment hash (hex string) hash( hash( data + prev_seed ) + seed )
     # - commitment (point represented as hex string)
@@ -142,6 +163,7 @@ class Challenge(bt.Synapse):
             f"g={self.g}, "
             f"h={self.h}, "
             f"curve={self.curve}, "
+            f"mode={self.mode}, "
             f"seed={str(self.seed[:12])}, "
             f"commitment_hash={str(self.commitment_hash[:12])}, "
             f"commitment_proof={str(self.commitment_proof[:12])}, "
@@ -17,8 +17,19 @@
 # DEALINGS IN THE SOFTWARE.
 
 import json
+import struct
 import hashlib
-import binascii
+from array import array
+from itertools import accumulate
+
+
+# Binary format: header (magic, flags, digest size, leaf count, leaf width or 0 if the leaves vary
+# in width), the leaf widths as uint32 if they vary, then every level from the leaves up as its
+# concatenated nodes. Only the leaf widths are stored, the other node widths follow from the shape.
+_BINARY_MAGIC = b"MKT1"
+_BINARY_HEADER = struct.Struct("<4sBBQI")
+_BINARY_BUILT = 1
+_BINARY_READY = 2
 
 
 class MerkleTree(object):
@@ -27,18 +38,25 @@ class MerkleTree(object):
     integrity of large sets of data. The Merkle Tree is a binary tree where each leaf node is the hash
     of a data block and every non-leaf node is the hash of its children nodes.
 
+    Each level is kept as one contiguous buffer of its concatenated nodes plus an array of node
+    offsets, rather than one object per node. Leaves are usually digests, but may be any width
+    (e.g. commitment points). `serialize_binary` writes the level buffers out as they are.
+
     Attributes:
         hash_function (callable): The hash function used for generating hashes of the blocks
                                   and non-leaf nodes in the Merkle Tree.
-        leaves (list): A list where each element is a bytearray representing the hashed value of a leaf.
-        levels (list of lists): A list of lists where each sublist represents a level of the tree, starting
-                                from the leaves up to the root.
+        digest_size (int): Size in bytes of every non-leaf node, except promoted odd end nodes.
+        leaves (list): The leaves as a list of bytearrays, built on access.
+        levels (list of lists): The levels as lists of bytearrays, from the root down to the leaves,
+                                built on access.
         is_ready (bool): Indicates whether the tree has been fully constructed and is ready to provide
                          the Merkle root and proofs.
 
     Methods:
-        add_leaf(values, do_hash=False): Adds one or multiple leaves to the tree. If `do_hash` is True,
-                                         it will hash the values before adding them as leaves.
+        add_leaf(values, do_hash=False): Adds one or multiple leaves to the tree, as hexadecimal strings
+                                         or raw digests. If `do_hash` is True, it will hash the values
+                                         before adding them as leaves.
+        add_leaf_digests(digests): Adds leaves from one buffer of concatenated raw digests.
         get_leaf(index): Retrieves the hexadecimal string representation of a leaf at the given index.
         get_leaf_count(): Returns the total number of leaves in the tree.
         get_tree_ready_state(): Checks if the tree has been fully constructed.
@@ -48,11 +66,16 @@ class MerkleTree(object):
         get_proof(index): Generates a proof of inclusion for the leaf at the given index. This proof
                           consists of a list of sibling hashes that, when combined with the target leaf,
                           can reproduce the Merkle root.
+        get_multiproof(indices): Generates one proof of inclusion for several leaves at once, sharing the
+                                 sibling hashes their paths have in common.
         update_leaf(index, new_value): Updates the value of the leaf at the given index with `new_value`
                                       and recalculates the hashes up the tree to reflect this change.
         serialize(): Converts the Merkle Tree into a JSON-formatted string for storage or transmission.
         deserialize(json_data, hash_type="sha3_256"): Reconstructs the Merkle Tree from a JSON string,
                                                       using the specified hash function.
+        serialize_binary(): Converts the Merkle Tree into a compact binary representation.
+        deserialize_binary(data, hash_type="sha3_256"): Reconstructs the Merkle Tree from `serialize_binary`
+                                                        output.
 
     Raises:
         Exception: If the `hash_type` provided during initialization is not supported or recognized.
@@ -78,10 +101,10 @@ class MerkleTree(object):
         merkle_tree.make_tree()
 
         # Serialize the tree for storage
-        serialized_tree = merkle_tree.serialize()
+        serialized_tree = merkle_tree.serialize_binary()
 
         # Deserialize the tree for later use
-        deserialized_tree = MerkleTree.deserialize(serialized_tree, hash_type='sha3_256')
+        deserialized_tree = MerkleTree.deserialize_binary(serialized_tree, hash_type='sha3_256')
 
     Note:
         The hash_function attribute is determined by the hash_type parameter provided at initialization.
@@ -95,61 +118,128 @@ class MerkleTree(object):
             self.hash_function = getattr(hashlib, hash_type)
         else:
             raise Exception("`hash_type` {} nor supported".format(hash_type))
+        self.digest_size = self.hash_function().digest_size
 
         self.reset_tree()
 
     def __eq__(self, other):
         if not isinstance(other, MerkleTree):
             return False
-        return self.serialize() == other.serialize()
-
-    def _to_hex(self, x):
-        try:  # python3
-            return x.hex()
-        except:  # python2 # TODO: do not use bare except
-            return binascii.hexlify(x)
+        return (
+            self.is_ready == other.is_ready
+            and self._leaf_offsets == other._leaf_offsets
+            and self._leaves == other._leaves
+            and self._levels == other._levels
+        )
 
     def reset_tree(self):
-        self.leaves = list()
-        self.levels = None
+        # Leaf values back to back, and the offset of each leaf plus the end offset
+        self._leaves = bytearray()
+        self._leaf_offsets = array("Q", [0])
+        # Levels and their offsets from the leaves up to the root, or None before make_tree.
+        # The leaf level is `_leaves` itself.
+        self._levels = None
+        self._offsets = None
         self.is_ready = False
 
+    @staticmethod
+    def _split(buffer, offsets):
+        return [
+            bytearray(buffer[offsets[i] : offsets[i + 1]])
+            for i in range(len(offsets) - 1)
+        ]
+
+    @property
+    def leaves(self):
+        return self._split(self._leaves, self._leaf_offsets)
+
+    @property
+    def levels(self):
+        if self._levels is None:
+            return None
+        return [
+            self._split(level, offsets)
+            for level, offsets in zip(reversed(self._levels), reversed(self._offsets))
+        ]
+
     def add_leaf(self, values, do_hash=False):
         self.is_ready = False
         # check if single leaf
         if not isinstance(values, tuple) and not isinstance(values, list):
             values = [values]
-        for v in values:
-            if do_hash:
-                v = v.encode("utf-8")
-                v = self.hash_function(v).hexdigest()
-            v = bytearray.fromhex(v)
-            self.leaves.append(v)
+        if do_hash:
+            hash_function = self.hash_function
+            values = [
+                hash_function(v.encode("utf-8") if isinstance(v, str) else v).digest()
+                for v in values
+            ]
+        else:
+            values = [bytes.fromhex(v) if isinstance(v, str) else v for v in values]
+        start = len(self._leaves)
+        self._leaves += b"".join(values)
+        self._leaf_offsets.extend(
+            [start + end for end in accumulate([len(v) for v in values])]
+        )
+
+    def add_leaf_digests(self, digests):
+        """
+        Adds one leaf per digest from a buffer of concatenated raw digests, e.g. `b"".join(digests)`.
+
+        Raises:
+            ValueError: If the buffer length is not a multiple of the digest size.
+        """
+        d = self.digest_size
+        if len(digests) % d:
+            raise ValueError(f"Digest buffer length must be a multiple of {d}")
+        self.is_ready = False
+        start = len(self._leaves)
+        self._leaves += digests
+        self._leaf_offsets.extend(range(start + d, len(self._leaves) + 1, d))
 
     def get_leaf(self, index):
-        return self._to_hex(self.leaves[index])
+        index = range(self.get_leaf_count())[index]
+        offsets = self._leaf_offsets
+        return self._leaves[offsets[index] : offsets[index + 1]].hex()
 
     def get_leaf_count(self):
-        return len(self.leaves)
+        return len(self._leaf_offsets) - 1
 
     def get_tree_ready_state(self):
         return self.is_ready
 
-    def _calculate_next_level(self):
-        solo_leave = None
-        N = len(self.levels[0])  # number of leaves on the level
-        if N % 2 == 1:  # if odd number of leaves on the level
-            solo_leave = self.levels[0][-1]
-            N -= 1
-
-        new_level = []
-        for l, r in zip(self.levels[0][0:N:2], self.levels[0][1:N:2]):
-            new_level.append(self.hash_function(l + r).digest())
-        if solo_leave is not None:
-            new_level.append(solo_leave)
-        self.levels = [
-            new_level,
-        ] + self.levels  # prepend new level
+    def _next_offsets(self, offsets):
+        """
+        Returns the offsets of the level above a level with the given offsets: one digest per pair,
+        and the odd end node, if any, promoted unchanged.
+        """
+        d = self.digest_size
+        pairs = (len(offsets) - 1) // 2
+        next_offsets = array("Q", range(0, d * pairs + 1, d))
+        if len(offsets) % 2 == 0:  # odd number of nodes on the level
+            next_offsets.append(next_offsets[-1] + offsets[-1] - offsets[-2])
+        return next_offsets
+
+    def _calculate_next_level(self, level, offsets):
+        hash_function = self.hash_function
+        paired = len(offsets) - 1 - (len(offsets) % 2 == 0)
+        width = offsets[1]
+        if offsets[: paired + 1] == array(
+            "Q", range(0, paired * width + 1, width or 1)
+        ):
+            # Every paired node has the same width, no need to look up offsets
+            pairs = [
+                hash_function(level[i : i + 2 * width]).digest()
+                for i in range(0, paired * width, 2 * width)
+            ]
+        else:
+            pairs = [
+                hash_function(level[offsets[i] : offsets[i + 2]]).digest()
+                for i in range(0, paired, 2)
+            ]
+        new_level = bytearray(b"".join(pairs))
+        if paired < len(offsets) - 1:  # odd end node, promoted as is
+            new_level += level[offsets[-2] : offsets[-1]]
+        return new_level, self._next_offsets(offsets)
 
     def make_tree(self):
         """
@@ -160,17 +250,18 @@ class MerkleTree(object):
         """
         self.is_ready = False
         if self.get_leaf_count() > 0:
-            self.levels = [
-                self.leaves,
-            ]
-            while len(self.levels[0]) > 1:
-                self._calculate_next_level()
+            level, offsets = self._leaves, self._leaf_offsets
+            self._levels, self._offsets = [level], [offsets]
+            while len(offsets) > 2:
+                level, offsets = self._calculate_next_level(level, offsets)
+                self._levels.append(level)
+                self._offsets.append(offsets)
         self.is_ready = True
 
     def get_merkle_root(self):
         if self.is_ready:
-            if self.levels is not None:
-                return self._to_hex(self.levels[0][0])
+            if self._levels is not None:
+                return self._levels[-1].hex()
             else:
                 return None
         else:
@@ -196,11 +287,6 @@ class MerkleTree(object):
                            string representing the hexadecimal hash value of the sibling. If the tree is not
                            ready or the index is out of bounds, None is returned.
 
-        Raises:
-            IndexError: If the index provided is not within the range of the leaves in the tree.
-            ValueError: If the tree has not been constructed by calling `make_tree` method, or the index
-                        is not an integer.
-
         Example:
             # Assuming `merkle_tree` is an instance of `MerkleTree` and has been populated with leaves and made ready
             proof = merkle_tree.get_proof(2)
@@ -211,27 +297,64 @@ class MerkleTree(object):
             which occurs after the `make_tree` method has been called. If the tree is not ready or the index
             is not valid, the method will return None.
         """
-        if self.levels is None:
+        if self._levels is None:
             return None
-        elif not self.is_ready or index > len(self.leaves) - 1 or index < 0:
+        elif not self.is_ready or index > self.get_leaf_count() - 1 or index < 0:
             return None
         else:
             proof = []
-            for x in range(len(self.levels) - 1, 0, -1):
-                level_len = len(self.levels[x])
+            for level, offsets in zip(self._levels[:-1], self._offsets[:-1]):
+                level_len = len(offsets) - 1
                 if (index == level_len - 1) and (
                     level_len % 2 == 1
                 ):  # skip if this is an odd end node
-                    index = int(index / 2.0)
+                    index //= 2
                     continue
                 is_right_node = index % 2
                 sibling_index = index - 1 if is_right_node else index + 1
                 sibling_pos = "left" if is_right_node else "right"
-                sibling_value = self._to_hex(self.levels[x][sibling_index])
+                sibling_value = level[
+                    offsets[sibling_index] : offsets[sibling_index + 1]
+                ].hex()
                 proof.append({sibling_pos: sibling_value})
-                index = int(index / 2.0)
+                index //= 2
             return proof
 
+    def get_multiproof(self, indices):
+        """
+        Generates a single proof for the existence of several leaves within the Merkle Tree.
+
+        Walking up from the given leaves level by level, the proof holds each sibling hash needed to
+        compute the next level that is not already known, i.e. neither one of the proven nodes nor
+        computed from them. Paths that share upper nodes share their proof hashes, so proving k of n
+        leaves takes far fewer than k * log2(n) hashes. Verify with `validate_merkle_multiproof`.
+
+        Parameters:
+            indices (iterable of int): The indices of the leaves to prove. Order and duplicates do not
+                                       matter.
+
+        Returns:
+            list of str: The sibling hashes in hexadecimal, in the order `validate_merkle_multiproof`
+                         consumes them: level by level from the leaves up, by increasing index within a
+                         level. If the tree is not ready or an index is out of bounds, None is returned.
+        """
+        indices = sorted(set(indices))
+        if self._levels is None or not self.is_ready or not indices:
+            return None
+        elif indices[0] < 0 or indices[-1] > self.get_leaf_count() - 1:
+            return None
+        proof = []
+        for level, offsets in zip(self._levels[:-1], self._offsets[:-1]):
+            level_len = len(offsets) - 1
+            known = set(indices)
+            for index in indices:
+                sibling = index ^ 1
+                # odd end nodes have no sibling and are promoted as is
+                if sibling < level_len and sibling not in known:
+                    proof.append(level[offsets[sibling] : offsets[sibling + 1]].hex())
+            indices = list(dict.fromkeys(index // 2 for index in indices))
+        return proof
+
     def update_leaf(self, index, new_value):
         """
         Updates the value of a leaf at a given index in the Merkle Tree and recalculates the hashes along
@@ -239,22 +362,18 @@ class MerkleTree(object):
 
         This method allows the Merkle Tree to maintain integrity by ensuring that any updates to the leaf
         nodes are propagated upwards, resulting in a new Merkle root that represents the current state of
-        the leaves.
+        the leaves. Odd end nodes are promoted unchanged, as in `make_tree`.
 
         Parameters:
             index (int): The index of the leaf to update. The index is zero-based and must be less than
                          the number of leaves in the tree.
-            new_value (str): The new value in hexadecimal format to which the leaf should be updated. This
-                             value should be a valid hexadecimal string that represents the hashed data
-                             if hashing was applied to the leaves upon tree construction.
+            new_value (str | bytes): The new value, in hexadecimal format or as raw bytes. A value of
+                                     a different width than the old one rebuilds the whole tree.
 
         Returns:
             None
 
         Raises:
-            ValueError: If the tree is not ready for updates (i.e., `is_ready` is False), if the index is
-                        not an integer, if the new_value is not a hexadecimal string, or if the index is
-                        out of bounds (less than 0 or greater than or equal to the number of leaves).
             IndexError: If the index is out of the range of current leaves.
 
         Example:
@@ -264,47 +383,64 @@ class MerkleTree(object):
 
         Note:
             The tree must have been constructed and be in a ready state before calling this method. If the
-            tree has not been made by calling the `make_tree` method, or the index is invalid, this method
-            will not perform an update and will return None.
+            tree has not been made by calling the `make_tree` method, this method will not perform an update
+            and will return None.
         """
         if not self.is_ready:
             return None
-        new_value = bytearray.fromhex(new_value)
-        self.levels[-1][index] = new_value
-        for x in range(len(self.levels) - 1, 0, -1):
-            parent_index = index // 2
-            left_child = self.levels[x][parent_index * 2]
-            try:
-                right_child = self.levels[x][parent_index * 2 + 1]
-            except IndexError:
-                right_child = bytearray()
-            self.levels[x - 1][parent_index] = self.hash_function(
-                left_child + right_child
-            ).digest()
-            index = parent_index
+        if isinstance(new_value, str):
+            new_value = bytes.fromhex(new_value)
+        index = range(self.get_leaf_count())[index]
+
+        offsets = self._leaf_offsets
+        start, end = offsets[index], offsets[index + 1]
+        self._leaves[start:end] = new_value
+        if len(new_value) != end - start:
+            # Every later leaf moved, rebuild
+            delta = len(new_value) - (end - start)
+            for i in range(index + 1, len(offsets)):
+                offsets[i] += delta
+            self.make_tree()
+            return
+
+        for (level, offsets), (parent, parent_offsets) in zip(
+            zip(self._levels, self._offsets), zip(self._levels[1:], self._offsets[1:])
+        ):
+            left = index - index % 2
+            right = min(left + 2, len(offsets) - 1)
+            node = level[offsets[left] : offsets[right]]
+            if right - left == 2:
+                node = self.hash_function(node).digest()
+            index //= 2
+            parent[parent_offsets[index] : parent_offsets[index + 1]] = node
 
     def serialize(self):
         """
         Serializes the MerkleTree object into a JSON string.
         """
-        # Convert the bytearray leaves and levels to hex strings for serialization
-        leaves = [self._to_hex(leaf) for leaf in self.leaves]
-        levels = None
-        if self.levels is not None:
-            levels = []
-            for level in self.levels:
-                levels.append([self._to_hex(item) for item in level])
-
-        # Construct a dictionary with the MerkleTree properties
+        # Construct a dictionary with the MerkleTree properties, nodes as hex strings
+        levels = self.levels
         merkle_tree_data = {
-            "leaves": leaves,
-            "levels": levels,
+            "leaves": [leaf.hex() for leaf in self.leaves],
+            "levels": [[node.hex() for node in level] for level in levels]
+            if levels is not None
+            else None,
             "is_ready": self.is_ready,
         }
 
         # Convert the dictionary to a JSON string
         return json.dumps(merkle_tree_data)
 
+    @staticmethod
+    def _join(nodes):
+        """
+        Returns the buffer and offsets for a level given as a list of hex strings.
+        """
+        values = [bytes.fromhex(node) for node in nodes]
+        return bytearray(b"".join(values)), array(
+            "Q", accumulate([len(value) for value in values], initial=0)
+        )
+
     @classmethod
     def deserialize(cls, json_data, hash_type="sha3_256"):
         """
@@ -316,16 +452,126 @@ class MerkleTree(object):
         # Create a new MerkleTree object
         m_tree = cls(hash_type)
 
-        # Convert the hex strings back to bytearrays and set the leaves and levels
-        m_tree.leaves = [bytearray.fromhex(leaf) for leaf in merkle_tree_data["leaves"]]
+        # Convert the hex strings back to level buffers
+        m_tree._leaves, m_tree._leaf_offsets = cls._join(merkle_tree_data["leaves"])
         if merkle_tree_data["levels"] is not None:
-            m_tree.levels = []
-            for level in merkle_tree_data["levels"]:
-                m_tree.levels.append([bytearray.fromhex(item) for item in level])
+            m_tree._levels, m_tree._offsets = [m_tree._leaves], [m_tree._leaf_offsets]
+            for level in reversed(merkle_tree_data["levels"][:-1]):
+                level, offsets = cls._join(level)
+                m_tree._levels.append(level)
+                m_tree._offsets.append(offsets)
         m_tree.is_ready = merkle_tree_data["is_ready"]
 
         return m_tree
 
+    def serialize_binary(self):
+        """
+        Serializes the MerkleTree object into bytes, the raw level buffers behind a small header.
+        Much smaller and faster to load than `serialize`. Levels are only kept for a ready tree.
+        """
+        offsets = self._leaf_offsets
+        count = self.get_leaf_count()
+        width = offsets[1] if count else 0
+        if offsets[-1] != width * count:
+            width = 0
+        elif count and any(offsets[i + 1] - offsets[i] != width for i in range(count)):
+            width = 0
+
+        built = self.is_ready and self._levels is not None
+        parts = [
+            _BINARY_HEADER.pack(
+                _BINARY_MAGIC,
+                (_BINARY_BUILT if built else 0)
+                | (_BINARY_READY if self.is_ready else 0),
+                self.digest_size,
+                count,
+                width,
+            )
+        ]
+        if not width and count:
+            parts.append(
+                struct.pack(
+                    f"<{count}I",
+                    *[offsets[i + 1] - offsets[i] for i in range(count)],
+                )
+            )
+        parts.extend(self._levels if built else [self._leaves])
+        return b"".join(parts)
+
+    @classmethod
+    def deserialize_binary(cls, data, hash_type="sha3_256"):
+        """
+        Deserializes `serialize_binary` output into a MerkleTree object.
+
+        Raises:
+            ValueError: If the data is not a serialized tree for this hash function, or is truncated.
+        """
+        m_tree = cls(hash_type)
+        try:
+            magic, flags, digest_size, count, width = _BINARY_HEADER.unpack_from(data)
+        except struct.error as e:
+            raise ValueError("Truncated MerkleTree data") from e
+        if magic != _BINARY_MAGIC or digest_size != m_tree.digest_size:
+            raise ValueError("Not a serialized MerkleTree for this hash function")
+
+        position = _BINARY_HEADER.size
+        if width or not count:
+            offsets = array("Q", range(0, width * count + 1, width or 1))
+        else:
+            try:
+                widths = struct.unpack_from(f"<{count}I", data, position)
+            except struct.error as e:
+                raise ValueError("Truncated MerkleTree data") from e
+            position += 4 * count
+            offsets = array("Q", accumulate(widths, initial=0))
+
+        with memoryview(data) as view:
+            levels, level_offsets = [], [offsets]
+            while True:
+                end = position + offsets[-1]
+                if end > len(view):
+                    raise ValueError("Truncated MerkleTree data")
+                levels.append(bytearray(view[position:end]))
+                position = end
+                if not flags & _BINARY_BUILT or len(offsets) <= 2:
+                    break
+                offsets = m_tree._next_offsets(offsets)
+                level_offsets.append(offsets)
+
+        m_tree._leaves, m_tree._leaf_offsets = levels[0], level_offsets[0]
+        if flags & _BINARY_BUILT:
+            m_tree._levels, m_tree._offsets = levels, level_offsets
+        m_tree.is_ready = bool(flags & _BINARY_READY)
+        return m_tree
+
+
+def _fold_proof(proof, node, hash_func, cache=None):
+    """
+    Hashes `node` up along `proof`, see `validate_merkle_proof`. Returns the resulting root as bytes,
+    or None if an element of the proof is not a single 'left' or 'right' sibling.
+
+    `cache` maps a concatenated pair of children to their parent, so that proofs through the same
+    tree only hash their shared upper nodes once.
+    """
+    for p in proof:
+        if not isinstance(p, dict) or len(p) != 1:
+            return None
+        side, sibling = next(iter(p.items()))
+        sibling = bytes.fromhex(sibling)
+        if side == "left":
+            pair = sibling + node
+        elif side == "right":
+            pair = node + sibling
+        else:
+            return None
+        if cache is None:
+            node = hash_func(pair).digest()
+        else:
+            node = cache.get(pair)
+            if node is None:
+                node = cache[pair] = hash_func(pair).digest()
+    return node
+
 
 def validate_merkle_proof(proof, target_hash, merkle_root, hash_type="sha3_256"):
     """
@@ -348,11 +594,11 @@ def validate_merkle_proof(proof, target_hash, merkle_root, hash_type="sha3_256")
 
     Returns:
         bool: Returns True if the Merkle proof is valid and the target hash is part of the tree with the given root.
-              Returns False otherwise.
+              Returns False otherwise, including when an element of `proof` is not a single 'left' or 'right'
+              sibling.
 
     Raises:
         AttributeError: If the `hash_type` specified is not an attribute of the `hashlib` module.
-        KeyError: If one of the dictionaries in `proof` does not have a 'left' or 'right' key.
         ValueError: If `target_hash` or `merkle_root` or any of the sibling hashes in the proof dictionaries are not
                     valid hexadecimal strings.
 
@@ -365,19 +611,187 @@ def validate_merkle_proof(proof, target_hash, merkle_root, hash_type="sha3_256")
         print(is_valid)  # Outputs True if the proof is valid, False otherwise
     """
     hash_func = getattr(hashlib, hash_type)
-    merkle_root = bytearray.fromhex(merkle_root)
-    target_hash = bytearray.fromhex(target_hash)
-    if len(proof) == 0:
-        return target_hash == merkle_root
-    else:
-        proof_hash = target_hash
-        for p in proof:
-            try:
-                # the sibling is a left node
-                sibling = bytearray.fromhex(p["left"])
-                proof_hash = hash_func(sibling + proof_hash).digest()
-            except:  # TODO: do not use bare except
-                # the sibling is a right node
-                sibling = bytearray.fromhex(p["right"])
-                proof_hash = hash_func(proof_hash + sibling).digest()
-        return proof_hash == merkle_root
+    merkle_root = bytes.fromhex(merkle_root)
+    return _fold_proof(proof, bytes.fromhex(target_hash), hash_func) == merkle_root
+
+
+def validate_merkle_proofs(items, hash_type="sha3_256"):
+    """
+    Validates many Merkle proofs in one call, e.g. a batch of challenge responses.
+
+    Each proof is checked as by `validate_merkle_proof`, but a malformed item only fails itself instead of
+    raising, and proofs through the same tree hash their shared upper nodes once.
+
+    Parameters:
+        items (iterable of tuples): `(proof, target_hash, merkle_root)` tuples, as the arguments of
+            `validate_merkle_proof`.
+        hash_type (str, optional): The hash function used by the trees. Defaults to "sha3_256".
+
+    Returns:
+        list of bool: Whether each proof is valid, in the order of `items`.
+    """
+    hash_func = getattr(hashlib, hash_type)
+    cache = {}
+    results = []
+    for proof, target_hash, merkle_root in items:
+        try:
+            root = _fold_proof(proof, bytes.fromhex(target_hash), hash_func, cache)
+            results.append(root is not None and root == bytes.fromhex(merkle_root))
+        except (TypeError, ValueError):
+            results.append(False)
+    return results
+
+
+def validate_merkle_multiproof(
+    proof, indices, leaves, merkle_root, leaf_count, hash_type="sha3_256"
+):
+    """
+    Validates a proof from `MerkleTree.get_multiproof`, verifying that every leaf sits at its index in a
+    tree of `leaf_count` leaves with the given root.
+
+    Parameters:
+        proof (list of str): The hexadecimal sibling hashes, as returned by `MerkleTree.get_multiproof`.
+        indices (list of int): The proven leaf indices.
+        leaves (list of str): The hexadecimal leaf values, one per index.
+        merkle_root (str): Hexadecimal root to validate against.
+        leaf_count (int): Number of leaves in the tree.
+        hash_type (str, optional): The hash function used by the tree. Defaults to "sha3_256".
+
+    Returns:
+        bool: True if the proof is valid for all leaves and uses every proof hash, False otherwise.
+
+    Raises:
+        ValueError: If a leaf, the root or a proof hash is not a valid hexadecimal string.
+    """
+    hash_func = getattr(hashlib, hash_type)
+    if not indices or len(indices) != len(leaves):
+        return False
+    nodes = {}
+    for index, leaf in zip(indices, leaves):
+        if not 0 <= index < leaf_count:
+            return False
+        leaf = bytes.fromhex(leaf)
+        if nodes.setdefault(index, leaf) != leaf:
+            return False
+
+    siblings = iter(proof)
+    level_len = leaf_count
+    while level_len > 1:
+        parents = {}
+        for index in sorted(nodes):
+            if index % 2 and index - 1 in nodes:
+                continue  # already paired with its left sibling
+            sibling = index ^ 1
+            if sibling >= level_len:  # odd end node, promoted as is
+                parents[index // 2] = nodes[index]
+                continue
+            other = nodes.get(sibling)
+            if other is None:
+                other = next(siblings, None)
+                if other is None:
+                    return False
+                other = bytes.fromhex(other)
+            if index % 2:
+                pair = other + nodes[index]
+            else:
+                pair = nodes[index] + other
+            parents[index // 2] = hash_func(pair).digest()
+        nodes = parents
+        level_len = (level_len + 1) // 2
+    if next(siblings, None) is not None:
+        return False
+    return nodes[0] == bytes.fromhex(merkle_root)
+
+
+def hash_chunk(chunk, hash_type="sha3_256"):
+    """
+    Hashes a data chunk into the hexadecimal leaf value used by store-time Merkle trees.
+
+    Parameters:
+        chunk (bytes): The data chunk.
+        hash_type (str, optional): The hashlib hash function to use. Defaults to "sha3_256".
+
+    Returns:
+        str: The hexadecimal digest of the chunk.
+    """
+    return getattr(hashlib, hash_type)(chunk).hexdigest()
+
+
+def build_chunk_merkle_tree(data, chunk_size, hash_type="sha3_256"):
+    """
+    Builds a Merkle tree whose leaves are the hashes of consecutive `chunk_size` chunks of `data`.
+
+    Both the validator (at store time) and the miner build this tree over the same bytes, so the
+    validator can later check a single chunk and its authentication path against the root it
+    computed itself.
+
+    Parameters:
+        data (bytes): The stored data.
+        chunk_size (int): Size of each leaf chunk in bytes. The last chunk may be shorter.
+        hash_type (str, optional): The hash function for leaves and nodes. Defaults to "sha3_256".
+
+    Returns:
+        MerkleTree: The constructed tree, ready for `get_merkle_root` and `get_proof`.
+    """
+    merkle_tree = MerkleTree(hash_type)
+    hash_function = merkle_tree.hash_function
+    merkle_tree.add_leaf_digests(
+        b"".join(
+            [
+                hash_function(data[i : i + chunk_size]).digest()
+                for i in range(0, len(data), chunk_size)
+            ]
+        )
+    )
+    merkle_tree.make_tree()
+    return merkle_tree
+
+
+def get_proof_sides(index, leaf_count):
+    """
+    Computes the sibling sides `MerkleTree.get_proof` produces for a leaf, without the tree.
+
+    Odd end nodes are promoted without a sibling, exactly as in `MerkleTree`, so the result
+    pins down which leaf a proof belongs to.
+
+    Parameters:
+        index (int): Index of the leaf.
+        leaf_count (int): Number of leaves in the tree.
+
+    Returns:
+        list of str: 'left' or 'right' for each proof element, from the leaf up.
+    """
+    sides = []
+    level_len = leaf_count
+    while level_len > 1:
+        if not (index == level_len - 1 and level_len % 2 == 1):
+            sides.append("left" if index % 2 else "right")
+        index //= 2
+        level_len = (level_len + 1) // 2
+    return sides
+
+
+def validate_merkle_proof_at_index(
+    proof, target_hash, merkle_root, index, leaf_count, hash_type="sha3_256"
+):
+    """
+    Validates a Merkle proof like `validate_merkle_proof`, and also checks that the proof is the
+    authentication path of leaf `index` in a tree of `leaf_count` leaves.
+
+    Parameters:
+        proof (list of dicts): The proof, as returned by `MerkleTree.get_proof`.
+        target_hash (str): Hexadecimal leaf value being proven.
+        merkle_root (str): Hexadecimal root to validate against.
+        index (int): The leaf index the proof must belong to.
+        leaf_count (int): Number of leaves in the tree.
+        hash_type (str, optional): The hash function used by the tree. Defaults to "sha3_256".
+
+    Returns:
+        bool: True if the proof is valid for that leaf position, False otherwise.
+    """
+    if not 0 <= index < leaf_count:
+        return False
+    sides = [next(iter(p)) if len(p) == 1 else None for p in proof]
+    if sides != get_proof_sides(index, leaf_count):
+        return False
+    return validate_merkle_proof(proof, target_hash, merkle_root, hash_type)
@@ -22,6 +22,7 @@ from . import utils
 from . import verify
 from . import encryption
 from . import database
+from . import autopipeline
 from . import reward
 from . import bonding
 from . import network
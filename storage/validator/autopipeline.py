@@ -0,0 +1,183 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+import time
+import asyncio
+import functools
+from redis import asyncio as aioredis
+from typing import Any, Dict, List, Tuple
+
+
+# Single-key commands that are safe to reorder into a shared non-transactional pipeline.
+# Anything else (pipelines, scripts, scans, blocking or connection commands) goes straight
+# to the wrapped client.
+AUTO_PIPELINE_COMMANDS = frozenset(
+    [
+        "get",
+        "set",
+        "incr",
+        "incrby",
+        "decrby",
+        "exists",
+        "delete",
+        "expire",
+        "hget",
+        "hset",
+        "hmset",
+        "hmget",
+        "hgetall",
+        "hkeys",
+        "hdel",
+        "hexists",
+        "hincrby",
+        "hincrbyfloat",
+        "hlen",
+        "sadd",
+        "srem",
+        "smembers",
+        "sismember",
+        "scard",
+        "sunion",
+        "zadd",
+        "zrem",
+        "zcard",
+        "zscore",
+        "zrange",
+        "zrangebyscore",
+    ]
+)
+
+
+class AutoPipelineRedis:
+    """
+    Drop-in facade over `aioredis.Redis` that coalesces commands into pipelines.
+
+    Commands in `AUTO_PIPELINE_COMMANDS` are queued instead of sent. Everything queued
+    before the event loop gets back to the scheduled flush, i.e. everything issued in
+    the same loop tick by concurrent tasks, is sent as one non-transactional pipeline.
+    Each caller still awaits its own result, or the exception for its own command.
+
+    Commands issued one after another by the same coroutine do not share a batch, since
+    each await waits for the flush. Use `pipeline()` explicitly for those.
+
+    Per-command latency (queue to result) and batch sizes are recorded, see `metrics()`.
+
+    Args:
+        database (aioredis.Redis): The Redis client to wrap.
+    """
+
+    def __init__(self, database: aioredis.Redis):
+        self.database = database
+        self._queue: List[Tuple[str, tuple, dict, asyncio.Future, float]] = []
+        self._flush_scheduled = False
+        self.reset_metrics()
+
+    def __getattr__(self, name: str) -> Any:
+        if name == "database":
+            raise AttributeError(name)
+        attribute = getattr(self.database, name)
+        if name in AUTO_PIPELINE_COMMANDS:
+            return functools.partial(self._enqueue, name)
+        return attribute
+
+    def _enqueue(self, command: str, *args, **kwargs) -> asyncio.Future:
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._queue.append((command, args, kwargs, future, time.perf_counter()))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._schedule_flush)
+        return future
+
+    def _schedule_flush(self):
+        self._flush_scheduled = False
+        batch, self._queue = self._queue, []
+        if batch:
+            asyncio.ensure_future(self._flush(batch))
+
+    async def _flush(self, batch: List[Tuple[str, tuple, dict, asyncio.Future, float]]):
+        try:
+            if len(batch) == 1:
+                command, args, kwargs, _, _ = batch[0]
+                try:
+                    results = [await getattr(self.database, command)(*args, **kwargs)]
+                except Exception as e:
+                    results = [e]
+            else:
+                async with self.database.pipeline(transaction=False) as pipe:
+                    for command, args, kwargs, _, _ in batch:
+                        getattr(pipe, command)(*args, **kwargs)
+                    results = await pipe.execute(raise_on_error=False)
+        except Exception as e:
+            # The whole round trip failed (e.g. connection error), fail every caller.
+            results = [e] * len(batch)
+
+        finished = time.perf_counter()
+        self._record_batch(len(batch))
+        for (command, _, _, future, queued), result in zip(batch, results):
+            self._record_latency(command, finished - queued)
+            if future.done():
+                continue
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _record_batch(self, size: int):
+        self._batches += 1
+        self._batched_commands += size
+        self._max_batch_size = max(self._max_batch_size, size)
+
+    def _record_latency(self, command: str, latency: float):
+        stats = self._latency.setdefault(command, [0, 0.0, 0.0])
+        stats[0] += 1
+        stats[1] += latency
+        stats[2] = max(stats[2], latency)
+
+    def reset_metrics(self):
+        """
+        Clears the recorded latency and batch-size metrics.
+        """
+        self._batches = 0
+        self._batched_commands = 0
+        self._max_batch_size = 0
+        self._latency: Dict[str, List[float]] = {}
+
+    def metrics(self) -> Dict[str, Any]:
+        """
+        Returns the latency and batch-size metrics recorded since the last reset.
+
+        Returns:
+            dict: Batch counts and sizes, plus per-command count, mean and max latency in milliseconds.
+        """
+        return {
+            "batches": self._batches,
+            "commands": self._batched_commands,
+            "mean_batch_size": self._batched_commands / self._batches
+            if self._batches
+            else 0.0,
+            "max_batch_size": self._max_batch_size,
+            "latency_ms": {
+                command: {
+                    "count": count,
+                    "mean": 1000 * total / count,
+                    "max": 1000 * maximum,
+                }
+                for command, (count, total, maximum) in self._latency.items()
+            },
+        }
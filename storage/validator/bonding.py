@@ -17,9 +17,12 @@
 # DEALINGS IN THE SOFTWARE.
 
 import math
+import time
 import asyncio
+import numpy as np
 from redis import asyncio as aioredis
 import bittensor as bt
+from typing import Dict, List, Optional, Tuple
 from storage.constants import *
 
 
@@ -51,6 +54,72 @@ def wilson_score_interval(successes, total):
     return wilson_score
 
 
+# Stats each tier is rolled over to, so a miner keeps the minimum wilson score for its tier
+# and can drop/go up from there based on future behavior.
+TIER_ROLLOVER_STATS = {
+    "Super Saiyan": {
+        "store_attempts": 7,
+        "store_successes": 7,
+        "challenge_successes": 8,
+        "challenge_attempts": 8,
+        "retrieve_successes": 8,
+        "retrieve_attempts": 8,
+    },
+    "Diamond": {
+        "store_attempts": 3,
+        "store_successes": 3,
+        "challenge_successes": 3,
+        "challenge_attempts": 3,
+        "retrieve_successes": 3,
+        "retrieve_attempts": 3,
+    },
+    "Gold": {
+        "store_attempts": 2,
+        "store_successes": 2,
+        "challenge_successes": 2,
+        "challenge_attempts": 2,
+        "retrieve_successes": 1,
+        "retrieve_attempts": 1,
+    },
+    "Silver": {
+        "store_attempts": 1,
+        "store_successes": 1,
+        "challenge_successes": 1,
+        "challenge_attempts": 1,
+        "retrieve_successes": 0,
+        "retrieve_attempts": 0,
+    },
+    "Bronze": {
+        "store_attempts": 0,
+        "store_successes": 0,
+        "challenge_successes": 0,
+        "challenge_attempts": 0,
+        "retrieve_successes": 0,
+        "retrieve_attempts": 0,
+    },
+}
+
+# (tier, minimum wilson score, minimum total successes, storage limit), best tier first.
+# Bronze is the fallback and has no requirements.
+TIERS = [
+    (
+        "Super Saiyan",
+        SUPER_SAIYAN_WILSON_SCORE,
+        SUPER_SAIYAN_TIER_TOTAL_SUCCESSES,
+        STORAGE_LIMIT_SUPER_SAIYAN,
+    ),
+    (
+        "Diamond",
+        DIAMOND_WILSON_SCORE,
+        DIAMOND_TIER_TOTAL_SUCCESSES,
+        STORAGE_LIMIT_DIAMOND,
+    ),
+    ("Gold", GOLD_WILSON_SCORE, GOLD_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_GOLD),
+    ("Silver", SILVER_WILSON_SCORE, SILVER_TIER_TOTAL_SUCCESSES, STORAGE_LIMIT_SILVER),
+    ("Bronze", 0.0, 0, STORAGE_LIMIT_BRONZE),
+]
+
+
 async def reset_storage_stats(stats_key: str, database: aioredis.Redis):
     """
     Asynchronously resets the storage statistics for a miner.
@@ -61,69 +130,11 @@ async def reset_storage_stats(stats_key: str, database: aioredis.Redis):
         ss58_address (str): The unique address (hotkey) of the miner.
         database (redis.Redis): The Redis client instance for database operations.
     """
-    stats = await database.hgetall(stats_key)
-    tier = stats.get(b"tier", b"Bronze").decode()
-    # Set min wilson score for each tier to preserve tier and can drop/go up from there based on future behavior
-    if tier == "Super Saiyan":
-        await database.hmset(
-            stats_key,
-            {
-                "store_attempts": 7,
-                "store_successes": 7,
-                "challenge_successes": 8,
-                "challenge_attempts": 8,
-                "retrieve_successes": 8,
-                "retrieve_attempts": 8,
-            },
-        )
-    elif tier == "Diamond":
-        await database.hmset(
-            stats_key,
-            {
-                "store_attempts": 3,
-                "store_successes": 3,
-                "challenge_successes": 3,
-                "challenge_attempts": 3,
-                "retrieve_successes": 3,
-                "retrieve_attempts": 3,
-            },
-        )
-    elif tier == "Gold":
-        await database.hmset(
-            stats_key,
-            {
-                "store_attempts": 2,
-                "store_successes": 2,
-                "challenge_successes": 2,
-                "challenge_attempts": 2,
-                "retrieve_successes": 1,
-                "retrieve_attempts": 1,
-            },
-        )
-    elif tier == "Silver":
-        await database.hmset(
-            stats_key,
-            {
-                "store_attempts": 1,
-                "store_successes": 1,
-                "challenge_successes": 1,
-                "challenge_attempts": 1,
-                "retrieve_successes": 0,
-                "retrieve_attempts": 0,
-            },
-        )
-    else:  # Bronze
-        await database.hmset(
-            stats_key,
-            {
-                "store_attempts": 0,
-                "store_successes": 0,
-                "challenge_successes": 0,
-                "challenge_attempts": 0,
-                "retrieve_successes": 0,
-                "retrieve_attempts": 0,
-            },
-        )
+    tier = (await database.hget(stats_key, "tier") or b"Bronze").decode()
+    await database.hset(
+        stats_key,
+        mapping=TIER_ROLLOVER_STATS.get(tier, TIER_ROLLOVER_STATS["Bronze"]),
+    )
 
 
 async def rollover_storage_stats(database: aioredis.Redis):
@@ -176,79 +187,154 @@ async def register_miner(ss58_address: str, database: aioredis.Redis):
             "storage_limit": STORAGE_LIMIT_BRONZE,
         },
     )
+    tier_cache.invalidate(ss58_address)
+
+
+# KEYS: miner stats key
+# ARGV: storage limit for newly registered miners, followed by
+#       (task_type, attempts, successes) triples to add
+_UPDATE_STATISTICS_LUA = """
+local stats_key = KEYS[1]
+
+-- Register the miner if needed
+if redis.call("EXISTS", stats_key) == 0 then
+    redis.call(
+        "HSET", stats_key,
+        "store_attempts", 0, "store_successes", 0,
+        "challenge_successes", 0, "challenge_attempts", 0,
+        "retrieve_successes", 0, "retrieve_attempts", 0,
+        "total_successes", 0, "tier", "Bronze", "storage_limit", ARGV[1]
+    )
+end
+
+-- Transition retrieval -> retrieve successes and attempts (legacy)
+for _, suffix in ipairs({"successes", "attempts"}) do
+    local legacy = redis.call("HGET", stats_key, "retrieval_" .. suffix)
+    if legacy then
+        redis.call("HSET", stats_key, "retrieve_" .. suffix, legacy)
+        redis.call("HDEL", stats_key, "retrieval_" .. suffix)
+    end
+end
+
+-- Initialize the total successes that we rollover every epoch
+if not redis.call("HGET", stats_key, "total_successes") then
+    local total_successes = 0
+    for _, task_type in ipairs({"store", "challenge", "retrieve"}) do
+        local task_successes = redis.call("HGET", stats_key, task_type .. "_successes")
+        if task_successes then
+            total_successes = total_successes + tonumber(task_successes)
+        else
+            redis.call("HSET", stats_key, task_type .. "_successes", 0)
+        end
+    end
+    redis.call("HSET", stats_key, "total_successes", total_successes)
+end
+
+local new_successes = 0
+for i = 2, #ARGV, 3 do
+    local task_type = ARGV[i]
+    local attempts = tonumber(ARGV[i + 1])
+    local successes = tonumber(ARGV[i + 2])
+    if task_type == "store" or task_type == "challenge" or task_type == "retrieve" then
+        redis.call("HINCRBY", stats_key, task_type .. "_attempts", attempts)
+        if successes > 0 then
+            redis.call("HINCRBY", stats_key, task_type .. "_successes", successes)
+        end
+    end
+    new_successes = new_successes + successes
+end
+if new_successes > 0 then
+    redis.call("HINCRBY", stats_key, "total_successes", new_successes)
+end
+return new_successes
+"""
+
+
+async def update_statistics_batch(
+    updates: Dict[str, Dict[str, Tuple[int, int]]], database: aioredis.Redis
+):
+    """
+    Applies aggregated statistics updates for many miners in a single round trip.
+    Each miner is registered if needed and updated atomically by a server-side script.
+    Args:
+        updates (dict): Maps each miner hotkey to {task_type: (attempts, successes)}.
+        database (redis.Redis): The Redis client instance for database operations.
+    """
+    if len(updates) == 0:
+        return
+
+    update_stats = database.register_script(_UPDATE_STATISTICS_LUA)
+    calls = []
+    for ss58_address, task_counts in updates.items():
+        args = [STORAGE_LIMIT_BRONZE]
+        for task_type, (attempts, successes) in task_counts.items():
+            args += [task_type, attempts, successes]
+        calls.append(([f"stats:{ss58_address}"], args))
+
+    if len(calls) == 1:
+        keys, args = calls[0]
+        await update_stats(keys=keys, args=args)
+        return
+
+    async with database.pipeline(transaction=False) as pipe:
+        for keys, args in calls:
+            await update_stats(keys=keys, args=args, client=pipe)
+        await pipe.execute()
+
+
+class StatisticsBuffer:
+    """
+    In-process write-behind buffer for miner statistics.
+    Aggregates attempts and successes per miner and task type, and writes them all with
+    `update_statistics_batch` when flushed (once per forward step). Counts not yet flushed
+    are lost if the validator stops.
+    """
+
+    def __init__(self):
+        self._pending: Dict[str, Dict[str, List[int]]] = {}
+
+    def __len__(self):
+        return len(self._pending)
+
+    def record(self, ss58_address: str, success: bool, task_type: str):
+        counts = self._pending.setdefault(ss58_address, {}).setdefault(
+            task_type, [0, 0]
+        )
+        counts[0] += 1
+        counts[1] += int(success)
+
+    async def flush(self, database: aioredis.Redis):
+        pending, self._pending = self._pending, {}
+        await update_statistics_batch(pending, database)
 
 
 async def update_statistics(
-    ss58_address: str, success: bool, task_type: str, database: aioredis.Redis
+    ss58_address: str,
+    success: bool,
+    task_type: str,
+    database: aioredis.Redis,
+    buffer: Optional[StatisticsBuffer] = None,
 ):
     """
     Updates the statistics of a miner in the decentralized storage system.
     If the miner is not already registered, they are registered first. This function updates
     the miner's statistics based on the task performed (store, challenge, retrieve) and whether
-    it was successful.
+    it was successful. The update is a single atomic script call.
     Args:
         ss58_address (str): The unique address (hotkey) of the miner.
         success (bool): Indicates whether the task was successful or not.
         task_type (str): The type of task performed ('store', 'challenge', 'retrieve').
         database (redis.Redis): The Redis client instance for database operations.
+        buffer (StatisticsBuffer, optional): If given, the update is recorded in the buffer
+            and written when it is flushed instead of immediately.
     """
-    # Check and see if this miner is registered.
-    if not await miner_is_registered(ss58_address, database):
-        bt.logging.debug(f"Registering new miner {ss58_address}...")
-        await register_miner(ss58_address, database)
-
-    # Update statistics in the stats hash
-    stats_key = f"stats:{ss58_address}"
-
-    if task_type in ["store", "challenge", "retrieve"]:
-        await database.hincrby(stats_key, f"{task_type}_attempts", 1)
-        if success:
-            await database.hincrby(stats_key, f"{task_type}_successes", 1)
-
-    # Transition retireval -> retrieve successes (legacy)
-    legacy_retrieve_successes = await database.hget(stats_key, "retrieval_successes")
-    if legacy_retrieve_successes is not None:
-        await database.hset(
-            stats_key, "retrieve_successes", int(legacy_retrieve_successes)
-        )
-        await database.hdel(stats_key, "retrieval_successes")
-
-    # Transition retireval -> retrieve attempts (legacy)
-    legacy_retrieve_attempts = await database.hget(stats_key, "retrieval_attempts")
-    if legacy_retrieve_attempts is not None:
-        await database.hset(
-            stats_key, "retrieve_attempts", int(legacy_retrieve_attempts)
-        )
-        await database.hdel(stats_key, "retrieval_attempts")
-
-    # Update the total successes that we rollover every epoch
-    if await database.hget(stats_key, "total_successes") is None:
-        store_successes = await database.hget(stats_key, "store_successes")
-        if store_succeses is None:
-            store_successes = 0
-            database.hset(stats_key, "store_successes", 0) # ensure field exists
-        else:
-            store_successes = int(store_successes)
-
-        challenge_successes = await database.hget(stats_key, "challenge_successes")
-        if challenge_successes is None:
-            challenge_successes = 0
-            database.hset(stats_key, "challenge_successes", 0) # ensure field exists
-        else:
-            challenge_successes = int(challenge_successes)
-
-        retrieval_successes = await database.hget(stats_key, "retrieve_successes")
-        if retrieval_successes is None:
-            retrieval_successes = 0
-            database.hset(stats_key, "retrieve_successes", 0) # ensure field exists
-        else:
-            retrieval_successes = int(retrieval_successes)
-
-        total_successes = store_successes + retrieval_successes + challenge_successes
-        await database.hset(stats_key, "total_successes", total_successes)
+    if buffer is not None:
+        buffer.record(ss58_address, success, task_type)
+        return
 
-    if success:
-        await database.hincrby(stats_key, "total_successes", 1)
+    await update_statistics_batch(
+        {ss58_address: {task_type: (1, int(success))}}, database
+    )
 
 
 async def compute_tier(stats_key: str, database: aioredis.Redis, confidence=0.95):
@@ -311,6 +397,9 @@ async def compute_tier(stats_key: str, database: aioredis.Redis, confidence=0.95
 
     # Update the tier in the database
     await database.hset(stats_key, "tier", tier)
+    if isinstance(stats_key, bytes):
+        stats_key = stats_key.decode()
+    tier_cache.invalidate(stats_key.split(":", 1)[1])
 
     # Update storage limit based on tier
     if tier == "Super Saiyan":
@@ -339,43 +428,216 @@ async def compute_tier(stats_key: str, database: aioredis.Redis, confidence=0.95
         )
 
 
+def wilson_score_intervals(successes: np.ndarray, totals: np.ndarray) -> np.ndarray:
+    """
+    Vectorized `wilson_score_interval` over arrays of success and attempt counts.
+    """
+    successes = np.asarray(successes, dtype=np.float64)
+    totals = np.asarray(totals, dtype=np.float64)
+    safe_totals = np.where(totals == 0, 1.0, totals)
+
+    z = 0.6744897501960817
+
+    p = successes / safe_totals
+    denominator = 1 + z**2 / safe_totals
+    centre_adjusted_probability = p + z**2 / (2 * safe_totals)
+    adjusted_standard_deviation = np.sqrt(
+        (p * (1 - p) + z**2 / (4 * safe_totals)) / safe_totals
+    )
+
+    lower_bound = (
+        centre_adjusted_probability - z * adjusted_standard_deviation
+    ) / denominator
+    upper_bound = (
+        centre_adjusted_probability + z * adjusted_standard_deviation
+    ) / denominator
+
+    wilson_scores = (np.maximum(0, lower_bound) + np.minimum(upper_bound, 1)) / 2
+    return np.where(totals == 0, 0.5, wilson_scores)  # chance
+
+
+def assign_tiers(wilson_scores: np.ndarray, total_successes: np.ndarray) -> np.ndarray:
+    """
+    Assigns each miner the index into `TIERS` of the best tier it qualifies for.
+    """
+    tier_indices = np.full(len(wilson_scores), len(TIERS) - 1)
+    # Walk from the worst to the best tier so better tiers overwrite worse ones
+    for index in range(len(TIERS) - 2, -1, -1):
+        _, min_wilson_score, min_total_successes, _ = TIERS[index]
+        qualifies = (wilson_scores >= min_wilson_score) & (
+            total_successes >= min_total_successes
+        )
+        tier_indices[qualifies] = index
+    return tier_indices
+
+
+TIER_STATS_FIELDS = [
+    "challenge_successes",
+    "challenge_attempts",
+    "retrieve_successes",
+    "retrieve_attempts",
+    "store_successes",
+    "store_attempts",
+    "total_successes",
+]
+
+
 async def compute_all_tiers(database: aioredis.Redis):
-    # Iterate over all miners
     """
     Asynchronously computes and updates the tiers for all miners in the decentralized storage system.
     This function should be called periodically to ensure miners' tiers are up-to-date based on
-    their performance. It iterates over all miners and calls `compute_tier` for each one.
+    their performance. All statistics are read with one pipeline of HMGETs, tiers are computed
+    as arrays, and the tier, storage limit and rolled over statistics for the next epoch are
+    written back with one pipeline.
     Args:
         database (redis.Redis): The Redis client instance for database operations.
     """
-    miners = [miner async for miner in database.scan_iter("stats:*")]
-    tasks = [compute_tier(miner, database) for miner in miners]
-    await asyncio.gather(*tasks)
+    stats_keys = [stats_key async for stats_key in database.scan_iter("stats:*")]
+    if len(stats_keys) == 0:
+        return
+
+    async with database.pipeline(transaction=False) as pipe:
+        for stats_key in stats_keys:
+            pipe.hmget(stats_key, TIER_STATS_FIELDS)
+        rows = await pipe.execute()
 
-    # Reset the statistics for the next epoch
+    stats = np.array(
+        [[int(value or 0) for value in row] for row in rows], dtype=np.int64
+    ).reshape(len(stats_keys), len(TIER_STATS_FIELDS))
+    current_successes = stats[:, 0] + stats[:, 2] + stats[:, 4]
+    current_attempts = stats[:, 1] + stats[:, 3] + stats[:, 5]
+    total_successes = stats[:, 6]
+
+    wilson_scores = wilson_score_intervals(current_successes, current_attempts)
+    tier_indices = assign_tiers(wilson_scores, total_successes)
+
+    # Update the tiers and reset the statistics for the next epoch
     bt.logging.info("Resetting statistics for all hotkeys...")
-    await rollover_storage_stats(database)
+    async with database.pipeline(transaction=False) as pipe:
+        for stats_key, tier_index in zip(stats_keys, tier_indices):
+            tier, _, _, storage_limit = TIERS[tier_index]
+            pipe.hset(
+                stats_key,
+                mapping={
+                    "tier": tier,
+                    "storage_limit": storage_limit,
+                    **TIER_ROLLOVER_STATS[tier],
+                },
+            )
+        await pipe.execute()
+
+    # Tiers and limits only change here, refresh the cache with what was just written
+    tier_cache.invalidate()
+    for stats_key, tier_index in zip(stats_keys, tier_indices):
+        tier, _, _, storage_limit = TIERS[tier_index]
+        tier_cache.set(stats_key.decode().split(":", 1)[1], tier, storage_limit)
+
+    tier_counts = np.bincount(tier_indices, minlength=len(TIERS))
+    bt.logging.trace(
+        f"Computed tiers for {len(stats_keys)} miners: "
+        f"{ {tier[0]: int(count) for tier, count in zip(TIERS, tier_counts)} }"
+    )
+
+
+TIER_REWARD_FACTORS = {
+    "Super Saiyan": SUPER_SAIYAN_TIER_REWARD_FACTOR,
+    "Diamond": DIAMOND_TIER_REWARD_FACTOR,
+    "Gold": GOLD_TIER_REWARD_FACTOR,
+    "Silver": SILVER_TIER_REWARD_FACTOR,
+    "Bronze": BRONZE_TIER_REWARD_FACTOR,
+}
+
+
+class TierCache:
+    """
+    Process-local cache of each miner's tier and storage limit.
+
+    Tiers and limits only change when tiers are recomputed or a miner is (re)registered, and
+    those paths refresh or invalidate the cache. Entries also expire after `max_age` seconds,
+    which bounds staleness for processes that share the database but never recompute tiers.
+    Miners without a stored storage limit are not cached.
+    """
+
+    def __init__(self, max_age: float = 600):
+        self.max_age = max_age
+        self._entries: Dict[str, Tuple[str, int, float]] = {}
+
+    def get(self, ss58_address: str) -> Optional[Tuple[str, int]]:
+        entry = self._entries.get(ss58_address)
+        if entry is None:
+            return None
+        tier, storage_limit, cached_at = entry
+        if time.monotonic() - cached_at > self.max_age:
+            del self._entries[ss58_address]
+            return None
+        return tier, storage_limit
+
+    def set(self, ss58_address: str, tier: str, storage_limit: int):
+        self._entries[ss58_address] = (tier, storage_limit, time.monotonic())
+
+    def invalidate(self, ss58_address: Optional[str] = None):
+        if ss58_address is None:
+            self._entries.clear()
+        else:
+            self._entries.pop(ss58_address, None)
+
+
+tier_cache = TierCache()
+
+
+async def get_tiers_and_storage_limits(
+    hotkeys: List[str], database: aioredis.Redis
+) -> Dict[str, Tuple[str, Optional[int]]]:
+    """
+    Retrieves the tier and storage limit of each miner, from `tier_cache` where possible.
+    Misses are read with a single pipeline and cached.
+    Args:
+        hotkeys (list): The unique addresses (hotkeys) of the miners.
+        database (redis.Redis): The Redis client instance for database operations.
+    Returns:
+        dict: Maps each hotkey to (tier, storage_limit). The storage limit is None if not set.
+    """
+    results = {}
+    misses = []
+    for hotkey in hotkeys:
+        cached = tier_cache.get(hotkey)
+        if cached is None:
+            misses.append(hotkey)
+        else:
+            results[hotkey] = cached
+
+    if len(misses) == 0:
+        return results
+
+    async with database.pipeline(transaction=False) as pipe:
+        for hotkey in misses:
+            pipe.hmget(f"stats:{hotkey}", ["tier", "storage_limit"])
+        rows = await pipe.execute()
+
+    for hotkey, (tier, storage_limit) in zip(misses, rows):
+        tier = tier.decode() if tier is not None else "Bronze"
+        try:
+            storage_limit = int(storage_limit)
+        except (TypeError, ValueError):
+            storage_limit = None
+        else:
+            tier_cache.set(hotkey, tier, storage_limit)
+        results[hotkey] = (tier, storage_limit)
+
+    return results
 
 
 async def get_tier_factor(ss58_address: str, database: aioredis.Redis):
     """
     Retrieves the reward factor based on the tier of a given miner.
     This function returns a factor that represents the proportion of rewards a miner
-    is eligible to receive based on their tier.
+    is eligible to receive based on their tier. Tiers are served from `tier_cache`.
     Args:
         ss58_address (str): The unique address (hotkey) of the miner.
         database (redis.Redis): The Redis client instance for database operations.
     Returns:
         float: The reward factor corresponding to the miner's tier.
     """
-    tier = await database.hget(f"stats:{ss58_address}", "tier")
-    if tier == b"Super Saiyan":
-        return SUPER_SAIYAN_TIER_REWARD_FACTOR
-    elif tier == b"Diamond":
-        return DIAMOND_TIER_REWARD_FACTOR
-    elif tier == b"Gold":
-        return GOLD_TIER_REWARD_FACTOR
-    elif tier == b"Silver":
-        return SILVER_TIER_REWARD_FACTOR
-    else:
-        return BRONZE_TIER_REWARD_FACTOR
+    tiers = await get_tiers_and_storage_limits([ss58_address], database)
+    tier, _ = tiers[ss58_address]
+    return TIER_REWARD_FACTORS.get(tier, BRONZE_TIER_REWARD_FACTOR)
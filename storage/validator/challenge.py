@@ -28,10 +28,19 @@ from Crypto.Random import get_random_bytes, random
 
 from storage import protocol
 from storage.constants import CHALLENGE_FAILURE_REWARD
+from storage.validator.crs import CRS
 from storage.validator.event import EventSchema
-from storage.shared.ecc import setup_CRS, ecc_point_to_hex
-from storage.validator.utils import get_random_chunksize, get_available_query_miners
-from storage.validator.verify import verify_challenge_with_seed
+from storage.validator.utils import (
+    encode_crs,
+    get_available_query_miners,
+    get_random_chunksize,
+    record_point_encodings,
+)
+from storage.validator.verify import (
+    is_precomputed_response,
+    verify_challenge_responses,
+    verify_challenge_with_seed,
+)
 from storage.validator.reward import apply_reward_scores
 from storage.validator.database import (
     get_metadata_for_hotkey_and_hash,
@@ -44,15 +53,20 @@ from storage.validator.bonding import (
 )
 
 
-async def handle_challenge(self, uid: int) -> typing.Tuple[bool, protocol.Challenge]:
+async def send_challenge(
+    self, uid: int, crs: CRS
+) -> typing.Tuple[typing.Optional[dict], typing.List[protocol.Challenge]]:
     """
-    Handles a challenge sent to a miner and verifies the response.
+    Sends a challenge built on a CRS to a miner, without verifying the response.
 
     Parameters:
     - uid (int): The UID of the miner being challenged.
+    - crs (CRS): The Common-Reference-String of the challenge.
 
     Returns:
-    - Tuple[bool, protocol.Challenge]: A tuple containing the verification result and the challenge.
+    - Tuple[dict | None, List[protocol.Challenge]]: The challenge context, holding the hotkey, data hash,
+      metadata and the keyword arguments to verify the response with under "verify", or None if no data
+      is associated with the miner; and the response.
     """
     hotkey = self.metagraph.hotkeys[uid]
     keys = await self.database.hkeys(f"hotkey:{hotkey}")
@@ -81,59 +95,150 @@ async def handle_challenge(self, uid: int) -> typing.Tuple[bool, protocol.Challe
     bt.logging.trace(f"Challenge lookup key: {data_hash}")
     bt.logging.trace(f"Challenge data: {pformat(data)}")
 
-    try:
-        chunk_size = get_random_chunksize(
-            minsize=self.config.neuron.min_chunk_size,
-            maxsize=max(
-                self.config.neuron.min_chunk_size,
-                data["size"] // self.config.neuron.chunk_factor,
-            ),
-        )
-    except:  # TODO: do not use bare except
-        bt.logging.error(
-            f"Failed to get chunk size {self.config.neuron.min_chunk_size} | {self.config.neuron.chunk_factor} | {data['size'] // self.config.neuron.chunk_factor}"
-        )
-        chunk_size = 0
+    merkle_root = data.get("merkle_root")
+    if merkle_root is not None:
+        # Stored with a store-time hash tree, challenge one of its leaves
+        mode = protocol.CHALLENGE_MODE_PRECOMPUTED
+        chunk_size = data["merkle_chunk_size"]
+        num_chunks = data["merkle_leaf_count"]
+    else:
+        mode = protocol.CHALLENGE_MODE_FULL
+        try:
+            chunk_size = get_random_chunksize(
+                minsize=self.config.neuron.min_chunk_size,
+                maxsize=max(
+                    self.config.neuron.min_chunk_size,
+                    data["size"] // self.config.neuron.chunk_factor,
+                ),
+            )
+        except:  # TODO: do not use bare except
+            bt.logging.error(
+                f"Failed to get chunk size {self.config.neuron.min_chunk_size} | {self.config.neuron.chunk_factor} | {data['size'] // self.config.neuron.chunk_factor}"
+            )
+            chunk_size = 0
 
-    num_chunks = (
-        data["size"] // chunk_size if data["size"] > chunk_size else data["size"]
-    )
+        num_chunks = (
+            data["size"] // chunk_size if data["size"] > chunk_size else data["size"]
+        )
     if self.config.neuron.verbose:
         bt.logging.trace(f"challenge data size : {data['size']}")
         bt.logging.trace(f"challenge chunk size: {chunk_size}")
         bt.logging.trace(f"challenge num chunks: {num_chunks}")
 
-    # Setup new Common-Reference-String for this challenge
-    g, h = setup_CRS()
-
     synapse = protocol.Challenge(
         challenge_hash=data_hash,
         chunk_size=chunk_size,
-        g=ecc_point_to_hex(g),
-        h=ecc_point_to_hex(h),
-        curve="P-256",
+        g=crs.hex()[0],
+        h=crs.hex()[1],
+        curve=crs.curve,
         challenge_index=random.choice(range(num_chunks)),
         seed=get_random_bytes(32).hex(),
+        mode=mode,
     )
 
     axon = self.metagraph.axons[uid]
 
+    encode_crs(self, synapse, crs, [uid])
     response = await self.dendrite(
         [axon],
         synapse,
         deserialize=True,
         timeout=30,
     )
-    verified = verify_challenge_with_seed(response[0], synapse.seed)
+    record_point_encodings(self, [uid], response)
+
+    context = {
+        "hotkey": hotkey,
+        "data_hash": data_hash,
+        "data": data,
+        "verify": {
+            "seed": synapse.seed,
+            "merkle_root": merkle_root,
+            "leaf_count": data.get("merkle_leaf_count"),
+            "challenge_index": synapse.challenge_index,
+        },
+    }
+    return context, response
+
+
+async def finish_challenge(self, context: dict, response, verified: bool):
+    """
+    Records the outcome of a verified challenge, advancing the chained commitment seed.
+
+    Parameters:
+    - context (dict): The challenge context returned by `send_challenge`.
+    - response (protocol.Challenge): The miner's response.
+    - verified (bool): Whether the response verified.
+    """
+    # Precomputed answers do not advance the chained commitment, keep the previous seed
+    verify_kwargs = context["verify"]
+    if verified and not is_precomputed_response(response, verify_kwargs["merkle_root"]):
+        data = context["data"]
+        data["prev_seed"] = verify_kwargs["seed"]
+        await update_metadata_for_data_hash(
+            context["hotkey"], context["data_hash"], data, self.database
+        )
+
 
-    if verified:
-        data["prev_seed"] = synapse.seed
-        await update_metadata_for_data_hash(hotkey, data_hash, data, self.database)
+async def handle_challenge(self, uid: int) -> typing.Tuple[bool, protocol.Challenge]:
+    """
+    Handles a challenge sent to a miner and verifies the response.
 
-    # Record the time taken for the challenge
+    Parameters:
+    - uid (int): The UID of the miner being challenged.
+
+    Returns:
+    - Tuple[bool, protocol.Challenge]: A tuple containing the verification result and the challenge.
+    """
+    # Take a pre-generated Common-Reference-String for this challenge
+    context, response = await send_challenge(self, uid, self.crs_pool.get())
+    if context is None:
+        return None, response
+
+    verified = verify_challenge_with_seed(response[0], **context["verify"])
+    await finish_challenge(self, context, response[0], verified)
     return verified, response
 
 
+async def handle_challenges(
+    self, uids: typing.List[int]
+) -> typing.List[typing.Tuple[bool, protocol.Challenge]]:
+    """
+    Challenges several miners at once and verifies the responses together.
+
+    All challenges of the round share one Common-Reference-String, so every commitment is
+    opened in a single batch by `verify_challenge_responses` rather than one by one.
+
+    Parameters:
+    - uids (List[int]): The UIDs of the miners being challenged.
+
+    Returns:
+    - List[Tuple[bool, protocol.Challenge]]: Per miner, as returned by `handle_challenge`.
+    """
+    crs = self.crs_pool.get()
+    sent = await asyncio.gather(*[send_challenge(self, uid, crs) for uid in uids])
+
+    answered = [(context, response) for context, response in sent if context]
+    verified = await asyncio.to_thread(
+        verify_challenge_responses,
+        [
+            {"synapse": response[0], **context["verify"]}
+            for context, response in answered
+        ],
+    )
+    await asyncio.gather(
+        *[
+            finish_challenge(self, context, response[0], ok)
+            for (context, response), ok in zip(answered, verified)
+        ]
+    )
+
+    verified = iter(verified)
+    return [
+        (next(verified) if context else None, response) for context, response in sent
+    ]
+
+
 async def challenge_data(self):
     """
     Initiates a series of challenges to miners, verifying their data storage through the network's consensus mechanism.
@@ -163,13 +268,9 @@ async def challenge_data(self):
     )
 
     start_time = time.time()
-    tasks = []
     uids = await get_available_query_miners(self, k=10)
     bt.logging.debug(f"challenge uids {uids}")
-    responses = []
-    for uid in uids:
-        tasks.append(asyncio.create_task(handle_challenge(self, uid)))
-    responses = await asyncio.gather(*tasks)
+    responses = await handle_challenges(self, uids)
 
     # Compute the rewards for the responses given the prompt.
     rewards: torch.FloatTensor = torch.zeros(len(responses), dtype=torch.float32).to(
@@ -204,6 +305,7 @@ async def challenge_data(self):
             success=verified,
             task_type="challenge",
             database=self.database,
+            buffer=self.statistics_buffer,
         )
 
         # Apply reward for this challenge
@@ -24,6 +24,12 @@ import datetime
 import bittensor as bt
 from loguru import logger
 
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    POINT_ENCODING_VERSION,
+)
+
 
 def check_config(cls, config: "bt.Config"):
     r"""Checks/validates the config namespace object."""
@@ -135,6 +141,19 @@ def add_args(cls, parser):
         help="Curve for elliptic curve cryptography.",
         choices=["P-256"],  # TODO: expand this list
     )
+    parser.add_argument(
+        "--neuron.point_encoding",
+        type=int,
+        default=POINT_ENCODING_VERSION,
+        choices=[POINT_ENCODING_LEGACY, POINT_ENCODING_SEC1],
+        help="Highest curve point encoding to negotiate with miners: 0 for the legacy text encoding, 1 for compressed SEC1.",
+    )
+    parser.add_argument(
+        "--neuron.crs_pool_depth",
+        type=int,
+        default=16,
+        help="Number of common reference strings generated ahead of time by a background thread. 0 generates them on demand.",
+    )
     parser.add_argument(
         "--neuron.maxsize",
         default=None,  # Use lognormal random gaussian if None (2**16, # 64KB)
@@ -165,6 +184,18 @@ def add_args(cls, parser):
         help="The chunk factor to divide data.",
         default=4,
     )
+    parser.add_argument(
+        "--neuron.precomputed_challenges",
+        action="store_true",
+        help="Ask miners to keep a chunk hash tree at store time, so later challenges only touch one chunk.",
+        default=False,
+    )
+    parser.add_argument(
+        "--neuron.merkle_chunk_count",
+        type=int,
+        help="Target number of leaves in store-time hash trees for precomputed challenges.",
+        default=64,
+    )
     parser.add_argument(
         "--neuron.num_concurrent_forwards",
         type=int,
@@ -225,6 +256,18 @@ def add_args(cls, parser):
         help="The number of blocks before data expires (seconds).",
         default=60 * 60 * 24 * 30,  # 30 days
     )
+    parser.add_argument(
+        "--neuron.buffer_statistics",
+        action="store_true",
+        help="If set, miner statistics are aggregated in memory and written once per step.",
+        default=False,
+    )
+    parser.add_argument(
+        "--neuron.ttl_purge_batch_size",
+        type=int,
+        help="The maximum number of expired TTL keys to purge per step.",
+        default=1000,
+    )
     parser.add_argument(
         "--neuron.profile",
         action="store_true",
@@ -262,6 +305,12 @@ def add_args(cls, parser):
         help="Redis configuration path.",
         default="/etc/redis/redis.conf",
     )
+    parser.add_argument(
+        "--database.disable_auto_pipeline",
+        action="store_true",
+        help="If set, redis commands are sent one by one instead of coalesced into pipelines.",
+        default=False,
+    )
 
     # Wandb args
     parser.add_argument(
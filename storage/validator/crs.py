@@ -0,0 +1,153 @@
+# The MIT License (MIT)
+# Copyright © 2023 Yuma Rao
+# Copyright © 2023 philanthrope
+
+# Permission is hereby granted, free of charge, to any person obtaining a copy of this software and associated
+# documentation files (the “Software”), to deal in the Software without restriction, including without limitation
+# the rights to use, copy, modify, merge, publish, distribute, sublicense, and/or sell copies of the Software,
+# and to permit persons to whom the Software is furnished to do so, subject to the following conditions:
+
+# The above copyright notice and this permission notice shall be included in all copies or substantial portions of
+# the Software.
+
+# THE SOFTWARE IS PROVIDED “AS IS”, WITHOUT WARRANTY OF ANY KIND, EXPRESS OR IMPLIED, INCLUDING BUT NOT LIMITED TO
+# THE WARRANTIES OF MERCHANTABILITY, FITNESS FOR A PARTICULAR PURPOSE AND NONINFRINGEMENT. IN NO EVENT SHALL
+# THE AUTHORS OR COPYRIGHT HOLDERS BE LIABLE FOR ANY CLAIM, DAMAGES OR OTHER LIABILITY, WHETHER IN AN ACTION
+# OF CONTRACT, TORT OR OTHERWISE, ARISING FROM, OUT OF OR IN CONNECTION WITH THE SOFTWARE OR THE USE OR OTHER
+# DEALINGS IN THE SOFTWARE.
+
+
+import queue
+import threading
+import bittensor as bt
+from typing import NamedTuple, Tuple
+
+from ..shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_VERSION,
+    ecc_point_to_hex,
+    setup_CRS,
+)
+
+
+class CRS(NamedTuple):
+    """
+    A Common Reference String (g, h) together with its hex forms in every point encoding.
+
+    Attributes:
+        g (ECC.EccPoint): The base point.
+        h (ECC.EccPoint): The random point.
+        curve (str): The curve of the points.
+        encoded (tuple): Per `POINT_ENCODING_*` version, the (g, h) hex pair.
+    """
+
+    g: object
+    h: object
+    curve: str
+    encoded: Tuple[Tuple[str, str], ...]
+
+    def hex(self, encoding: int = POINT_ENCODING_LEGACY) -> Tuple[str, str]:
+        """
+        Returns the pre-encoded (g, h) hex pair for a point encoding.
+        """
+        return self.encoded[encoding]
+
+
+def make_crs(curve: str = "P-256") -> CRS:
+    """
+    Generates a fresh CRS with `setup_CRS` and encodes it in every point encoding.
+
+    Args:
+        curve (str): The curve to generate the points on. Defaults to "P-256".
+
+    Returns:
+        CRS: The new CRS.
+    """
+    g, h = setup_CRS(curve=curve)
+    encoded = tuple(
+        (ecc_point_to_hex(g, encoding), ecc_point_to_hex(h, encoding))
+        for encoding in range(POINT_ENCODING_VERSION + 1)
+    )
+    return CRS(g, h, curve, encoded)
+
+
+class CRSPool:
+    """
+    Pool of pre-generated CRSs, kept full by a background thread.
+
+    Generating a CRS takes two key generations. The pool moves that work off the event loop
+    and out of the store and challenge fan-out: `get` pops a ready CRS, and the worker thread
+    refills the pool between rounds, while the validator waits for blocks. If the pool runs
+    dry, `get` generates a CRS inline, as before, and counts a miss.
+
+    Every CRS is handed out once.
+
+    Args:
+        depth (int): Number of CRSs kept ready. 0 disables the pool, every `get` generates inline.
+        curve (str): The curve to generate the points on.
+    """
+
+    def __init__(self, depth: int = 16, curve: str = "P-256"):
+        self.depth = depth
+        self.curve = curve
+        self.misses = 0
+        self._pool = queue.Queue(maxsize=max(depth, 1))
+        self._stop = threading.Event()
+        self._thread = None
+
+    def start(self):
+        """
+        Starts the refill thread, unless the pool is disabled or already running.
+        """
+        if self.depth <= 0 or self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._refill, name="crs-pool", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self):
+        """
+        Stops the refill thread. CRSs already in the pool are still handed out.
+        """
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+
+    def _refill(self):
+        while not self._stop.is_set():
+            try:
+                crs = make_crs(self.curve)
+            except Exception as e:
+                bt.logging.error(f"Failed to generate CRS: {e}")
+                self._stop.wait(1)
+                continue
+            # Blocks while the pool is full, waking up regularly to notice `stop`
+            while not self._stop.is_set():
+                try:
+                    self._pool.put(crs, timeout=1)
+                    break
+                except queue.Full:
+                    pass
+
+    def get(self) -> CRS:
+        """
+        Takes a CRS from the pool, or generates one if the pool is empty.
+
+        Returns:
+            CRS: A CRS not handed out before.
+        """
+        try:
+            return self._pool.get_nowait()
+        except queue.Empty:
+            if self.depth > 0:
+                self.misses += 1
+            return make_crs(self.curve)
+
+    def qsize(self) -> int:
+        """
+        Returns the number of CRSs ready in the pool.
+        """
+        return self._pool.qsize()
@@ -21,7 +21,135 @@ import time
 from redis import asyncio as aioredis
 import asyncio
 import bittensor as bt
-from typing import Dict, List, Any, Union, Optional
+from storage.validator.bonding import get_tiers_and_storage_limits
+from typing import AsyncIterator, Dict, List, Any, Union, Optional
+
+
+# Byte counters maintained alongside the hotkey:{ss58_address} metadata hashes.
+TOTAL_STORAGE_KEY = "total_storage"
+
+
+def hotkey_storage_key(ss58_address: str) -> str:
+    return f"hotkey_storage:{ss58_address}"
+
+
+# Size (in bytes) recorded in a JSON metadata blob, 0 if missing or unparsable.
+_LUA_METADATA_SIZE = """
+local function metadata_size(metadata_json)
+    if not metadata_json then
+        return 0
+    end
+    local ok, metadata = pcall(cjson.decode, metadata_json)
+    if not ok or type(metadata) ~= "table" then
+        return 0
+    end
+    return math.floor(tonumber(metadata["size"]) or 0)
+end
+"""
+
+# KEYS: hotkey hash, hotkey storage counter, total storage counter
+# ARGV: data hash, metadata json, size of the new metadata
+_SET_HOTKEY_METADATA_LUA = (
+    _LUA_METADATA_SIZE
+    + """
+local old_size = metadata_size(redis.call("HGET", KEYS[1], ARGV[1]))
+redis.call("HSET", KEYS[1], ARGV[1], ARGV[2])
+local delta = tonumber(ARGV[3]) - old_size
+if delta ~= 0 then
+    redis.call("INCRBY", KEYS[2], string.format("%d", delta))
+    redis.call("INCRBY", KEYS[3], string.format("%d", delta))
+end
+return delta
+"""
+)
+
+# KEYS: hotkey hash, hotkey storage counter, total storage counter
+# ARGV: data hashes to remove (along with their ttl: fields)
+_REMOVE_HOTKEY_METADATA_LUA = (
+    _LUA_METADATA_SIZE
+    + """
+local freed = 0
+for _, data_hash in ipairs(ARGV) do
+    freed = freed + metadata_size(redis.call("HGET", KEYS[1], data_hash))
+    redis.call("HDEL", KEYS[1], data_hash, "ttl:" .. data_hash)
+end
+if freed ~= 0 then
+    redis.call("DECRBY", KEYS[2], string.format("%d", freed))
+    redis.call("DECRBY", KEYS[3], string.format("%d", freed))
+end
+return freed
+"""
+)
+
+# KEYS: hotkey hash, hotkey storage counter
+_RECONCILE_HOTKEY_STORAGE_LUA = (
+    _LUA_METADATA_SIZE
+    + """
+local fields = redis.call("HGETALL", KEYS[1])
+local used = 0
+for i = 1, #fields, 2 do
+    if string.sub(fields[i], 1, 4) ~= "ttl:" then
+        used = used + metadata_size(fields[i + 1])
+    end
+end
+local counted = tonumber(redis.call("GET", KEYS[2]) or "0")
+if used == 0 then
+    redis.call("DEL", KEYS[2])
+else
+    redis.call("SET", KEYS[2], string.format("%d", used))
+end
+return used - counted
+"""
+)
+
+# KEYS: total storage counter, followed by every hotkey storage counter
+_RECONCILE_TOTAL_STORAGE_LUA = """
+local total = 0
+for i = 2, #KEYS do
+    total = total + tonumber(redis.call("GET", KEYS[i]) or "0")
+end
+redis.call("SET", KEYS[1], string.format("%d", total))
+return total
+"""
+
+
+def _storage_keys(ss58_address: str) -> List[str]:
+    return [
+        f"hotkey:{ss58_address}",
+        hotkey_storage_key(ss58_address),
+        TOTAL_STORAGE_KEY,
+    ]
+
+
+# Sorted set of "{ss58_address}:{data_hash}" members scored by expiry timestamp.
+TTL_EXPIRY_KEY = "ttl_expiry"
+
+# KEYS: ttl expiry index
+# ARGV: current timestamp, maximum number of members to pop
+_POP_EXPIRED_TTL_LUA = """
+local expired = redis.call("ZRANGEBYSCORE", KEYS[1], "-inf", ARGV[1], "LIMIT", 0, ARGV[2])
+if #expired > 0 then
+    redis.call("ZREM", KEYS[1], unpack(expired))
+end
+return expired
+"""
+
+
+def _ttl_member(ss58_address: str, data_hash: str) -> str:
+    return f"{ss58_address}:{data_hash}"
+
+
+async def _queue_remove_metadata(
+    pipe, remove_metadata, ss58_address: str, data_hashes: List[str]
+):
+    """
+    Queues the removal of data hashes from a hotkey, its storage counters and indexes on a pipeline.
+    """
+    await remove_metadata(
+        keys=_storage_keys(ss58_address), args=data_hashes, client=pipe
+    )
+    pipe.srem(f"challenges:{ss58_address}", *data_hashes)
+    pipe.zrem(TTL_EXPIRY_KEY, *[_ttl_member(ss58_address, h) for h in data_hashes])
 
 
 async def set_ttl_for_hash_and_hotkey(
@@ -39,12 +167,19 @@ async def set_ttl_for_hash_and_hotkey(
         ttl (int): The TTL in seconds. (Default 30 days)
     """
     key = f"hotkey:{ss58_address}"
+    generated = time.time()
     ttl_metadata = {
-        "generated": time.time(),  # This is required to compare against later
+        "generated": generated,  # This is required to compare against later
         "ttl": ttl,
     }
     ttl_metadata_json = json.dumps(ttl_metadata)
-    await database.hset(key, f"ttl:{data_hash}", ttl_metadata_json)
+    async with database.pipeline(transaction=False) as pipe:
+        pipe.hset(key, f"ttl:{data_hash}", ttl_metadata_json)
+        # Index by expiry so purges only touch what has actually expired
+        pipe.zadd(
+            TTL_EXPIRY_KEY, {_ttl_member(ss58_address, data_hash): generated + ttl}
+        )
+        await pipe.execute()
     bt.logging.trace(f"Set TTL for {data_hash} to {ttl} seconds.")
 
 
@@ -118,25 +253,84 @@ async def is_ttl_expired_for_hash_and_hotkey(
         return False
 
 
-async def purge_expired_ttl_keys(database: aioredis.Redis):
+async def purge_expired_ttl_keys(
+    database: aioredis.Redis, batch_size: int = 1000
+) -> int:
     """
-    Purges all expired TTL keys from the database.
+    Purges expired TTL keys from the database.
+
+    Pops at most `batch_size` expired entries from the `ttl_expiry` index per call, so
+    the cost scales with what expired rather than with the size of the database.
+    Anything left over is picked up by the next call, as are the popped entries if
+    removing their metadata fails.
 
     Parameters:
         database (aioredis.Redis): The Redis client instance.
+        batch_size (int): The maximum number of entries to purge.
+
+    Returns:
+        The number of expired entries purged.
     """
-    # Iterate over all hotkeys
-    async for hotkey in database.scan_iter("*"):
-        if not hotkey.startswith(b"hotkey:"):
-            continue
-        data_hashes = await database.hgetall(hotkey)
-        for data_hash in data_hashes:
-            data_hash = data_hash.decode("utf-8")
-            if data_hash.startswith("ttl:"):
-                hk = hotkey.decode("utf-8")[7:]
-                hs = data_hash[4:]
-                if await is_ttl_expired_for_hash_and_hotkey(hs, hk, database):
-                    await remove_metadata_from_hotkey(hk, hs, database)
+    now = time.time()
+    pop_expired = database.register_script(_POP_EXPIRED_TTL_LUA)
+    expired = await pop_expired(keys=[TTL_EXPIRY_KEY], args=[now, batch_size])
+    if len(expired) == 0:
+        return 0
+
+    expired_by_hotkey = {}
+    for member in expired:
+        ss58_address, data_hash = member.decode("utf-8").split(":", 1)
+        expired_by_hotkey.setdefault(ss58_address, []).append(data_hash)
+
+    remove_metadata = database.register_script(_REMOVE_HOTKEY_METADATA_LUA)
+    try:
+        async with database.pipeline(transaction=False) as pipe:
+            for ss58_address, data_hashes in expired_by_hotkey.items():
+                await _queue_remove_metadata(
+                    pipe, remove_metadata, ss58_address, data_hashes
+                )
+            await pipe.execute()
+    except Exception:
+        # Put the popped entries back, still expired, so the next call retries them
+        await database.zadd(TTL_EXPIRY_KEY, {member: now for member in expired})
+        raise
+
+    bt.logging.debug(f"Purged {len(expired)} expired TTL keys.")
+    return len(expired)
+
+
+async def rebuild_ttl_index(database: aioredis.Redis, force: bool = False):
+    """
+    Builds the `ttl_expiry` index from the `ttl:` fields of every hotkey.
+
+    The index is maintained on write by `set_ttl_for_hash_and_hotkey`. This one-time
+    backfill covers data written before the index existed. It is a no-op once the
+    `index:ttl_expiry` marker is set, unless `force` is True.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        force (bool): Rebuild even if the index was already built.
+    """
+    if not force and await database.exists("index:ttl_expiry"):
+        return
+
+    bt.logging.info("Building TTL expiry index...")
+    async for hotkey_key in database.scan_iter("hotkey:*"):
+        ss58_address = hotkey_key.decode("utf-8").split(":")[1]
+        expiries = {}
+        for field, ttl_metadata in (await database.hgetall(hotkey_key)).items():
+            if not field.startswith(b"ttl:"):
+                continue
+            ttl_metadata = json.loads(ttl_metadata)
+            data_hash = field.decode("utf-8")[4:]
+            expiries[_ttl_member(ss58_address, data_hash)] = float(
+                ttl_metadata["generated"]
+            ) + int(ttl_metadata["ttl"])
+        if len(expiries):
+            await database.zadd(TTL_EXPIRY_KEY, expiries)
+
+    await database.set("index:ttl_expiry", int(time.time()))
+    bt.logging.info("TTL expiry index built.")
 
 
 async def add_metadata_to_hotkey(
@@ -145,6 +339,7 @@ async def add_metadata_to_hotkey(
     metadata: Dict,
     database: aioredis.Redis,
     ttl: Optional[int] = None,
+    hash_type: Optional[str] = None,
 ):
     """
     Associates a data hash and its metadata with a hotkey in Redis.
@@ -155,14 +350,33 @@ async def add_metadata_to_hotkey(
         metadata (dict): The metadata to associate with the data hash. Includes the size of the data, the seed,
             and the encryption payload. E.g. {'size': 123, 'seed': 456, 'encryption_payload': 'abc'}.
         database (aioredis.Redis): The Redis client instance.
+        hash_type (str, optional): 'full_file', 'chunk' or 'challenge' if known by the caller.
+            If None, the type is looked up in the same round trip as the write.
+
+    Challenge hashes are also added to the `challenges:{ss58_address}` index set, and the
+    hotkey and total storage counters are adjusted by the size of the data atomically.
     """
     # Serialize the metadata as a JSON string
     metadata_json = json.dumps(metadata)
-    # Use HSET to associate the data hash with the hotkey
-    key = f"hotkey:{ss58_address}"
-    await database.hset(key, data_hash, metadata_json)
+    # Associate the data hash with the hotkey and account for its size
+    set_metadata = database.register_script(_SET_HOTKEY_METADATA_LUA)
+    async with database.pipeline(transaction=False) as pipe:
+        await set_metadata(
+            keys=_storage_keys(ss58_address),
+            args=[data_hash, metadata_json, int(metadata.get("size", 0))],
+            client=pipe,
+        )
+        if hash_type is None:
+            pipe.exists(f"file:{data_hash}")
+            pipe.exists(f"chunk_files:{data_hash}", f"chunk:{data_hash}")
+        results = await pipe.execute()
     bt.logging.trace(f"Associated data hash {data_hash} with hotkey {ss58_address}.")
 
+    if hash_type is None:
+        hash_type = _hash_type_from_exists(results[1], results[2])
+    if hash_type == "challenge":
+        await index_challenge_hashes(ss58_address, [data_hash], database)
+
     if ttl:
         await set_ttl_for_hash_and_hotkey(data_hash, ss58_address, database, ttl)
 
@@ -178,10 +392,11 @@ async def remove_metadata_from_hotkey(
         data_hash (str): The subkey representing the data hash.
         database (aioredis.Redis): The Redis client instance.
     """
-    # Use HDEL to remove the data hash from the hotkey
-    key = f"hotkey:{ss58_address}"
-    await database.hdel(key, data_hash)
-    await database.hdel(key, f"ttl:{data_hash}")  # delete the TTL as well
+    # Remove the data hash (and its TTL) from the hotkey and release its size
+    remove_metadata = database.register_script(_REMOVE_HOTKEY_METADATA_LUA)
+    async with database.pipeline(transaction=False) as pipe:
+        await _queue_remove_metadata(pipe, remove_metadata, ss58_address, [data_hash])
+        await pipe.execute()
     bt.logging.trace(f"Removed data hash {data_hash} from hotkey {ss58_address}.")
 
 
@@ -271,8 +486,12 @@ async def update_metadata_for_data_hash(
     """
     # Serialize the new metadata as a JSON string
     new_metadata_json = json.dumps(new_metadata)
-    # Update the field in the hash with the new metadata
-    await database.hset(f"hotkey:{ss58_address}", data_hash, new_metadata_json)
+    # Update the field in the hash with the new metadata, keeping storage counters in sync
+    set_metadata = database.register_script(_SET_HOTKEY_METADATA_LUA)
+    await set_metadata(
+        keys=_storage_keys(ss58_address),
+        args=[data_hash, new_metadata_json, int(new_metadata.get("size", 0))],
+    )
     bt.logging.trace(
         f"Updated metadata for data hash {data_hash} under hotkey {ss58_address}."
     )
@@ -383,11 +602,7 @@ async def get_all_hotkeys_for_data_hash(
             all_hotkeys.update(chunk_info["hotkeys"])
     else:
         # Fetch hotkeys for a single chunk hash
-        chunk_metadata = await database.hgetall(f"chunk:{data_hash}")
-        if chunk_metadata:
-            hotkeys = chunk_metadata.get(b"hotkeys")
-            if hotkeys:
-                all_hotkeys.update(hotkeys.decode().split(","))
+        all_hotkeys.update(await get_hotkeys_for_chunk(data_hash, database))
 
     return list(all_hotkeys)
 
@@ -398,6 +613,9 @@ async def total_hotkey_storage(
     """
     Calculates the total storage used by a hotkey in the database.
 
+    Reads the `hotkey_storage:{hotkey}` counter maintained by `add_metadata_to_hotkey`
+    and `remove_metadata_from_hotkey`.
+
     Parameters:
         database (aioredis.Redis): The Redis client instance.
         hotkey (str): The key representing the hotkey.
@@ -405,19 +623,8 @@ async def total_hotkey_storage(
     Returns:
         The total storage used by the hotkey in bytes.
     """
-    total_storage = 0
-    keys = await database.hkeys(f"hotkey:{hotkey}")
-    for data_hash in keys:
-        if data_hash.startswith(b"ttl:"):
-            continue
-        # Get the metadata for the current data hash
-        metadata = await get_metadata_for_hotkey_and_hash(
-            hotkey, data_hash, database, verbose
-        )
-        if metadata:
-            # Add the size of the data to the total storage
-            total_storage += metadata["size"]
-    return total_storage
+    total_storage = await database.get(hotkey_storage_key(hotkey))
+    return int(total_storage or 0)
 
 
 async def hotkey_at_capacity(
@@ -426,6 +633,9 @@ async def hotkey_at_capacity(
     """
     Checks if the hotkey is at capacity.
 
+    The storage limit is served from the validator's tier cache, so this is a
+    single read of the hotkey's storage counter.
+
     Parameters:
         database (aioredis.Redis): The Redis client instance.
         hotkey (str): The key representing the hotkey.
@@ -433,32 +643,8 @@ async def hotkey_at_capacity(
     Returns:
         True if the hotkey is at capacity, False otherwise.
     """
-    # Get the total storage used by the hotkey
-    total_storage = await total_hotkey_storage(hotkey, database, verbose)
-    # Check if the hotkey is at capacity
-    byte_limit = await database.hget(f"stats:{hotkey}", "storage_limit")
-    if byte_limit is None:
-        if verbose:
-            bt.logging.trace(f"Could not find storage limit for {hotkey}.")
-        return False
-    try:
-        limit = int(byte_limit)
-    except Exception as e:
-        if verbose:
-            bt.logging.trace(f"Could not parse storage limit for {hotkey} | {e}.")
-        return False
-    if total_storage >= limit:
-        if verbose:
-            bt.logging.trace(
-                f"Hotkey {hotkey} is at max capacity {limit // 1024**3} GB."
-            )
-        return True
-    else:
-        if verbose:
-            bt.logging.trace(
-                f"Hotkey {hotkey} has {(limit - total_storage) // 1024**3} GB free."
-            )
-        return False
+    hotkeys_capacity = await cache_hotkeys_capacity([hotkey], database, verbose)
+    return await check_hotkeys_capacity(hotkeys_capacity, hotkey, verbose)
 
 
 async def cache_hotkeys_capacity(
@@ -474,25 +660,19 @@ async def cache_hotkeys_capacity(
     Returns:
         dict: A dictionary with hotkeys as keys and a tuple of (total_storage, limit) as values.
     """
-    hotkeys_capacity = {}
+    tiers = await get_tiers_and_storage_limits(hotkeys, database)
 
-    for hotkey in hotkeys:
-        # Get the total storage used by the hotkey
-        total_storage = await total_hotkey_storage(hotkey, database, verbose)
-        # Get the byte limit for the hotkey
-        byte_limit = await database.hget(f"stats:{hotkey}", "storage_limit")
-
-        if byte_limit is None:
-            bt.logging.warning(f"Could not find storage limit for {hotkey}.")
-            limit = None
-        else:
-            try:
-                limit = int(byte_limit)
-            except Exception as e:
-                bt.logging.warning(f"Could not parse storage limit for {hotkey} | {e}.")
-                limit = None
+    async with database.pipeline(transaction=False) as pipe:
+        for hotkey in hotkeys:
+            pipe.get(hotkey_storage_key(hotkey))
+        total_storages = await pipe.execute()
 
-        hotkeys_capacity[hotkey] = (total_storage, limit)
+    hotkeys_capacity = {}
+    for hotkey, total_storage in zip(hotkeys, total_storages):
+        _, limit = tiers[hotkey]
+        if limit is None and verbose:
+            bt.logging.trace(f"Could not find storage limit for {hotkey}.")
+        hotkeys_capacity[hotkey] = (int(total_storage or 0), limit)
 
     return hotkeys_capacity
 
@@ -538,16 +718,52 @@ async def total_validator_storage(database: aioredis.Redis) -> int:
     Returns:
         The total storage used by all hotkeys in the database in bytes.
     """
-    total_storage = 0
-    # Iterate over all hotkeys
-    async for hotkey in database.scan_iter("*"):
-        if not hotkey.startswith(b"hotkey:"):
-            continue
-        # Grab storage for that hotkey
-        total_storage += await total_hotkey_storage(
-            hotkey.decode().split(":")[1], database
-        )
-    return total_storage
+    total_storage = await database.get(TOTAL_STORAGE_KEY)
+    return int(total_storage or 0)
+
+
+async def reconcile_storage_counters(
+    database: aioredis.Redis, force: bool = True
+) -> int:
+    """
+    Recomputes the per-hotkey and total storage counters from the stored metadata.
+
+    Each hotkey is recounted atomically, then the total is set to the sum of the hotkey
+    counters in a single script, so this is safe to run while the validator is writing.
+    Use it to repair the counters or to initialize them for data stored before they existed.
+
+    Parameters:
+        database (aioredis.Redis): The Redis client instance.
+        force (bool): If False, only reconcile when the total counter does not exist yet.
+
+    Returns:
+        The total drift in bytes that was corrected.
+    """
+    if not force and await database.exists(TOTAL_STORAGE_KEY):
+        return 0
+
+    hotkeys = set()
+    async for key in database.scan_iter("hotkey:*"):
+        hotkeys.add(key.decode("utf-8").split(":")[1])
+    async for key in database.scan_iter("hotkey_storage:*"):
+        hotkeys.add(key.decode("utf-8").split(":")[1])
+
+    reconcile_hotkey = database.register_script(_RECONCILE_HOTKEY_STORAGE_LUA)
+    total_drift = 0
+    for hotkey in hotkeys:
+        drift = await reconcile_hotkey(keys=_storage_keys(hotkey)[:2])
+        if drift != 0:
+            bt.logging.debug(
+                f"Corrected storage counter for {hotkey} by {drift} bytes."
+            )
+        total_drift += drift
+
+    reconcile_total = database.register_script(_RECONCILE_TOTAL_STORAGE_LUA)
+    await reconcile_total(
+        keys=[TOTAL_STORAGE_KEY] + [hotkey_storage_key(hotkey) for hotkey in hotkeys]
+    )
+    bt.logging.info(f"Reconciled storage counters, total drift {total_drift} bytes.")
+    return total_drift
 
 
 async def get_miner_statistics(database: aioredis.Redis) -> Dict[str, Dict[str, str]]:
@@ -662,6 +878,61 @@ async def retrieve_encryption_payload(
         return None
 
 
+# Number of chunks fetched per pipelined round trip when reading a file's chunk map.
+CHUNK_PAGE_SIZE = 1000
+
+
+async def iter_chunks_for_file(
+    file_hash: str, database: aioredis.Redis, page_size: int = CHUNK_PAGE_SIZE
+) -> AsyncIterator[Dict[int, Dict[str, Union[str, List[str], int]]]]:
+    """
+    Stream the chunk hashes and metadata of a file in pages, ordered by chunk index.
+
+    Each page costs two round trips, a ZRANGE over the next `page_size` chunk indices
+    and a single pipeline reading their sizes and replica sets, so very large files never
+    need to be held in memory at once or fetched one chunk at a time.
+
+    Parameters:
+    - file_hash (str): The full hash of the file whose chunks are to be retrieved.
+    - database (aioredis.Redis): An instance of the Redis database.
+    - page_size (int): The maximum number of chunks per page.
+
+    Yields:
+    - dict: A page of chunk metadata keyed by chunk index. Chunks without metadata are skipped.
+    """
+    file_chunks_key = f"file:{file_hash}"
+    start = 0
+    while True:
+        chunk_hashes_with_index = await database.zrange(
+            file_chunks_key, start, start + page_size - 1, withscores=True
+        )
+        if not chunk_hashes_with_index:
+            return
+
+        async with database.pipeline(transaction=False) as pipe:
+            for chunk_hash_bytes, _ in chunk_hashes_with_index:
+                chunk_hash = chunk_hash_bytes.decode()
+                pipe.hget(f"chunk:{chunk_hash}", "size")
+                pipe.smembers(chunk_hotkeys_key(chunk_hash))
+            results = await pipe.execute()
+
+        page = {}
+        for (chunk_hash_bytes, index), chunk_size, hotkeys in zip(
+            chunk_hashes_with_index, results[0::2], results[1::2]
+        ):
+            if chunk_size is not None:
+                page[int(index)] = {
+                    "chunk_hash": chunk_hash_bytes.decode(),
+                    "hotkeys": [hotkey.decode() for hotkey in hotkeys],
+                    "size": int(chunk_size),
+                }
+        yield page
+
+        if len(chunk_hashes_with_index) < page_size:
+            return
+        start += page_size
+
+
 async def get_all_chunks_for_file(
     file_hash: str, database: aioredis.Redis
 ) -> Optional[Dict[int, Dict[str, Union[str, List[str], int]]]]:
@@ -670,6 +941,7 @@ async def get_all_chunks_for_file(
 
     This function fetches the hashes and metadata of all chunks associated with a particular file hash.
     The data is retrieved from a sorted set and returned in a dictionary with the chunk index as the key.
+    Metadata is fetched in pipelined pages (see `iter_chunks_for_file`).
 
     Parameters:
     - file_hash (str): The full hash of the file whose chunks are to be retrieved.
@@ -679,23 +951,10 @@ async def get_all_chunks_for_file(
     - dict: A dictionary where keys are chunk indices, and values are dictionaries with chunk metadata.
       Returns None if no chunks are found.
     """
-    file_chunks_key = f"file:{file_hash}"
-    chunk_hashes_with_index = await database.zrange(
-        file_chunks_key, 0, -1, withscores=True
-    )
-    if not chunk_hashes_with_index:
-        return None
-
-    chunks_info = {}
-    for chunk_hash_bytes, index in chunk_hashes_with_index:
-        chunk_hash = chunk_hash_bytes.decode()
-        chunk_metadata = await database.hgetall(f"chunk:{chunk_hash}")
-        if chunk_metadata:
-            chunks_info[int(index)] = {
-                "chunk_hash": chunk_hash,
-                "hotkeys": chunk_metadata[b"hotkeys"].decode().split(","),
-                "size": int(chunk_metadata[b"size"]),
-            }
+    chunks_info = None
+    async for page in iter_chunks_for_file(file_hash, database):
+        chunks_info = chunks_info or {}
+        chunks_info.update(page)
     return chunks_info
 
 
@@ -718,54 +977,53 @@ async def get_hotkeys_for_hash(
 
     if is_full_hash:
         # Get UIDs for all chunks under the full hash
-        chunks_info = get_all_chunks_for_file(hash_value, database)
+        chunks_info = await get_all_chunks_for_file(hash_value, database)
         if chunks_info is None:
             return None
         for chunk_info in chunks_info.values():
             all_hotkeys.update(chunk_info["hotkeys"])
     else:
         # Get UIDs for a single chunk hash
-        chunk_metadata = await database.hgetall(f"chunk:{hash_value}")
-        if chunk_metadata:
-            hotkeys = chunk_metadata.get(b"hotkeys")
-            if hotkeys:
-                all_hotkeys.update(hotkeys.decode().split(","))
+        all_hotkeys.update(await get_hotkeys_for_chunk(hash_value, database))
 
     return list(all_hotkeys)
 
 
+def chunk_hotkeys_key(chunk_hash: str) -> str:
+    return f"chunk_hotkeys:{chunk_hash}"
+
+
+async def get_hotkeys_for_chunk(chunk_hash: str, database: aioredis.Redis) -> List[str]:
+    """
+    Retrieve the hotkeys storing replicas of a specific chunk.
+
+    Parameters:
+    - chunk_hash (str): The hash of the chunk.
+    - database (aioredis.Redis): An instance of the Redis database.
+
+    Returns:
+    - List[str]: The hotkeys holding the chunk.
+    """
+    hotkeys = await database.smembers(chunk_hotkeys_key(chunk_hash))
+    return [hotkey.decode("utf-8") for hotkey in hotkeys]
+
+
 async def add_hotkey_to_chunk(chunk_hash: str, hotkey: str, database: aioredis.Redis):
     """
     Add a hotkey to the metadata of a specific chunk.
 
-    This function updates the chunk's metadata to include the given hotkey. If the hotkey is already
-    associated with the chunk, no changes are made.
+    This function adds the given hotkey to the chunk's `chunk_hotkeys:{chunk_hash}` replica set
+    in a single atomic command. If the hotkey is already associated with the chunk, no changes are made.
 
     Parameters:
     - chunk_hash (str): The hash of the chunk to which the hotkey is to be added.
     - hotkey (str): The hotkey to add to the chunk's metadata.
     - database (aioredis.Redis): An instance of the Redis database.
     """
-    chunk_metadata_key = f"chunk:{chunk_hash}"
-
-    # Fetch existing UIDs for the chunk
-    existing_metadata = await database.hget(chunk_metadata_key, "hotkeys")
-    if existing_metadata:
-        existing_hotkeys = existing_metadata.decode().split(",")
-
-        # Add new UID if it's not already in the list
-        if hotkey not in existing_hotkeys:
-            updated_hotkeys = existing_hotkeys + [hotkey]
-            await database.hset(
-                chunk_metadata_key, "hotkeys", ",".join(updated_hotkeys)
-            )
-            print(f"UID {hotkey} added to chunk {chunk_hash}.")
-        else:
-            print(f"UID {hotkey} already exists for chunk {chunk_hash}.")
+    if await database.sadd(chunk_hotkeys_key(chunk_hash), hotkey):
+        bt.logging.trace(f"UID {hotkey} added to chunk {chunk_hash}.")
     else:
-        # If no UIDs are associated with this chunk, create a new entry
-        await database.hmset(chunk_metadata_key, {"hotkeys": hotkey})
-        print(f"UID {hotkey} set for new chunk {chunk_hash}.")
+        bt.logging.trace(f"UID {hotkey} already exists for chunk {chunk_hash}.")
 
 
 async def remove_hotkey_from_chunk(
@@ -774,35 +1032,20 @@ async def remove_hotkey_from_chunk(
     """
     Remove a hotkey from the metadata of a specific chunk.
 
-    This function updates the chunk's metadata to remove the given hotkey. If the hotkey is not
-    associated with the chunk, no changes are made.
+    This function removes the given hotkey from the chunk's replica set in a single atomic
+    command. If the hotkey is not associated with the chunk, no changes are made.
 
     Parameters:
     - chunk_hash (str): The hash of the chunk to which the hotkey is to be added.
     - hotkey (str): The hotkey to add to the chunk's metadata.
     - database (aioredis.Redis): An instance of the Redis database.
     """
-    chunk_metadata_key = f"chunk:{chunk_hash}"
-
-    # Fetch existing UIDs for the chunk
-    existing_metadata = await database.hget(chunk_metadata_key, "hotkeys")
-    if existing_metadata:
-        existing_hotkeys = existing_metadata.decode().split(",")
-
-        # Remove UID if it's in the list
-        if hotkey in existing_hotkeys:
-            existing_hotkeys.remove(hotkey)
-            await database.hset(
-                chunk_metadata_key, "hotkeys", ",".join(existing_hotkeys)
-            )
-            if verbose:
-                bt.logging.trace(f"UID {hotkey} removed from chunk {chunk_hash}.")
+    removed = await database.srem(chunk_hotkeys_key(chunk_hash), hotkey)
+    if verbose:
+        if removed:
+            bt.logging.trace(f"UID {hotkey} removed from chunk {chunk_hash}.")
         else:
-            if verbose:
-                bt.logging.trace(f"UID {hotkey} does not exist for chunk {chunk_hash}.")
-    else:
-        if verbose:
-            bt.logging.trace(f"No UIDs associated with chunk {chunk_hash}.")
+            bt.logging.trace(f"UID {hotkey} does not exist for chunk {chunk_hash}.")
 
 
 async def store_chunk_metadata(
@@ -816,6 +1059,7 @@ async def store_chunk_metadata(
     Store metadata for a specific file chunk.
 
     This function creates or updates the metadata for a chunk, including the associated hotkeys and chunk size.
+    Hotkeys are merged into the chunk's replica set, so concurrent stores of the same chunk never drop replicas.
 
     Parameters:
     - full_hash (str): The full hash of the file that the chunk belongs to.
@@ -824,14 +1068,64 @@ async def store_chunk_metadata(
     - chunk_size (int): The size of the chunk in bytes.
     - database (aioredis.Redis): An instance of the Redis database.
     """
-    chunk_metadata_key = f"chunk:{chunk_hash}"
-    existing_metadata = await database.hget(chunk_metadata_key, "hotkeys")
-    if existing_metadata:
-        existing_hotkeys = existing_metadata.decode().split(",")
-        hotkeys = set(existing_hotkeys + hotkeys)
-    metadata = {"hotkeys": ",".join(hotkeys), "size": chunk_size}
+    async with database.pipeline(transaction=False) as pipe:
+        pipe.hset(f"chunk:{chunk_hash}", "size", chunk_size)
+        if len(hotkeys):
+            pipe.sadd(chunk_hotkeys_key(chunk_hash), *hotkeys)
+        # Index chunk -> file membership, and make sure the hash is no longer a challenge
+        pipe.sadd(f"chunk_files:{chunk_hash}", full_hash)
+        for hotkey in hotkeys:
+            pipe.srem(f"challenges:{hotkey}", chunk_hash)
+        await pipe.execute()
+
+
+# KEYS: chunk metadata hash, chunk replica set
+_MIGRATE_CHUNK_HOTKEYS_LUA = """
+local hotkeys = redis.call("HGET", KEYS[1], "hotkeys")
+if not hotkeys then
+    return 0
+end
+local added = 0
+for hotkey in string.gmatch(hotkeys, "[^,]+") do
+    added = added + redis.call("SADD", KEYS[2], hotkey)
+end
+redis.call("HDEL", KEYS[1], "hotkeys")
+return added
+"""
+
+
+async def migrate_chunk_hotkeys_to_sets(
+    database: aioredis.Redis, force: bool = True
+) -> int:
+    """
+    Moves chunk replica membership from the comma-joined `hotkeys` field of `chunk:{chunk_hash}`
+    to the `chunk_hotkeys:{chunk_hash}` set.
+
+    Each chunk is converted atomically and already converted chunks are skipped, so this is
+    safe to run repeatedly and while the validator is running.
+
+    Parameters:
+    - database (aioredis.Redis): An instance of the Redis database.
+    - force (bool): If False, skip the scan when the `index:chunk_hotkeys` marker shows it already ran.
+
+    Returns:
+    - int: The number of chunks converted.
+    """
+    if not force and await database.exists("index:chunk_hotkeys"):
+        return 0
+
+    migrate_chunk = database.register_script(_MIGRATE_CHUNK_HOTKEYS_LUA)
+    converted = 0
+    async for chunk_key in database.scan_iter("chunk:*"):
+        chunk_hash = chunk_key.decode("utf-8").split(":")[1]
+        if not await database.hexists(chunk_key, "hotkeys"):
+            continue
+        await migrate_chunk(keys=[chunk_key, chunk_hotkeys_key(chunk_hash)])
+        converted += 1
 
-    await database.hmset(chunk_metadata_key, metadata)
+    await database.set("index:chunk_hotkeys", int(time.time()))
+    bt.logging.info(f"Converted replica membership of {converted} chunks to sets.")
+    return converted
 
 
 async def get_ordered_metadata(
@@ -840,8 +1134,8 @@ async def get_ordered_metadata(
     """
     Retrieve the metadata for all chunks of a file in the order of their indices.
 
-    This function calls `get_all_chunks_for_file` to fetch all chunks' metadata and then sorts
-    them based on their indices to maintain the original file order.
+    This function streams all chunks' metadata with `iter_chunks_for_file`, which returns
+    them ordered by their indices to maintain the original file order.
 
     Parameters:
     - file_hash (str): The full hash of the file whose ordered metadata is to be retrieved.
@@ -851,12 +1145,11 @@ async def get_ordered_metadata(
     - List[dict]: A list of metadata dictionaries for each chunk, ordered by their chunk index.
       Returns None if no chunks are found.
     """
-    chunks_info = await get_all_chunks_for_file(file_hash, database)
-    if chunks_info is None:
-        return None
-
-    ordered_chunks = sorted(chunks_info.items(), key=lambda x: x[0])
-    return [chunk_info for _, chunk_info in ordered_chunks]
+    ordered_metadata = None
+    async for page in iter_chunks_for_file(file_hash, database):
+        ordered_metadata = ordered_metadata or []
+        ordered_metadata.extend(chunk_info for _, chunk_info in sorted(page.items()))
+    return ordered_metadata
 
 
 # Function to grab mutually exclusiv UIDs for a specific full_hash (get chunks of non-overlapping UIDs)
@@ -878,13 +1171,12 @@ async def retrieve_mutually_exclusive_hotkeys_full_hash(
     - Dict[str, List[str]]: A dict of mutually exclusive hotkeys for each corresponding hash.
       Returns None if no chunks are found.
     """
-    chunks_info = await get_all_chunks_for_file(full_hash, database)
-    if chunks_info is None:
+    ordered_metadata = await get_ordered_metadata(full_hash, database)
+    if ordered_metadata is None:
         return None
 
-    ordered_chunks = sorted(chunks_info.items(), key=lambda x: x[0])
     mutually_exclusive_hotkeys = {}
-    for _, chunk_info in ordered_chunks:
+    for chunk_info in ordered_metadata:
         if chunk_info["chunk_hash"] not in mutually_exclusive_hotkeys:
             mutually_exclusive_hotkeys[chunk_info["chunk_hash"]] = []
         for hotkey in chunk_info["hotkeys"]:
@@ -894,6 +1186,14 @@ async def retrieve_mutually_exclusive_hotkeys_full_hash(
     return mutually_exclusive_hotkeys
 
 
+def _hash_type_from_exists(is_full_file: int, is_chunk: int) -> str:
+    if is_full_file:
+        return "full_file"
+    if is_chunk:
+        return "chunk"
+    return "challenge"
+
+
 async def check_hash_type(data_hash: str, database: aioredis.Redis) -> str:
     """
     Determine if the data_hash is a full file hash, a chunk hash, or a standalone challenge hash.
@@ -905,18 +1205,15 @@ async def check_hash_type(data_hash: str, database: aioredis.Redis) -> str:
     Returns:
     - str: A string indicating the type of hash ('full_file', 'chunk', or 'challenge').
     """
-    is_full_file = await database.exists(f"file:{data_hash}")
-    if is_full_file:
-        return "full_file"
+    async with database.pipeline(transaction=False) as pipe:
+        pipe.exists(f"file:{data_hash}")
+        pipe.exists(f"chunk_files:{data_hash}", f"chunk:{data_hash}")
+        is_full_file, is_chunk = await pipe.execute()
 
-    is_chunk = await database.exists(f"chunk:{data_hash}")
-    if is_chunk:
-        return "chunk"
-
-    return "challenge"
+    return _hash_type_from_exists(is_full_file, is_chunk)
 
 
-async def is_file_chunk(chunk_hash: str, database: aioredis.Redis) -> str:
+async def is_file_chunk(chunk_hash: str, database: aioredis.Redis) -> bool:
     """
     Determines if the given chunk_hash is part of a full file.
 
@@ -927,10 +1224,42 @@ async def is_file_chunk(chunk_hash: str, database: aioredis.Redis) -> str:
     Returns:
     - bool: True if the hash belongs to a full file, false otherwise (challenge data)
     """
-    async for key in database.scan_iter(match="chunk:*"):
-        if chunk_hash in key.decode():
-            return True
-    return False
+    return await database.exists(f"chunk_files:{chunk_hash}", f"chunk:{chunk_hash}") > 0
+
+
+async def get_files_for_chunk(chunk_hash: str, database: aioredis.Redis) -> List[str]:
+    """
+    Retrieves the full file hashes a chunk belongs to from the `chunk_files:{chunk_hash}` index.
+
+    Parameters:
+    - chunk_hash (str): The hash of the chunk.
+    - database (aioredis.Redis): The Redis database client.
+
+    Returns:
+    - List[str]: The full hashes of the files containing this chunk.
+    """
+    return [
+        h.decode("utf-8") for h in await database.smembers(f"chunk_files:{chunk_hash}")
+    ]
+
+
+async def index_challenge_hashes(
+    ss58_address: str, hashes: List[str], database: aioredis.Redis
+):
+    """
+    Adds challenge hashes to the per-hotkey challenge index.
+
+    Parameters:
+    - ss58_address (str): The hotkey the challenge data was stored on.
+    - hashes (List[str]): The challenge hashes.
+    - database (aioredis.Redis): The Redis database client.
+    """
+    if len(hashes) == 0:
+        return
+    async with database.pipeline(transaction=False) as pipe:
+        pipe.sadd(f"challenges:{ss58_address}", *hashes)
+        pipe.sadd("challenge_hotkeys", ss58_address)
+        await pipe.execute()
 
 
 async def get_all_hashes_in_database(database: aioredis.Redis) -> List[str]:
@@ -961,23 +1290,23 @@ async def get_all_challenge_hashes(database: aioredis.Redis) -> List[str]:
     Returns:
         A list of challenge hashes.
     """
-    all_hashes = await get_all_hashes_in_database(database)
-
-    challenge_hashes = []
-    for h in all_hashes:
-        if await check_hash_type(h, database) == "challenge":
-            challenge_hashes.append(h)
+    hotkeys = await database.smembers("challenge_hotkeys")
+    if len(hotkeys) == 0:
+        return []
 
-    return challenge_hashes
+    challenge_hashes = await database.sunion(
+        [f"challenges:{hotkey.decode('utf-8')}" for hotkey in hotkeys]
+    )
+    return [h.decode("utf-8") for h in challenge_hashes]
 
 
 async def get_challenges_for_hotkey(ss58_address: str, database: aioredis.Redis):
     """
     Retrieves a list of challenge hashes associated with a specific hotkey.
 
-    This function scans through all the hashes related to a given hotkey and filters out
-    those which are identified as challenge data. It's useful for identifying which
-    challenges a particular miner (identified by hotkey) is involved with.
+    This function reads the `challenges:{ss58_address}` index set, which is maintained
+    when challenge data is stored, so no per-hash type lookups are required. It's useful
+    for identifying which challenges a particular miner (identified by hotkey) is involved with.
 
     Parameters:
     - ss58_address (str): The hotkey (miner identifier) whose challenge hashes are to be retrieved.
@@ -987,13 +1316,8 @@ async def get_challenges_for_hotkey(ss58_address: str, database: aioredis.Redis)
     - List[str]: A list of challenge hashes associated with the given hotkey.
       Returns an empty list if no challenge data is associated with the hotkey.
     """
-    hashes = list(await database.hgetall(f"hotkey:{ss58_address}"))
-    challenges = []
-    for j, h in enumerate(hashes):
-        if await check_hash_type(h, database) == "challenge":
-            challenges.append(h)
-
-    return challenges
+    challenges = await database.smembers(f"challenges:{ss58_address}")
+    return [h.decode("utf-8") for h in challenges]
 
 
 async def purge_challenges_for_hotkey(ss58_address: str, database: aioredis.Redis):
@@ -1010,8 +1334,15 @@ async def purge_challenges_for_hotkey(ss58_address: str, database: aioredis.Redi
     """
     challenge_hashes = await get_challenges_for_hotkey(ss58_address, database)
     bt.logging.trace(f"purging challenges for {ss58_address}...")
-    for ch in challenge_hashes:
-        await database.hdel(f"hotkey:{ss58_address}", ch)
+    remove_metadata = database.register_script(_REMOVE_HOTKEY_METADATA_LUA)
+    async with database.pipeline(transaction=False) as pipe:
+        if len(challenge_hashes):
+            await _queue_remove_metadata(
+                pipe, remove_metadata, ss58_address, challenge_hashes
+            )
+        pipe.delete(f"challenges:{ss58_address}")
+        pipe.srem("challenge_hotkeys", ss58_address)
+        await pipe.execute()
 
 
 async def purge_challenges_for_all_hotkeys(database: aioredis.Redis):
@@ -1019,7 +1350,7 @@ async def purge_challenges_for_all_hotkeys(database: aioredis.Redis):
     Purges (deletes) all challenge hashes for every hotkey in the database.
 
     This function performs a comprehensive cleanup of the database by removing all
-    challenge-related data. It iterates over each hotkey in the database and
+    challenge-related data. It iterates over each hotkey in the challenge index and
     individually purges the challenge hashes associated with them. This is particularly
     useful for global maintenance tasks where outdated or irrelevant challenge data
     needs to be cleared from the entire database. For example, when a UID is replaced.
@@ -1028,9 +1359,61 @@ async def purge_challenges_for_all_hotkeys(database: aioredis.Redis):
     - database (aioredis.Redis): An instance of the Redis database used for data storage.
     """
     bt.logging.debug("purging challenges for ALL hotkeys...")
-    async for hotkey in database.scan_iter(match="hotkey:*"):
-        hotkey = hotkey.decode().split(":")[1]
-        await purge_challenges_for_hotkey(hotkey, database)
+    for hotkey in await database.smembers("challenge_hotkeys"):
+        await purge_challenges_for_hotkey(hotkey.decode("utf-8"), database)
+
+
+async def rebuild_hash_indexes(database: aioredis.Redis, force: bool = False):
+    """
+    Builds the chunk -> file and per-hotkey challenge indexes from existing data.
+
+    The indexes are maintained on write by `store_chunk_metadata` and `add_metadata_to_hotkey`.
+    This one-time backfill covers data written before the indexes existed. It is a no-op once
+    the `index:hash_types` marker is set, unless `force` is True.
+
+    Parameters:
+    - database (aioredis.Redis): An instance of the Redis database used for data storage.
+    - force (bool): Rebuild even if the indexes were already built.
+    """
+    if not force and await database.exists("index:hash_types"):
+        return
+
+    bt.logging.info("Building chunk and challenge hash indexes...")
+    async for file_key in database.scan_iter("file:*"):
+        full_hash = file_key.decode("utf-8").split(":")[1]
+        chunk_hashes = await database.zrange(file_key, 0, -1)
+        if len(chunk_hashes) == 0:
+            continue
+        async with database.pipeline(transaction=False) as pipe:
+            for chunk_hash in chunk_hashes:
+                pipe.sadd(f"chunk_files:{chunk_hash.decode('utf-8')}", full_hash)
+            await pipe.execute()
+
+    async for hotkey_key in database.scan_iter("hotkey:*"):
+        ss58_address = hotkey_key.decode("utf-8").split(":")[1]
+        data_hashes = [
+            h.decode("utf-8")
+            for h in await database.hkeys(hotkey_key)
+            if not h.startswith(b"ttl:")
+        ]
+        if len(data_hashes) == 0:
+            continue
+        async with database.pipeline(transaction=False) as pipe:
+            for data_hash in data_hashes:
+                pipe.exists(f"file:{data_hash}")
+                pipe.exists(f"chunk_files:{data_hash}", f"chunk:{data_hash}")
+            results = await pipe.execute()
+        challenges = [
+            data_hash
+            for data_hash, is_full_file, is_chunk in zip(
+                data_hashes, results[0::2], results[1::2]
+            )
+            if _hash_type_from_exists(is_full_file, is_chunk) == "challenge"
+        ]
+        await index_challenge_hashes(ss58_address, challenges, database)
+
+    await database.set("index:hash_types", int(time.time()))
+    bt.logging.info("Chunk and challenge hash indexes built.")
 
 
 async def delete_file_from_database(file_hash: str, database: aioredis.Redis):
@@ -1047,16 +1430,21 @@ async def delete_file_from_database(file_hash: str, database: aioredis.Redis):
     """
     bt.logging.debug(f"deleting file {file_hash} from database...")
 
-    chunk_data = await get_all_chunks_for_file(file_hash, database)
-    if chunk_data is None:
+    found = False
+    # Delete all chunk hashes, one pipeline per page of chunks
+    async for page in iter_chunks_for_file(file_hash, database):
+        found = True
+        async with database.pipeline(transaction=False) as pipe:
+            for chunk_dict in page.values():
+                chunk_hash = chunk_dict["chunk_hash"]
+                pipe.delete(f"chunk:{chunk_hash}", chunk_hotkeys_key(chunk_hash))
+                pipe.srem(f"chunk_files:{chunk_hash}", file_hash)
+            await pipe.execute()
+
+    if not found:
         bt.logging.debug(f"file {file_hash} not found in database.")
         return
 
-    # Delete all chunk hashes
-    for idx, chunk_dict in chunk_data.items():
-        chunk_hash = chunk_dict["chunk_hash"]
-        await database.delete(f"chunk:{chunk_hash}")
-
     # Test getting the chunk hash back
     chunk_data = await get_all_chunks_for_file(file_hash, database)
     if chunk_data == {}:
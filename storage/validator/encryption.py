@@ -18,7 +18,11 @@
 
 import os
 import json
+import ctypes
+import ctypes.util
 import typing
+import hashlib
+import threading
 
 import bittensor as bt
 from Crypto.Cipher import AES
@@ -28,6 +32,152 @@ from nacl.utils import EncryptedMessage
 
 NACL_SALT = b"\x13q\x83\xdf\xf1Z\t\xbc\x9c\x90\xb5Q\x879\xe9\xb1"
 
+# Argon2i derived SecretBox keys, keyed by (sha3_256(password), salt).
+# Each value is a bytearray that we try to mlock so it is never swapped to disk.
+_DERIVED_KEY_CACHE: typing.Dict[typing.Tuple[str, bytes], bytearray] = {}
+_DERIVED_KEY_CACHE_LOCK = threading.Lock()
+
+
+def _get_libc():
+    try:
+        return ctypes.CDLL(ctypes.util.find_library("c"), use_errno=True)
+    except Exception:
+        return None
+
+
+_LIBC = _get_libc()
+
+
+def _mlock(buffer: bytearray) -> bool:
+    """
+    Best-effort lock of a buffer into RAM so the derived key cannot be paged out.
+    Returns True if the pages were locked, False if unsupported or denied (e.g. RLIMIT_MEMLOCK).
+    """
+    if _LIBC is None or len(buffer) == 0:
+        return False
+    try:
+        address = ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+        return _LIBC.mlock(ctypes.c_void_p(address), ctypes.c_size_t(len(buffer))) == 0
+    except Exception:
+        return False
+
+
+def _wipe_and_munlock(buffer: bytearray):
+    """
+    Zero out a cached key buffer and release its memory lock.
+    """
+    for i in range(len(buffer)):
+        buffer[i] = 0
+    if _LIBC is None or len(buffer) == 0:
+        return
+    try:
+        address = ctypes.addressof((ctypes.c_char * len(buffer)).from_buffer(buffer))
+        _LIBC.munlock(ctypes.c_void_p(address), ctypes.c_size_t(len(buffer)))
+    except Exception:
+        pass
+
+
+def _password_from_wallet(wallet) -> bytes:
+    return bytes(wallet.coldkey.private_key.hex(), "utf-8")
+
+
+def _password_digest(password_bytes: bytes) -> str:
+    return hashlib.sha3_256(password_bytes).hexdigest()
+
+
+def derive_secret_key(
+    password: typing.Union[str, bytes], salt: bytes = NACL_SALT, use_cache: bool = True
+) -> bytes:
+    """
+    Derives the SecretBox key for a password (coldkey private key hex) with Argon2i.
+
+    Args:
+        password (Union[str, bytes]): The coldkey private key (hex) used as the KDF password.
+        salt (bytes): The KDF salt. Defaults to NACL_SALT.
+        use_cache (bool): If True, reuse a previously derived key for the same password and salt.
+
+    Returns:
+        bytes: The symmetric key of size SecretBox.KEY_SIZE.
+
+    Argon2i is run with OPSLIMIT_SENSITIVE/MEMLIMIT_SENSITIVE, which costs seconds of CPU and ~1 GB of
+    memory. With `use_cache` the cost is paid once per process per (coldkey, salt). Cached keys are held
+    in mlock'ed memory where the OS permits and can be dropped with `invalidate_derived_key_cache`.
+    """
+    password_bytes = bytes(password, "utf-8") if isinstance(password, str) else password
+    cache_key = (_password_digest(password_bytes), salt)
+
+    if use_cache:
+        with _DERIVED_KEY_CACHE_LOCK:
+            cached = _DERIVED_KEY_CACHE.get(cache_key)
+            if cached is not None:
+                return bytes(cached)
+
+    key = pwhash.argon2i.kdf(
+        secret.SecretBox.KEY_SIZE,
+        password_bytes,
+        salt,
+        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
+        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
+    )
+
+    if use_cache:
+        buffer = bytearray(key)
+        if not _mlock(buffer):
+            bt.logging.trace("Could not mlock derived key buffer, caching unlocked.")
+        with _DERIVED_KEY_CACHE_LOCK:
+            _DERIVED_KEY_CACHE.setdefault(cache_key, buffer)
+
+    return key
+
+
+def invalidate_derived_key_cache(
+    wallet=None,
+    private_key: typing.Optional[typing.Union[str, bytes]] = None,
+    salt: typing.Optional[bytes] = None,
+):
+    """
+    Drops cached derived keys, wiping their memory.
+
+    Args:
+        wallet (bt.wallet, optional): Only drop keys derived from this wallet's coldkey.
+        private_key (Union[str, bytes], optional): Only drop keys derived from this coldkey private key (hex).
+        salt (bytes, optional): Only drop keys derived with this salt.
+
+    If neither `wallet` nor `private_key` is given, every cached key (matching `salt`, if set) is dropped.
+    """
+    password_hash = None
+    if wallet is not None:
+        password_hash = _password_digest(_password_from_wallet(wallet))
+    elif private_key is not None:
+        password_bytes = (
+            bytes(private_key, "utf-8") if isinstance(private_key, str) else private_key
+        )
+        password_hash = _password_digest(password_bytes)
+
+    with _DERIVED_KEY_CACHE_LOCK:
+        for cache_key in list(_DERIVED_KEY_CACHE):
+            if password_hash is not None and cache_key[0] != password_hash:
+                continue
+            if salt is not None and cache_key[1] != salt:
+                continue
+            _wipe_and_munlock(_DERIVED_KEY_CACHE.pop(cache_key))
+
+
+def precompute_wallet_envelope(wallet, salt: bytes = NACL_SALT) -> secret.SecretBox:
+    """
+    Derives (and caches) the envelope key for a wallet ahead of time.
+
+    Args:
+        wallet (bt.wallet): Bittensor wallet object containing the coldkey.
+        salt (bytes): The KDF salt. Defaults to NACL_SALT.
+
+    Returns:
+        nacl.secret.SecretBox: The box used to seal and open AES envelopes for this wallet.
+
+    Call this once at start-up so the first `encrypt_data` in the forward loop does not pay for Argon2i.
+    """
+    return secret.SecretBox(derive_secret_key(_password_from_wallet(wallet), salt))
+
 
 def encrypt_aes(filename: typing.Union[bytes, str], key: bytes) -> bytes:
     """
@@ -101,17 +251,8 @@ def encrypt_data_with_wallet(data: bytes, wallet) -> bytes:
     The generated key is used to encrypt the data using the NaCl secret box (XSalsa20-Poly1305).
     The function is intended for encrypting arbitrary data securely using wallet-based keys.
     """
-    # Derive symmetric key from wallet's coldkey
-    password = wallet.coldkey.private_key.hex()
-    password_bytes = bytes(password, "utf-8")
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    # Derive symmetric key from wallet's coldkey (cached after the first call)
+    key = derive_secret_key(_password_from_wallet(wallet))
 
     # Encrypt the data
     box = secret.SecretBox(key)
@@ -136,18 +277,7 @@ def decrypt_data_with_coldkey_private_key(
     It then uses this key to decrypt the given encrypted data. The function is primarily used for decrypting data
     that was previously encrypted by the `encrypt_data_with_wallet` function.
     """
-    password_bytes = (
-        bytes(private_key, "utf-8") if isinstance(private_key, str) else private_key
-    )
-
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    key = derive_secret_key(private_key)
 
     box = secret.SecretBox(key)
     decrypted = box.decrypt(encrypted_data)
@@ -169,17 +299,8 @@ def decrypt_data_with_wallet(encrypted_data: bytes, wallet) -> bytes:
     It then uses this key to decrypt the given encrypted data. The function is primarily used for decrypting data
     that was previously encrypted by the `encrypt_data_with_wallet` function.
     """
-    # Derive symmetric key from wallet's coldkey
-    password = wallet.coldkey.private_key.hex()
-    password_bytes = bytes(password, "utf-8")
-    kdf = pwhash.argon2i.kdf
-    key = kdf(
-        secret.SecretBox.KEY_SIZE,
-        password_bytes,
-        NACL_SALT,
-        opslimit=pwhash.argon2i.OPSLIMIT_SENSITIVE,
-        memlimit=pwhash.argon2i.MEMLIMIT_SENSITIVE,
-    )
+    # Derive symmetric key from wallet's coldkey (cached after the first call)
+    key = derive_secret_key(_password_from_wallet(wallet))
 
     # Decrypt the data
     box = secret.SecretBox(key)
@@ -33,6 +33,7 @@ from storage.validator.database import (
     purge_challenges_for_all_hotkeys,
 )
 from storage.validator.state import save_state
+from storage.validator.autopipeline import AutoPipelineRedis
 from storage.validator.utils import get_current_epoch
 
 from .challenge import challenge_data
@@ -87,6 +88,13 @@ async def forward(self):
             hotkey_replaced=False,  # Don't delete challenge data (only in subscription handler)
         )
 
+    # Write the miner statistics aggregated during this step
+    if self.statistics_buffer is not None:
+        bt.logging.debug(
+            f"flushing statistics for {len(self.statistics_buffer)} miners"
+        )
+        await self.statistics_buffer.flush(self.database)
+
     # Purge all challenge data to start fresh and avoid requerying hotkeys with stale challenge data
     current_epoch = get_current_epoch(self.subtensor)
     bt.logging.info(
@@ -99,10 +107,16 @@ async def forward(self):
             self.last_purged_epoch = current_epoch
             save_state(self)
 
-    # Purge expired TTL keys
-    if self.step % 60 == 0:
-        bt.logging.info("initiating TTL purge for expired keys")
-        await purge_expired_ttl_keys(self.database)
+    # Purge a bounded batch of expired TTL keys
+    purged = await purge_expired_ttl_keys(
+        self.database, self.config.neuron.ttl_purge_batch_size
+    )
+    if purged:
+        bt.logging.info(f"purged {purged} expired TTL keys")
+
+    if self.step % 60 == 0 and isinstance(self.database, AutoPipelineRedis):
+        bt.logging.debug(f"database pipeline metrics: {self.database.metrics()}")
+        self.database.reset_metrics()
 
     if self.step % 720 == 0 and self.step > 0:
         bt.logging.info("initiating compute stats")
@@ -212,6 +212,7 @@ async def monitor(self):
                 success=False,
                 task_type="monitor",
                 database=self.database,
+                buffer=self.statistics_buffer,
             )
             rewards[i] = MONITOR_FAILURE_REWARD
 
@@ -85,7 +85,7 @@ async def rebalance_data_for_hotkey(
             for chunk_metadata in ordered_metadata:
                 # Remove the dropped miner from the chunk metadata
                 await remove_hotkey_from_chunk(
-                    chunk_metadata, source_hotkey, self.database
+                    chunk_metadata["chunk_hash"], source_hotkey, self.database
                 )
         # Purge challenge hashes so new miner doesn't get hosed
         bt.logging.debug(f"Purging all challenge hashes for hotkey {source_hotkey}")
@@ -192,6 +192,7 @@ async def retrieve_data(
                 success=False,
                 task_type="retrieve",
                 database=self.database,
+                buffer=self.statistics_buffer,
             )
             continue
 
@@ -207,6 +208,7 @@ async def retrieve_data(
                 success=False,
                 task_type="retrieve",
                 database=self.database,
+                buffer=self.statistics_buffer,
             )
             continue
 
@@ -231,6 +233,7 @@ async def retrieve_data(
             success=success,
             task_type="retrieve",
             database=self.database,
+            buffer=self.statistics_buffer,
         )
 
         event.uids.append(uid)
@@ -22,11 +22,10 @@ import numpy as np
 import bittensor as bt
 from bittensor import Synapse
 from typing import Union, List
-from functools import partial
 
 from storage.validator.verify import (
-    verify_store_with_seed,
-    verify_challenge_with_seed,
+    verify_store_responses,
+    verify_challenge_responses,
     verify_retrieve_with_seed,
 )
 from storage.validator.bonding import update_statistics, get_tier_factor
@@ -256,33 +255,33 @@ async def create_reward_vector(
     callback: callable,
     fail_callback: callable,
 ):
-    # Determine if the commitment is valid
-    success = False
+    # Determine which commitments are valid, opening them all in one batch
     if isinstance(synapse, Store):
-        verify_fn = partial(
-            verify_store_with_seed,
-            b64_encrypted_data=synapse.encrypted_data,
-            seed=synapse.seed,
+        verified = verify_store_responses(
+            responses, b64_encrypted_data=synapse.encrypted_data, seed=synapse.seed
         )
         task_type = "store"
         failure_reward = STORE_FAILURE_REWARD
     elif isinstance(synapse, Retrieve):
-        verify_fn = partial(verify_retrieve_with_seed, seed=synapse.seed)
+        verified = [
+            verify_retrieve_with_seed(synapse=response, seed=synapse.seed)
+            for response in responses
+        ]
         task_type = "retrieve"
         failure_reward = RETRIEVAL_FAILURE_REWARD
     elif isinstance(synapse, Challenge):
-        verify_fn = partial(verify_challenge_with_seed, seed=synapse.seed)
+        verified = verify_challenge_responses(
+            [{"synapse": response, "seed": synapse.seed} for response in responses]
+        )
         task_type = "challenge"
         failure_reward = CHALLENGE_FAILURE_REWARD
     else:
         raise ValueError(f"Invalid synapse type: {type(synapse)}")
 
-    for idx, (uid, response) in enumerate(zip(uids, responses)):
+    for idx, (uid, response, success) in enumerate(zip(uids, responses, verified)):
         # Verify the commitment
         hotkey = self.metagraph.hotkeys[uid]
 
-        # Determine if the commitment is valid
-        success = verify_fn(synapse=response)
         if success:
             bt.logging.debug(
                 f"Successfully verified {synapse.__class__} commitment from UID: {uid} | hotkey: {hotkey}"
@@ -300,6 +299,7 @@ async def create_reward_vector(
             success=success,
             task_type=task_type,
             database=self.database,
+            buffer=self.statistics_buffer,
         )
 
         # Apply reward for this task
@@ -34,22 +34,23 @@ from storage.validator.event import EventSchema
 from storage import protocol
 from storage.shared.ecc import (
     hash_data,
-    setup_CRS,
-    ecc_point_to_hex,
 )
+from storage.shared.merkle import build_chunk_merkle_tree
 from storage.validator.utils import (
+    encode_crs,
+    record_point_encodings,
     make_random_file,
     compute_chunk_distribution_mut_exclusive_numpy_reuse_uids,
 )
 from storage.validator.encryption import encrypt_data
-from storage.validator.verify import verify_store_with_seed
 from storage.validator.reward import apply_reward_scores
 from storage.validator.database import (
     add_metadata_to_hotkey,
     store_chunk_metadata,
     store_file_chunk_mapping_ordered,
     get_ordered_metadata,
-    hotkey_at_capacity,
+    cache_hotkeys_capacity,
+    check_hotkeys_capacity,
 )
 from storage.validator.cid import generate_cid_string
 from storage.validator.bonding import update_statistics
@@ -58,6 +59,24 @@ from .reward import create_reward_vector
 from .network import ping_and_retry_uids, compute_and_ping_chunks, reroll_distribution
 
 
+def get_merkle_chunk_size(self, data: bytes) -> typing.Optional[int]:
+    """
+    Picks the leaf chunk size of the store-time hash tree for precomputed challenges.
+
+    Parameters:
+    - data (bytes): The data being stored.
+
+    Returns:
+    - int | None: The chunk size, or None if precomputed challenges are disabled.
+    """
+    if not self.config.neuron.precomputed_challenges:
+        return None
+    return max(
+        self.config.neuron.min_chunk_size,
+        -(-len(data) // self.config.neuron.merkle_chunk_count),
+    )
+
+
 async def store_encrypted_data(
     self,
     encrypted_data: typing.Union[bytes, str],
@@ -90,8 +109,8 @@ async def store_encrypted_data(
         else encrypted_data
     )
 
-    # Setup CRS for this round of validation
-    g, h = setup_CRS(curve=self.config.neuron.curve)
+    # Take a pre-generated CRS for this round of validation
+    crs = self.crs_pool.get()
 
     # Hash the data
     data_hash = hash_data(encrypted_data)
@@ -105,13 +124,26 @@ async def store_encrypted_data(
         bt.logging.debug(f"storing user hash: {data_hash}")
         bt.logging.debug(f"b64 encrypted data: {b64_encrypted_data[:12]}...")
 
+    # Compute the store-time hash tree ourselves, so precomputed challenges are checked
+    # against a root the miner cannot choose
+    merkle_chunk_size = get_merkle_chunk_size(self, encrypted_data)
+    merkle_metadata = {}
+    if merkle_chunk_size is not None:
+        merkle_tree = build_chunk_merkle_tree(encrypted_data, merkle_chunk_size)
+        merkle_metadata = {
+            "merkle_root": merkle_tree.get_merkle_root(),
+            "merkle_chunk_size": merkle_chunk_size,
+            "merkle_leaf_count": merkle_tree.get_leaf_count(),
+        }
+
     synapse = protocol.Store(
         encrypted_data=b64_encrypted_data,
-        curve=self.config.neuron.curve,
-        g=ecc_point_to_hex(g),
-        h=ecc_point_to_hex(h),
+        curve=crs.curve,
+        g=crs.hex()[0],
+        h=crs.hex()[1],
         seed=get_random_bytes(32).hex(),  # 256-bit seed
         ttl=ttl or self.config.neuron.data_ttl,
+        merkle_chunk_size=merkle_chunk_size,
     )
 
     # Select subset of miners to query (e.g. redunancy factor of N)
@@ -133,12 +165,14 @@ async def store_encrypted_data(
             failed_uids = []
 
         # Broadcast the query to selected miners on the network.
+        encode_crs(self, synapse, crs, uids)
         responses = await self.dendrite(
             axons,
             synapse,
             deserialize=False,
             timeout=60,
         )
+        record_point_encodings(self, uids, responses)
 
         # Compute the rewards for the responses given proc time.
         rewards: torch.FloatTensor = torch.zeros(
@@ -151,6 +185,7 @@ async def store_encrypted_data(
                 "prev_seed": synapse.seed,
                 "size": sys.getsizeof(encrypted_data),  # in bytes, not len(data)
                 "encryption_payload": encryption_payload,
+                **merkle_metadata,
             }
             bt.logging.trace(f"Storing UID {uid} data {pformat(response_storage)}")
 
@@ -231,9 +266,6 @@ async def store_random_data(self):
     - The status of the data storage operation.
     """
 
-    # Setup CRS for this round of validation
-    g, h = setup_CRS(curve=self.config.neuron.curve)
-
     # Make a random bytes file to test the miner if none provided
     data = make_random_file(maxsize=self.config.neuron.maxsize)
     bt.logging.debug(f"Random store data size: {sys.getsizeof(data)}")
@@ -311,7 +343,7 @@ async def store_broadband(
             moving_averaged_scores=[],
         )
 
-        g, h = setup_CRS(curve=self.config.neuron.curve)
+        crs = self.crs_pool.get()
 
         bt.logging.debug(f"type(chunk): {type(chunk)}")
         bt.logging.debug(f"chunk: {chunk[:100]}")
@@ -323,33 +355,44 @@ async def store_broadband(
 
         synapse = protocol.Store(
             encrypted_data=b64_encoded_chunk,
-            curve=self.config.neuron.curve,
-            g=ecc_point_to_hex(g),
-            h=ecc_point_to_hex(h),
+            curve=crs.curve,
+            g=crs.hex()[0],
+            h=crs.hex()[1],
             seed=random_seed,
             ttl=ttl or self.config.neuron.data_ttl,
         )
 
+        hotkeys_capacity = await cache_hotkeys_capacity(
+            [self.metagraph.hotkeys[uid] for uid in uids], self.database
+        )
         uids = [
             uid
             for uid in uids
-            if not await hotkey_at_capacity(self.metagraph.hotkeys[uid], self.database)
+            if not await check_hotkeys_capacity(
+                hotkeys_capacity, self.metagraph.hotkeys[uid]
+            )
         ]
 
         axons = [self.metagraph.axons[uid] for uid in uids]
+        encode_crs(self, synapse, crs, uids)
         responses = await self.dendrite(
             axons,
             synapse,
             deserialize=False,
             timeout=60,
         )
+        record_point_encodings(self, uids, responses)
 
         # Compute the rewards for the responses given proc time.
         rewards: torch.FloatTensor = torch.zeros(
             len(responses), dtype=torch.float32
         ).to(self.device)
 
+        # The commitments are verified once, in create_reward_vector
+        verified_uids = set()
+
         async def success(hotkey, idx, uid, response):
+            verified_uids.add(uid)
             bt.logging.debug(f"Stored data in database with key: {hotkey}")
 
         failed_uids = []
@@ -391,21 +434,10 @@ async def store_broadband(
             self.database,
         )
 
-        return responses, b64_encoded_chunk, random_seed
+        return responses, verified_uids
 
-    async def handle_uid_operations(
-        uid, response, b64_encoded_chunk, random_seed, chunk_hash, chunk_size
-    ):
+    async def handle_uid_operations(uid, response, verified, chunk_hash, chunk_size):
         ss = time.time()
-        start = time.time()
-
-        # Offload the CPU-intensive verification to a separate thread
-        verified = await asyncio.to_thread(
-            verify_store_with_seed, response, b64_encoded_chunk, random_seed
-        )
-
-        end = time.time()
-        bt.logging.debug(f"verify_store_with_seed time for uid {uid} : {end-start}")
         if verified:
             # Prepare storage for the data for particular miner
             response_storage = {
@@ -421,6 +453,7 @@ async def store_broadband(
                 response_storage,  # seed + size + encryption keys
                 self.database,
                 ttl=ttl or self.config.neuron.data_ttl,
+                hash_type="chunk",
             )
             end = time.time()
             bt.logging.debug(
@@ -435,6 +468,7 @@ async def store_broadband(
             success=verified,
             task_type="store",
             database=self.database,
+            buffer=self.statistics_buffer,
         )
         bt.logging.debug(f"handle_uid_operations time for uid {uid} : {time.time()-ss}")
 
@@ -464,15 +498,13 @@ async def store_broadband(
         results = await asyncio.gather(*tasks)
         # Grab the responses and relevant data necessary for verify from the results
         for i, result_group in enumerate(results):
-            responses, b64_encoded_chunk, random_seed = result_group
+            responses, verified_uids = result_group
             bt.logging.debug(f"-- responses_nested: {pformat(responses)}")
-            bt.logging.debug(f"-- b64_encoded_chunk: {b64_encoded_chunk[:100]}")
-            bt.logging.debug(f"-- random_seed: {random_seed}")
+            bt.logging.debug(f"-- verified_uids: {verified_uids}")
 
             # Update the distributions with responses
             distributions[i]["responses"] = responses
-            distributions[i]["b64_encoded_chunk"] = b64_encoded_chunk
-            distributions[i]["random_seed"] = random_seed
+            distributions[i]["verified_uids"] = verified_uids
 
         return distributions
 
@@ -481,15 +513,13 @@ async def store_broadband(
         for dist in distributions:
             chunk_hash = dist["chunk_hash"]
             chunk_size = dist["chunk_size"]
-            random_seed = dist["random_seed"]
-            b64_encoded_chunk = dist["b64_encoded_chunk"]
+            verified_uids = dist["verified_uids"]
             for uid, response in zip(dist["uids"], dist["responses"]):
                 task = asyncio.create_task(
                     handle_uid_operations(
                         uid,
                         response,
-                        b64_encoded_chunk,
-                        random_seed,
+                        uid in verified_uids,
                         chunk_hash,
                         chunk_size,
                     )
@@ -28,8 +28,12 @@ from Crypto.Random import random
 from itertools import combinations, cycle
 from typing import List, Union
 
-from storage.shared.ecc import hash_data
-from storage.validator.database import hotkey_at_capacity
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    hash_data,
+    negotiate_point_encoding,
+)
+from storage.validator.database import cache_hotkeys_capacity, check_hotkeys_capacity
 
 import bittensor as bt
 
@@ -143,6 +147,61 @@ def check_uid_availability(
     return True
 
 
+def get_point_encoding(self, uids):
+    """
+    Picks the encoding to send curve points (g and h) in to the given miners: the highest version
+    all of them have answered with before, capped by `--neuron.point_encoding`. Miners not heard
+    from yet get the legacy encoding, which every miner can decode.
+
+    Args:
+        uids (list): The uids of the miners the points are sent to.
+
+    Returns:
+        int: The `POINT_ENCODING_*` version.
+    """
+    return min(
+        [
+            self.point_encodings.get(self.metagraph.hotkeys[uid], POINT_ENCODING_LEGACY)
+            for uid in uids
+        ]
+        + [self.config.neuron.point_encoding]
+    )
+
+
+def encode_crs(self, synapse, crs, uids):
+    """
+    Sets the CRS points of a `Store` or `Challenge` synapse for the given miners, and advertises
+    the highest point encoding this validator accepts in their answers.
+
+    Args:
+        synapse (Store | Challenge): The synapse to send.
+        crs (CRS): The CRS to send, see `storage.validator.crs`.
+        uids (list): The uids of the miners the synapse is sent to.
+    """
+    synapse.g, synapse.h = crs.hex(get_point_encoding(self, uids))
+    synapse.point_encoding = self.config.neuron.point_encoding
+
+
+def record_point_encodings(self, uids, responses):
+    """
+    Remembers the point encoding each miner answered with, see `get_point_encoding`. Miners that
+    predate the field answer with the legacy encoding. A failed request forgets the miner's
+    encoding, so a miner that can no longer decode it is sent legacy points again.
+
+    Args:
+        uids (list): The uids of the queried miners.
+        responses (list): Their responses, in the same order.
+    """
+    for uid, response in zip(uids, responses):
+        hotkey = self.metagraph.hotkeys[uid]
+        if response.dendrite.status_code == 200:
+            self.point_encodings[hotkey] = negotiate_point_encoding(
+                response.point_encoding
+            )
+        else:
+            self.point_encodings.pop(hotkey, None)
+
+
 def ttl_cache(maxsize=128, ttl=10):
     """A simple TTL cache decorator for functions with a single argument."""
 
@@ -397,10 +456,15 @@ async def get_available_query_miners(
     muids = get_available_uids(self, exclude=exclude)
     bt.logging.debug(f"get_available_query_miners() available uids: {muids}")
     if exclude_full:
+        hotkeys_capacity = await cache_hotkeys_capacity(
+            [self.metagraph.hotkeys[uid] for uid in muids], self.database
+        )
         muids_nonfull = [
             uid
             for uid in muids
-            if not await hotkey_at_capacity(self.metagraph.hotkeys[uid], self.database)
+            if not await check_hotkeys_capacity(
+                hotkeys_capacity, self.metagraph.hotkeys[uid]
+            )
         ]
         bt.logging.debug(f"available uids nonfull: {muids_nonfull}")
     return get_pseudorandom_uids(self, muids, k=k)
@@ -20,13 +20,18 @@ import base64
 from pprint import pformat
 
 from ..shared.ecc import (
+    POINT_ENCODING_SEC1,
     hash_data,
     hex_to_ecc_point,
     ecc_point_to_hex,
+    is_sec1_compressed,
+    negotiate_point_encoding,
     ECCommitment,
 )
 from ..shared.merkle import (
+    hash_chunk,
     validate_merkle_proof,
+    validate_merkle_proof_at_index,
 )
 
 from ..shared.utils import (
@@ -63,53 +68,161 @@ def verify_chained_commitment(proof, seed, commitment, verbose=True):
     return expected_commitment == commitment
 
 
-def verify_challenge_with_seed(synapse, seed, verbose=False):
+def is_precomputed_response(synapse, merkle_root=None):
     """
-    Verifies a challenge in a decentralized network using a seed and the details contained in a synapse.
-    The function validates the initial commitment hash against the expected result, checks the integrity of the commitment,
-    and verifies the merkle proof.
+    Determines whether a challenge response was answered from the miner's store-time hash tree.
+    Only then does it carry the root the validator computed when storing the data.
+    Args:
+        synapse (Synapse): The challenge response.
+        merkle_root (str, optional): The store-time root held by the validator, if any.
+    Returns:
+        bool: True if the response should be verified as a precomputed challenge.
+    """
+    return merkle_root is not None and synapse.merkle_root == merkle_root
+
+
+def open_commitments(synapses, openings, verbose=False):
+    """
+    Opens the commitments of many responses at once. Responses sharing a CRS (g, h, curve), e.g.
+    every miner of a store or of a challenge round, are checked together with
+    `ECCommitment.open_batch`, so the cost grows far slower than one opening per response.
+    Args:
+        synapses (list of Synapse): The responses, carrying g, h and curve.
+        openings (list of tuple): Per response, the (commitment, hashed value, randomness) to open,
+            or None for a response that already failed its other checks.
+        verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+    Returns:
+        list of bool: Per response, True if its commitment opens.
+    """
+    groups = {}
+    for i, (synapse, opening) in enumerate(zip(synapses, openings)):
+        if opening is not None:
+            groups.setdefault((synapse.g, synapse.h, synapse.curve), []).append(i)
+
+    results = [False] * len(synapses)
+    for (g, h, curve), indices in groups.items():
+        try:
+            committer = ECCommitment(
+                hex_to_ecc_point(g, curve), hex_to_ecc_point(h, curve)
+            )
+        except ValueError as e:
+            bt.logging.error(f"Could not decode CRS with error: {e}")
+            continue
+        opened = committer.open_batch([openings[i] for i in indices], curve)
+        for i, ok in zip(indices, opened):
+            results[i] = ok
+            if not ok:
+                bt.logging.error("Opening commitment failed")
+                if verbose:
+                    bt.logging.error(f"commitment: {synapses[i].commitment[:100]}")
+                    bt.logging.error(f"synapse   : {pformat(synapses[i].axon.dict())}")
+    return results
+
+
+def _precomputed_opening(
+    synapse, seed, merkle_root, leaf_count, challenge_index, verbose=False
+):
+    # Every check of `verify_precomputed_challenge` but the opening, which is returned
+    if synapse.data_chunk is None or synapse.merkle_proof is None:
+        bt.logging.error(
+            f"Missing data chunk or merkle proof for synapse: {pformat(synapse.axon.dict())}."
+        )
+        return None
+
+    data_chunk = base64.b64decode(synapse.data_chunk)
+    if not validate_merkle_proof_at_index(
+        b64_decode(synapse.merkle_proof),
+        hash_chunk(data_chunk),
+        merkle_root,
+        challenge_index,
+        leaf_count,
+    ):
+        if verbose:
+            bt.logging.error("Store-time merkle proof validation failed!")
+            bt.logging.error(f"merkle root : {merkle_root}")
+            bt.logging.error(f"synapse     : {pformat(synapse.axon.dict())}")
+        return None
+
+    return (
+        synapse.commitment,
+        hash_data(data_chunk + str(seed).encode()),
+        synapse.randomness,
+    )
+
+
+def verify_precomputed_challenge(
+    synapse, seed, merkle_root, leaf_count, challenge_index, verbose=False
+):
+    """
+    Verifies a challenge answered in precomputed mode. The commitment to the challenged chunk must open
+    with the fresh seed, and the chunk must sit at the challenged index of the tree whose root the
+    validator computed at store time. No chained commitment is involved in this mode.
     Args:
         synapse (Synapse): The synapse object containing challenge details.
+        seed (str): The seed sent with the challenge.
+        merkle_root (str): The store-time root held by the validator.
+        leaf_count (int): Number of leaves in the store-time tree.
+        challenge_index (int): The chunk index that was challenged.
         verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
     Returns:
         bool: True if the challenge is verified successfully, False otherwise.
     """
+    opening = _precomputed_opening(
+        synapse, seed, merkle_root, leaf_count, challenge_index, verbose=verbose
+    )
+    return opening is not None and open_commitments([synapse], [opening], verbose)[0]
+
+
+def _challenge_opening(
+    synapse,
+    seed,
+    verbose=False,
+    merkle_root=None,
+    leaf_count=None,
+    challenge_index=None,
+):
+    # Every check of `verify_challenge_with_seed` but the opening, which is returned
+    if is_precomputed_response(synapse, merkle_root):
+        return _precomputed_opening(
+            synapse, seed, merkle_root, leaf_count, challenge_index, verbose=verbose
+        )
+
     if synapse.commitment_hash is None or synapse.commitment_proof is None:
         bt.logging.error(
             f"Missing commitment hash or proof for synapse: {pformat(synapse.axon.dict())}."
         )
-        return False
+        return None
 
     if not verify_chained_commitment(
         synapse.commitment_proof, seed, synapse.commitment_hash, verbose=verbose
     ):
         bt.logging.error(f"Initial commitment hash does not match expected result.")
         bt.logging.error(f"synapse {pformat(synapse.axon.dict())}")
-        return False
+        return None
 
-    # TODO: Add checks and defensive programming here to handle all types
-    # (bytes, str, hex, ecc point, etc)
-    committer = ECCommitment(
-        hex_to_ecc_point(synapse.g, synapse.curve),
-        hex_to_ecc_point(synapse.h, synapse.curve),
-    )
-    commitment = hex_to_ecc_point(synapse.commitment, synapse.curve)
+    if negotiate_point_encoding(synapse.point_encoding) != synapse.point_encoding:
+        bt.logging.error(f"Unsupported point encoding {synapse.point_encoding}.")
+        return None
 
-    if not committer.open(
-        commitment,
-        hash_data(base64.b64decode(synapse.data_chunk) + str(seed).encode()),
-        synapse.randomness,
-    ):
-        if verbose:
-            bt.logging.error("Opening commitment failed!")
-            bt.logging.error(f"commitment: {synapse.commitment[:100]}")
-            bt.logging.error(f"seed      : {seed}")
-            bt.logging.error(f"synapse   : {pformat(synapse.axon.dict())}")
-        return False
+    # The miner's tree has the commitment points as leaves, in the encoding it answered with.
+    # A compressed SEC1 string names a single point, so once it opens it is exactly that encoding.
+    try:
+        if synapse.point_encoding == POINT_ENCODING_SEC1 and is_sec1_compressed(
+            synapse.commitment
+        ):
+            leaf = synapse.commitment.lower()
+        else:
+            leaf = ecc_point_to_hex(
+                hex_to_ecc_point(synapse.commitment, synapse.curve),
+                synapse.point_encoding,
+            )
+    except ValueError as e:
+        bt.logging.error(f"Could not decode commitment with error: {e}")
+        return None
 
     if not validate_merkle_proof(
         b64_decode(synapse.merkle_proof),
-        ecc_point_to_hex(commitment),
+        leaf,
         synapse.merkle_root,
     ):
         if verbose:
@@ -118,30 +231,79 @@ def verify_challenge_with_seed(synapse, seed, verbose=False):
             bt.logging.error(f"merkle root : {synapse.merkle_root}")
             bt.logging.error(f"merkle proof: {pformat(synapse.merkle_proof)[-1]}")
             bt.logging.error(f"synapse     : {pformat(synapse.axon.dict())}")
-        return False
+        return None
 
-    return True
+    return (
+        synapse.commitment,
+        hash_data(base64.b64decode(synapse.data_chunk) + str(seed).encode()),
+        synapse.randomness,
+    )
 
 
-def verify_store_with_seed(synapse, b64_encrypted_data, seed, verbose=False):
+def verify_challenge_with_seed(
+    synapse,
+    seed,
+    verbose=False,
+    merkle_root=None,
+    leaf_count=None,
+    challenge_index=None,
+):
     """
-    Verifies the storing process in a decentralized network using the provided synapse and seed.
-    This function decodes the data, reconstructs the hash using the seed, and verifies it against the commitment hash.
-    It also opens the commitment to validate the process.
+    Verifies a challenge in a decentralized network using a seed and the details contained in a synapse.
+    The function validates the initial commitment hash against the expected result, checks the integrity of the commitment,
+    and verifies the merkle proof.
+    If the validator holds a store-time root for the data and the miner answered from its store-time tree,
+    the response is verified with `verify_precomputed_challenge` instead.
     Args:
-        synapse (Synapse): The synapse object containing store process details.
+        synapse (Synapse): The synapse object containing challenge details.
         verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+        merkle_root (str, optional): The store-time root, when the challenge was sent in precomputed mode.
+        leaf_count (int, optional): Number of leaves in the store-time tree.
+        challenge_index (int, optional): The chunk index that was challenged.
     Returns:
-        bool: True if the storing process is verified successfully, False otherwise.
+        bool: True if the challenge is verified successfully, False otherwise.
+    """
+    opening = _challenge_opening(
+        synapse, seed, verbose, merkle_root, leaf_count, challenge_index
+    )
+    return opening is not None and open_commitments([synapse], [opening], verbose)[0]
+
+
+def verify_challenge_responses(challenges, verbose=False):
+    """
+    Verifies many challenge responses like `verify_challenge_with_seed`, opening all commitments
+    with `open_commitments` once every other check has run.
+    Args:
+        challenges (list of dict): Per response, the keyword arguments of `verify_challenge_with_seed`:
+            synapse and seed, plus merkle_root, leaf_count and challenge_index in precomputed mode.
+        verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+    Returns:
+        list of bool: Per response, True if the challenge is verified successfully.
     """
+    openings = [
+        _challenge_opening(verbose=verbose, **challenge) for challenge in challenges
+    ]
+    return open_commitments(
+        [challenge["synapse"] for challenge in challenges], openings, verbose
+    )
+
+
+def _store_hash(b64_encrypted_data, seed):
+    # hash(data + seed) that every store response must commit to, None if the data does not decode
     try:
         encrypted_data = base64.b64decode(b64_encrypted_data)
     except Exception as e:
         bt.logging.error(f"Could not decode store data with error: {e}")
-        return False
+        return None
 
     seed_value = str(seed).encode()
-    reconstructed_hash = hash_data(encrypted_data + seed_value)
+    return hash_data(encrypted_data + seed_value)
+
+
+def _store_opening(synapse, reconstructed_hash, verbose=False):
+    # Every check of `verify_store_with_seed` but the opening, which is returned
+    if reconstructed_hash is None:
+        return None
 
     # e.g. send synapse.commitment_hash as an int for consistency
     if synapse.commitment_hash != str(reconstructed_hash):
@@ -150,24 +312,43 @@ def verify_store_with_seed(synapse, b64_encrypted_data, seed, verbose=False):
             bt.logging.error(f"commitment hash   : {synapse.commitment_hash}")
             bt.logging.error(f"reconstructed hash: {reconstructed_hash}")
             bt.logging.error(f"synapse           : {synapse.axon.dict()}")
-        return False
+        return None
 
-    committer = ECCommitment(
-        hex_to_ecc_point(synapse.g, synapse.curve),
-        hex_to_ecc_point(synapse.h, synapse.curve),
-    )
-    commitment = hex_to_ecc_point(synapse.commitment, synapse.curve)
+    return synapse.commitment, reconstructed_hash, synapse.randomness
 
-    if not committer.open(
-        commitment,
-        hash_data(encrypted_data + str(seed).encode()),
-        synapse.randomness,
-    ):
-        bt.logging.error(f"Opening commitment failed")
-        bt.logging.error(f"synapse: {synapse.axon.dict()}")
-        return False
 
-    return True
+def verify_store_with_seed(synapse, b64_encrypted_data, seed, verbose=False):
+    """
+    Verifies the storing process in a decentralized network using the provided synapse and seed.
+    This function decodes the data, reconstructs the hash using the seed, and verifies it against the commitment hash.
+    It also opens the commitment to validate the process.
+    Args:
+        synapse (Synapse): The synapse object containing store process details.
+        verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+    Returns:
+        bool: True if the storing process is verified successfully, False otherwise.
+    """
+    opening = _store_opening(synapse, _store_hash(b64_encrypted_data, seed), verbose)
+    return opening is not None and open_commitments([synapse], [opening], verbose)[0]
+
+
+def verify_store_responses(synapses, b64_encrypted_data, seed, verbose=False):
+    """
+    Verifies the responses of every miner asked to store the same data, like `verify_store_with_seed`,
+    hashing the data once and opening all commitments with `open_commitments` at once.
+    Args:
+        synapses (list of Synapse): The store responses.
+        b64_encrypted_data (str): The stored data, base64 encoded.
+        seed (str): The seed sent with the data.
+        verbose (bool, optional): Enables verbose logging for debugging. Defaults to False.
+    Returns:
+        list of bool: Per response, True if the storing process is verified successfully.
+    """
+    reconstructed_hash = _store_hash(b64_encrypted_data, seed)
+    openings = [
+        _store_opening(synapse, reconstructed_hash, verbose) for synapse in synapses
+    ]
+    return open_commitments(synapses, openings, verbose)
 
 
 def verify_retrieve_with_seed(synapse, seed, verbose=False):
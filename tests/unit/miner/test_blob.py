@@ -0,0 +1,50 @@
+import os
+import tempfile
+from unittest import TestCase
+
+from storage.miner.blob import open_blob, padded_chunk_count
+from storage.miner.utils import compute_subsequent_commitment
+from storage.shared.ecc import hash_data, hash_data_parts
+from storage.shared.utils import chunk_data
+
+
+class TestOpenBlob(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, data):
+        path = os.path.join(self.directory.name, "blob")
+        with open(path, "wb") as file:
+            file.write(data)
+        return path
+
+    def test_views_match_file_contents(self):
+        data = os.urandom(10000)
+        with open_blob(self.write(data)) as blob:
+            self.assertEqual(data, blob)
+            self.assertEqual(
+                list(chunk_data(data, 999)),
+                [bytes(chunk) for chunk in chunk_data(blob, 999)],
+            )
+
+    def test_empty_file(self):
+        with open_blob(self.write(b"")) as blob:
+            self.assertEqual(0, len(blob))
+
+    def test_seeded_hash_matches_concatenation(self):
+        data = os.urandom(4096)
+        self.assertEqual(hash_data(data + b"seed"), hash_data_parts(data, b"seed"))
+        with open_blob(self.write(data)) as blob:
+            self.assertEqual(
+                compute_subsequent_commitment(data, b"prev", b"new"),
+                compute_subsequent_commitment(blob, b"prev", b"new"),
+            )
+
+    def test_padded_chunk_count_matches_getsizeof(self):
+        import sys
+
+        for size in [0, 1, 255, 256, 1000, 4096]:
+            self.assertEqual(
+                sys.getsizeof(b"x" * size) // 256 + 1, padded_chunk_count(size, 256)
+            )
@@ -0,0 +1,97 @@
+import os
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from parameterized import parameterized
+
+from storage.miner.blob import open_blob
+from storage.miner.commitment import CommitmentEngine, MIN_CHUNKS_PER_SHARD
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    ECCommitment,
+    ecc_point_to_hex,
+    hash_data,
+    hex_to_ecc_point,
+    setup_CRS,
+)
+from storage.shared.merkle import validate_merkle_proof
+
+
+class TestCommitmentEngine(IsolatedAsyncioTestCase):
+    @classmethod
+    def setUpClass(cls):
+        # Share the worker processes between tests, spawning them is slow
+        cls.engines = {0: CommitmentEngine(0), 2: CommitmentEngine(2)}
+
+    @classmethod
+    def tearDownClass(cls):
+        for engine in cls.engines.values():
+            engine.shutdown()
+
+    def setUp(self):
+        g, h = setup_CRS()
+        self.committer = ECCommitment(g, h)
+        self.g_hex, self.h_hex = ecc_point_to_hex(g), ecc_point_to_hex(h)
+
+    @parameterized.expand(
+        [
+            [0, 5, POINT_ENCODING_LEGACY],
+            [2, 5, POINT_ENCODING_LEGACY],
+            [2, 3 * MIN_CHUNKS_PER_SHARD + 1, POINT_ENCODING_LEGACY],
+            [0, 5, POINT_ENCODING_SEC1],
+            [2, 5, POINT_ENCODING_SEC1],
+        ]
+    )
+    async def test_commitments_open_and_prove(
+        self, max_workers, n_data_chunks, point_encoding
+    ):
+        data_chunks = [bytes([i]) * 64 for i in range(n_data_chunks)]
+        randomness, chunks, points, merkle_tree = await self.engines[
+            max_workers
+        ].commit(
+            self.g_hex,
+            self.h_hex,
+            "P-256",
+            iter(data_chunks),
+            n_chunks=n_data_chunks + 1,
+            seed="seed",
+            point_encoding=point_encoding,
+        )
+
+        self.assertEqual(data_chunks + [None], chunks)
+        self.assertIsNone(points[-1])
+        for index, chunk in enumerate(data_chunks):
+            self.assertEqual(
+                points[index],
+                ecc_point_to_hex(
+                    hex_to_ecc_point(points[index], "P-256"), point_encoding
+                ),
+            )
+            self.assertTrue(
+                self.committer.open(
+                    hex_to_ecc_point(points[index], "P-256"),
+                    hash_data(chunk + b"seed"),
+                    randomness[index],
+                )
+            )
+            self.assertTrue(
+                validate_merkle_proof(
+                    merkle_tree.get_proof(index),
+                    points[index],
+                    merkle_tree.get_merkle_root(),
+                )
+            )
+
+    @parameterized.expand(
+        [
+            [1, 100, [100]],
+            [4, 8, [8]],
+            [4, 40, [20, 20]],
+            [3, 100, [34, 34, 32]],
+            [4, 0, []],
+        ]
+    )
+    def test_shard(self, max_workers, n_chunks, expected):
+        shards = CommitmentEngine(max_workers).shard(list(range(n_chunks)))
+        self.assertEqual(expected, [len(shard) for shard in shards])
+        self.assertEqual(list(range(n_chunks)), [i for shard in shards for i in shard])
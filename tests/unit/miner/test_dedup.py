@@ -0,0 +1,117 @@
+import os
+import json
+import tempfile
+import fakeredis
+from unittest import IsolatedAsyncioTestCase
+
+from storage.miner.database import (
+    get_blob_refcount,
+    get_chunk_metadata,
+    get_packed_copy,
+    purge_expired_chunks,
+    release_chunk,
+    store_or_update_chunk_metadata,
+)
+from storage.miner.pack import PackStore
+from storage.miner.utils import SHARED_BLOB_DIRECTORY, save_data_to_filesystem
+
+HOTKEYS = [
+    "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty",
+    "5FLSigC9HGRKVhB9FiEo4Y3koPsNmBmLJbpXg2mp1hXcS59Y",
+]
+
+
+class TestSharedBlobs(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.database = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+    async def store(self, hotkey, seed, filepath=None, ttl=None):
+        if filepath is None:
+            filepath = save_data_to_filesystem(
+                b"data", self.directory.name, SHARED_BLOB_DIRECTORY, "123", fanout=2
+            )
+        await store_or_update_chunk_metadata(
+            self.database, "123", filepath, hotkey, 4, seed, ttl
+        )
+        return filepath
+
+    async def test_hotkeys_share_one_copy_with_their_own_seeds(self):
+        filepaths = [
+            await self.store(hotkey, f"seed{i}") for i, hotkey in enumerate(HOTKEYS)
+        ]
+        await self.store(HOTKEYS[0], "reseeded")
+
+        self.assertEqual(filepaths[0], filepaths[1])
+        self.assertEqual(2, await get_blob_refcount(self.database, "123", filepaths[0]))
+        seeds = [
+            (await get_chunk_metadata(self.database, "123", hotkey))["seed"]
+            for hotkey in HOTKEYS
+        ]
+        self.assertEqual(["reseeded", "seed1"], seeds)
+
+    async def test_blob_is_deleted_with_its_last_reference(self):
+        filepath = await self.store(HOTKEYS[0], "seed0")
+        await self.store(HOTKEYS[1], "seed1")
+
+        self.assertTrue(await release_chunk(self.database, "123", HOTKEYS[0]))
+        self.assertTrue(os.path.isfile(filepath))
+        self.assertEqual(1, await get_blob_refcount(self.database, "123", filepath))
+
+        self.assertTrue(await release_chunk(self.database, "123", HOTKEYS[1]))
+        self.assertFalse(os.path.exists(filepath))
+        self.assertEqual([], os.listdir(os.path.dirname(filepath)))
+        self.assertFalse(await release_chunk(self.database, "123", HOTKEYS[1]))
+
+    async def test_release_respects_filepath_guard(self):
+        filepath = await self.store(HOTKEYS[0], "seed0")
+
+        self.assertFalse(
+            await release_chunk(self.database, "123", HOTKEYS[0], filepath + "x")
+        )
+        self.assertTrue(os.path.isfile(filepath))
+
+    async def test_purge_releases_only_expired_references(self):
+        filepath = await self.store(HOTKEYS[0], "seed0", ttl=3600)
+        await self.store(HOTKEYS[1], "seed1", ttl=3600)
+        metadata = json.loads(await self.database.hget("123", HOTKEYS[1]))
+        metadata["generated"] -= 7200
+        await self.database.hset("123", HOTKEYS[1], json.dumps(metadata))
+
+        self.assertEqual(1, await purge_expired_chunks(self.database))
+        self.assertEqual([HOTKEYS[0].encode()], await self.database.hkeys("123"))
+        self.assertTrue(os.path.isfile(filepath))
+
+    async def test_restore_refreshes_expiry(self):
+        filepath = await self.store(HOTKEYS[0], "seed0", ttl=3600)
+        metadata = json.loads(await self.database.hget("123", HOTKEYS[0]))
+        metadata["generated"] -= 7200
+        await self.database.hset("123", HOTKEYS[0], json.dumps(metadata))
+
+        await self.store(HOTKEYS[0], "seed1", filepath=filepath, ttl=3600)
+
+        self.assertEqual(0, await purge_expired_chunks(self.database))
+        self.assertTrue(os.path.isfile(filepath))
+        metadata = await get_chunk_metadata(self.database, "123", HOTKEYS[0])
+        self.assertEqual("seed1", metadata["seed"])
+
+    async def test_packed_copies_are_shared_and_kept(self):
+        pack_store = PackStore(self.directory.name)
+        self.addCleanup(pack_store.close)
+        self.assertIsNone(await get_packed_copy(self.database, "123"))
+
+        ref = await self.store(HOTKEYS[0], "seed0", filepath=pack_store.append(b"data"))
+
+        self.assertEqual(ref, await get_packed_copy(self.database, "123"))
+        await release_chunk(self.database, "123", HOTKEYS[0])
+        self.assertTrue(os.path.isfile(pack_store.active_segment))
+
+    async def test_retired_packed_copies_are_not_shared(self):
+        pack_store = PackStore(self.directory.name)
+        self.addCleanup(pack_store.close)
+        ref = await self.store(HOTKEYS[0], "seed0", filepath=pack_store.append(b"data"))
+        pack_store.retire(pack_store.active_segment)
+
+        self.assertEqual(ref, await get_packed_copy(self.database, "123"))
+        self.assertIsNone(await get_packed_copy(self.database, "123", pack_store))
@@ -0,0 +1,50 @@
+import os
+import asyncio
+import tempfile
+from unittest import IsolatedAsyncioTestCase
+from parameterized import parameterized
+
+from storage.miner.executor import IOExecutor
+from storage.shared.ecc import hash_data
+
+
+class TestIOExecutor(IsolatedAsyncioTestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    @parameterized.expand([["none"], ["batch"], ["always"]])
+    async def test_save_writes_complete_file(self, fsync):
+        io_executor = IOExecutor(max_workers=2, fsync=fsync, fsync_interval=0.01)
+        self.addCleanup(io_executor.shutdown)
+
+        filepath = await io_executor.save(b"data", self.directory.name, "hotkey", "123")
+
+        self.assertEqual(os.path.join(self.directory.name, "hotkey", "123"), filepath)
+        with open(filepath, "rb") as file:
+            self.assertEqual(b"data", file.read())
+        # No temporary files are left behind
+        self.assertEqual(["123"], os.listdir(os.path.dirname(filepath)))
+
+    async def test_batched_fsync_drains_pending_files(self):
+        io_executor = IOExecutor(max_workers=2, fsync="batch", fsync_interval=0.2)
+        self.addCleanup(io_executor.shutdown)
+
+        await asyncio.gather(
+            *[
+                io_executor.save(b"x", self.directory.name, "hotkey", str(i))
+                for i in range(10)
+            ]
+        )
+        self.assertEqual(10, len(io_executor._dirty))
+        await asyncio.sleep(0.5)
+        self.assertEqual(0, len(io_executor._dirty))
+
+    async def test_run_returns_result(self):
+        io_executor = IOExecutor(max_workers=1)
+        self.addCleanup(io_executor.shutdown)
+        self.assertEqual(hash_data(b"abc"), await io_executor.run(hash_data, b"abc"))
+
+    def test_rejects_unknown_fsync_mode(self):
+        with self.assertRaises(ValueError):
+            IOExecutor(fsync="sometimes")
@@ -0,0 +1,133 @@
+import os
+import json
+import tempfile
+import fakeredis
+from unittest import IsolatedAsyncioTestCase, TestCase
+from parameterized import parameterized
+
+from storage.miner.database import get_filepath, migrate_to_fanout_layout
+from storage.miner.utils import (
+    find_blob_path,
+    get_blob_path,
+    save_data_to_filesystem,
+)
+
+
+# Not "hotkey", which is the metadata field name of the legacy format
+HOTKEY = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"
+
+
+class TestBlobLayout(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    @parameterized.expand([[0], [1], [2], [3]])
+    def test_fanout_levels(self, fanout):
+        filepath = get_blob_path(self.directory.name, "hotkey", "123", fanout)
+
+        relative = os.path.relpath(filepath, self.directory.name).split(os.sep)
+        self.assertEqual("hotkey", relative[0])
+        self.assertEqual("123", relative[-1])
+        self.assertEqual(fanout, len(relative) - 2)
+        self.assertTrue(all(len(level) == 2 for level in relative[1:-1]))
+
+    def test_save_uses_fanout_layout(self):
+        filepath = save_data_to_filesystem(
+            b"data", self.directory.name, "hotkey", "123", fanout=2
+        )
+
+        self.assertEqual(
+            get_blob_path(self.directory.name, "hotkey", "123", 2), filepath
+        )
+        with open(filepath, "rb") as file:
+            self.assertEqual(b"data", file.read())
+
+    @parameterized.expand([[0], [2]])
+    def test_find_falls_back_to_older_layouts(self, saved_fanout):
+        filepath = save_data_to_filesystem(
+            b"data", self.directory.name, "hotkey", "123", fanout=saved_fanout
+        )
+
+        self.assertEqual(
+            filepath, find_blob_path(self.directory.name, "hotkey", "123", 2)
+        )
+        self.assertIsNone(find_blob_path(self.directory.name, "hotkey", "456", 2))
+
+
+class TestFanoutMigration(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.progress_path = os.path.join(self.directory.name, "progress.json")
+        self.database = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+
+    async def store_flat(self, data_hash, hotkey=HOTKEY):
+        filepath = save_data_to_filesystem(
+            b"data", self.directory.name, hotkey, data_hash
+        )
+        await self.database.hset(
+            data_hash, hotkey, json.dumps({"filepath": filepath, "size": 4})
+        )
+        return filepath
+
+    async def migrate(self, **kwargs):
+        return await migrate_to_fanout_layout(
+            self.database,
+            self.directory.name,
+            2,
+            batch_size=2,
+            progress_path=self.progress_path,
+            **kwargs,
+        )
+
+    async def test_moves_blobs_and_updates_filepaths(self):
+        old_filepaths = [await self.store_flat(str(i)) for i in range(5)]
+
+        stats = await self.migrate()
+
+        self.assertEqual(5, stats["moved"])
+        self.assertFalse(os.path.exists(self.progress_path))
+        for i, old_filepath in enumerate(old_filepaths):
+            new_filepath = await get_filepath(self.database, str(i), HOTKEY)
+            self.assertEqual(
+                get_blob_path(self.directory.name, HOTKEY, str(i), 2), new_filepath
+            )
+            self.assertTrue(os.path.isfile(new_filepath))
+            self.assertFalse(os.path.exists(old_filepath))
+
+    async def test_rerun_is_idempotent(self):
+        await self.store_flat("1")
+        await self.migrate()
+
+        stats = await self.migrate()
+
+        self.assertEqual(0, stats["moved"])
+        self.assertEqual(1, stats["skipped"])
+
+    async def test_resumes_after_interrupted_move(self):
+        old_filepath = await self.store_flat("1")
+        # Blob moved by a previous run that stopped before updating the index
+        new_filepath = get_blob_path(self.directory.name, HOTKEY, "1", 2)
+        os.makedirs(os.path.dirname(new_filepath))
+        os.replace(old_filepath, new_filepath)
+
+        stats = await self.migrate()
+
+        self.assertEqual(1, stats["moved"])
+        self.assertEqual(new_filepath, await get_filepath(self.database, "1", HOTKEY))
+
+    async def test_missing_and_foreign_paths_are_left_alone(self):
+        old_filepath = await self.store_flat("1")
+        os.remove(old_filepath)
+        await self.database.hset(
+            "2", HOTKEY, json.dumps({"filepath": "/elsewhere/2", "size": 4})
+        )
+        await self.database.set("not-a-hash", "value")
+
+        stats = await self.migrate()
+
+        self.assertEqual(1, stats["missing"])
+        self.assertEqual(1, stats["skipped"])
+        self.assertEqual(old_filepath, await get_filepath(self.database, "1", HOTKEY))
+        self.assertEqual("/elsewhere/2", await get_filepath(self.database, "2", HOTKEY))
@@ -0,0 +1,127 @@
+import os
+import json
+import time
+import tempfile
+import fakeredis
+from unittest import IsolatedAsyncioTestCase, TestCase
+from parameterized import parameterized
+
+from storage.miner.blob import open_blob
+from storage.miner.database import compact_pack_segments, get_filepath
+from storage.miner.executor import IOExecutor
+from storage.miner.pack import PackStore, format_pack_ref, parse_pack_ref
+from storage.miner.utils import load_chunk_from_filesystem, load_from_filesystem
+
+HOTKEY = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"
+
+
+class TestPackStore(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def store(self, segment_size=1 << 20):
+        pack_store = PackStore(self.directory.name, segment_size)
+        self.addCleanup(pack_store.close)
+        return pack_store
+
+    def test_pack_refs_round_trip(self):
+        ref = format_pack_ref("/data/packs/00000001.pack", 4096, 10)
+        self.assertEqual(("/data/packs/00000001.pack", 4096, 10), parse_pack_ref(ref))
+        self.assertIsNone(parse_pack_ref("/data/hotkey/3f/a2/123"))
+
+    @parameterized.expand([[0], [1], [5000], [70000]])
+    def test_reads_packed_blobs(self, size):
+        pack_store = self.store()
+        # Unaligned offsets for the blob under test
+        pack_store.append(os.urandom(4099))
+        data = os.urandom(size)
+        ref = pack_store.append(data)
+        pack_store.append(os.urandom(100))
+
+        with open_blob(ref) as blob:
+            self.assertEqual(data, blob)
+        self.assertEqual(data, load_from_filesystem(ref))
+        chunks = [
+            load_chunk_from_filesystem(ref, i, 999) for i in range(-(-size // 999) + 1)
+        ]
+        self.assertEqual(data, b"".join(chunks))
+        self.assertEqual(b"", chunks[-1])
+
+    def test_rolls_over_segments_and_resumes(self):
+        pack_store = self.store(segment_size=100)
+        refs = [pack_store.append(bytes([i]) * 60) for i in range(3)]
+
+        self.assertEqual(3, len({parse_pack_ref(ref)[0] for ref in refs}))
+        self.assertEqual(2, len(pack_store.sealed_segments()))
+        pack_store.close()
+
+        reopened = self.store(segment_size=100)
+        ref = reopened.append(b"x")
+        self.assertEqual(parse_pack_ref(refs[-1])[0], parse_pack_ref(ref)[0])
+        self.assertEqual(60, parse_pack_ref(ref)[1])
+
+
+class TestPackCompaction(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.database = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+        self.pack_store = PackStore(self.directory.name, segment_size=1000)
+        self.addCleanup(self.pack_store.close)
+
+    async def store(self, data_hash, data, ttl=3600):
+        ref = self.pack_store.append(data)
+        metadata = {
+            "filepath": ref,
+            "size": len(data),
+            "ttl": ttl,
+            "generated": time.time(),
+        }
+        await self.database.hset(data_hash, HOTKEY, json.dumps(metadata))
+        return ref
+
+    async def test_expired_blobs_are_reclaimed(self):
+        live = {str(i): os.urandom(300) for i in range(2)}
+        for data_hash, data in live.items():
+            await self.store(data_hash, data)
+        await self.store("expired", os.urandom(300), ttl=-1)
+        # Seal the first segment
+        await self.store("active", os.urandom(900))
+        segment = self.pack_store.sealed_segments()[0]
+
+        stats = await compact_pack_segments(self.database, self.pack_store, 0.2)
+
+        self.assertEqual(1, stats["expired"])
+        self.assertEqual(2, stats["moved"])
+        self.assertEqual(1, stats["segments"])
+        self.assertFalse(await self.database.hexists("expired", HOTKEY))
+        for data_hash, data in live.items():
+            ref = await get_filepath(self.database, data_hash, HOTKEY)
+            self.assertNotEqual(segment, parse_pack_ref(ref)[0])
+            self.assertEqual(data, load_from_filesystem(ref))
+
+        # Retired segments stay readable until the next pass
+        self.assertTrue(os.path.exists(segment))
+        stats = await compact_pack_segments(self.database, self.pack_store, 0.2)
+        self.assertFalse(os.path.exists(segment))
+        self.assertEqual(900, stats["freed"])
+
+    async def test_mostly_live_segments_are_kept(self):
+        for i in range(3):
+            await self.store(str(i), os.urandom(300))
+        await self.store("active", os.urandom(900))
+
+        stats = await compact_pack_segments(self.database, self.pack_store, 0.5)
+
+        self.assertEqual(0, stats["segments"])
+        self.assertEqual(1, len(self.pack_store.sealed_segments()))
+
+    async def test_io_executor_appends(self):
+        io_executor = IOExecutor(max_workers=1, fsync="batch", fsync_interval=60)
+        self.addCleanup(io_executor.shutdown)
+
+        ref = await io_executor.append(self.pack_store, b"data")
+
+        self.assertEqual(b"data", load_from_filesystem(ref))
+        self.assertEqual({parse_pack_ref(ref)[0]}, io_executor._dirty)
@@ -0,0 +1,92 @@
+import os
+import json
+import time
+import tempfile
+from unittest import TestCase
+
+from storage.miner.request_log import RequestLog
+from storage.miner.utils import is_rate_limited
+
+
+class TestRequestLog(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.path = os.path.join(self.directory.name, "requests_log.json")
+
+    def line_count(self):
+        with open(self.path) as f:
+            return sum(1 for _ in f)
+
+    def test_buffers_are_bounded(self):
+        request_log = RequestLog(self.path, max_entries=3, max_callers=2)
+        for i in range(10):
+            request_log.log("a", "Store", i)
+        request_log.log("b", "Challenge", 10)
+        request_log.log("c", "Retrieve", 11)
+
+        self.assertEqual(["b", "c"], request_log.callers())
+        request_log.log("b", "Store", 12)
+        request_log.log("d", "Store", 13)
+        self.assertEqual(["b", "d"], request_log.callers())
+        self.assertEqual(2, request_log.count("b"))
+
+    def test_count(self):
+        request_log = RequestLog(self.path)
+        now = time.time()
+        request_log.log("a", "Store", now - 7200)
+        request_log.log("a", "Store", now - 10)
+        request_log.log("a", "Challenge", now - 5)
+
+        self.assertEqual(3, request_log.count("a"))
+        self.assertEqual(2, request_log.count("a", window=3600))
+        self.assertEqual(1, request_log.count("a", "Store", window=3600))
+        self.assertEqual(0, request_log.count("b"))
+
+    def test_rate_limit(self):
+        request_log = RequestLog(self.path)
+        now = time.time()
+        request_log.log("a", "Store", now - 7200)
+        for i in range(3):
+            request_log.log("a", "Challenge", now - i)
+
+        self.assertFalse(is_rate_limited(request_log, "a", 3, 3600))
+        request_log.log("a", "Retrieve", now)
+        self.assertTrue(is_rate_limited(request_log, "a", 3, 3600))
+        self.assertFalse(is_rate_limited(request_log, "b", 3, 3600))
+
+    def test_persists_and_compacts(self):
+        request_log = RequestLog(self.path, max_entries=2, compact_factor=2)
+        for i in range(4):
+            request_log.log("a", "Store", i)
+        request_log.flush()
+        self.assertEqual(4, self.line_count())
+
+        for i in range(4, 8):
+            request_log.log("a", "Store", i)
+        request_log.flush()
+        # 8 lines for 2 kept entries triggers a compaction
+        self.assertEqual(2, self.line_count())
+
+        reloaded = RequestLog(self.path, max_entries=2)
+        self.assertEqual(2, reloaded.count("a", "Store"))
+        self.assertEqual(0, reloaded.count("a", "Challenge"))
+
+    def test_ignores_torn_tail(self):
+        request_log = RequestLog(self.path)
+        request_log.log("a", "Store", 1)
+        request_log.flush()
+        with open(self.path, "a") as f:
+            f.write('["a", "Sto')
+
+        self.assertEqual(1, RequestLog(self.path).count("a"))
+
+    def test_converts_previous_format(self):
+        with open(self.path, "w") as f:
+            json.dump({"a": [["Store", i] for i in range(5)]}, f)
+
+        request_log = RequestLog(self.path, max_entries=3)
+
+        self.assertEqual(3, request_log.count("a"))
+        self.assertEqual(3, self.line_count())
+        self.assertEqual(3, RequestLog(self.path).count("a"))
@@ -0,0 +1,87 @@
+import os
+import json
+import tempfile
+import fakeredis
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+
+from storage.miner.database import release_chunk
+from storage.miner.executor import IOExecutor
+from storage.miner.pack import PackStore
+from storage.miner.usage import StorageUsage, walk_directory_size
+from storage.miner.utils import get_directory_size
+
+HOTKEY = "5FHneW46xGXgs5mUiveU4sbTyGBzmstUspZC92UhjJM694ty"
+
+
+class TestStorageUsage(TestCase):
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+
+    def write(self, relative, size):
+        path = os.path.join(self.directory.name, relative)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "wb") as file:
+            file.write(os.urandom(size))
+
+    def test_walk_matches_directory_size(self):
+        for i in range(30):
+            self.write(os.path.join(str(i % 3), str(i % 5), str(i)), i * 10)
+
+        self.assertEqual(
+            get_directory_size(self.directory.name),
+            walk_directory_size(self.directory.name, pause_every=7),
+        )
+
+    def test_reconcile_corrects_drift(self):
+        usage = StorageUsage(self.directory.name)
+        self.write("a", 100)
+        usage.add(40)
+
+        self.assertEqual(60, usage.reconcile(pause=0))
+        self.assertEqual(100, usage.bytes)
+        self.assertIsNotNone(usage.last_reconciled)
+
+    def test_failed_reconcile_keeps_tracking(self):
+        usage = StorageUsage(self.directory.name)
+        usage.add(40)
+
+        with patch(
+            "storage.miner.usage.walk_directory_size", side_effect=PermissionError
+        ):
+            with self.assertRaises(PermissionError):
+                usage.reconcile(pause=0)
+
+        usage.add(10)
+        self.assertEqual(50, usage.bytes)
+        self.assertIsNone(usage.last_reconciled)
+
+
+class TestStorageUsageTracking(IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.addCleanup(self.directory.cleanup)
+        self.usage = StorageUsage(self.directory.name)
+        self.io_executor = IOExecutor(max_workers=1, usage=self.usage)
+        self.addCleanup(self.io_executor.shutdown)
+
+    async def test_writes_and_releases_are_tracked(self):
+        database = fakeredis.FakeAsyncRedis(server=fakeredis.FakeServer())
+        filepath = await self.io_executor.save(
+            b"x" * 100, self.directory.name, "blobs", "1"
+        )
+        # Rewriting the same blob does not count twice
+        await self.io_executor.save(b"x" * 100, self.directory.name, "blobs", "1")
+        pack_store = PackStore(self.directory.name)
+        self.addCleanup(pack_store.close)
+        await self.io_executor.append(pack_store, b"y" * 50)
+
+        self.assertEqual(150, self.usage.bytes)
+        self.assertEqual(0, self.usage.reconcile(pause=0))
+
+        await database.hset("1", HOTKEY, json.dumps({"filepath": filepath}))
+        await release_chunk(database, "1", HOTKEY, usage=self.usage)
+
+        self.assertEqual(50, self.usage.bytes)
+        self.assertEqual(0, self.usage.reconcile(pause=0))
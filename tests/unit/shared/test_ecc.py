@@ -0,0 +1,169 @@
+from unittest import TestCase
+from parameterized import parameterized
+from Crypto.PublicKey import ECC
+
+from storage.shared.ecc import (
+    P256_N,
+    P256_P,
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    AffinePoint,
+    ECCommitment,
+    FixedBaseECCommitment,
+    ecc_point_to_hex,
+    fixed_base_window,
+    get_committer,
+    hex_to_ecc_point,
+    multi_scalar_mul,
+    negotiate_point_encoding,
+    setup_CRS,
+)
+
+
+class TestFixedBaseECCommitment(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.g, cls.h = setup_CRS()
+
+    @parameterized.expand(
+        [
+            [2, 1, 1],
+            [4, 12345, 67890],
+            [4, P256_N - 1, P256_N + 5],
+            [5, 2**256 - 1, 2**256],
+            [8, 2**255 + 7, 3],
+        ]
+    )
+    def test_matches_generic_commitment(self, window, m_val, r):
+        committer = FixedBaseECCommitment(self.g, self.h, window=window)
+        expected = self.g * m_val
+        expected += self.h * r
+
+        self.assertEqual(
+            ecc_point_to_hex(expected), ecc_point_to_hex(committer.combine(m_val, r))
+        )
+        self.assertTrue(committer.open(expected, m_val, r))
+        self.assertFalse(committer.open(expected, m_val + 1, r))
+
+    def test_commit_opens_with_generic_committer(self):
+        committer = FixedBaseECCommitment(self.g, self.h, window=4)
+        c, m_val, r = committer.commit(b"chunk" + b"seed")
+
+        point = ECC.EccPoint(c.x, c.y, curve="P-256")
+        self.assertTrue(ECCommitment(self.g, self.h).open(point, m_val, r))
+
+    def test_rejects_other_curves(self):
+        g, h = setup_CRS(curve="P-384")
+        with self.assertRaises(ValueError):
+            FixedBaseECCommitment(g, h)
+        self.assertIsInstance(get_committer(g, h, n_commits=4096), ECCommitment)
+        self.assertNotIsInstance(
+            get_committer(g, h, n_commits=4096), FixedBaseECCommitment
+        )
+
+    @parameterized.expand([[1, None], [4, None], [4096, 8]])
+    def test_fixed_base_window(self, n_commits, expected):
+        self.assertEqual(expected, fixed_base_window(n_commits))
+
+    def test_get_committer_uses_tables_for_many_commits(self):
+        self.assertIsInstance(
+            get_committer(self.g, self.h, n_commits=256), FixedBaseECCommitment
+        )
+        self.assertNotIsInstance(
+            get_committer(self.g, self.h, n_commits=1), FixedBaseECCommitment
+        )
+
+
+class TestPointEncoding(TestCase):
+    @parameterized.expand([[POINT_ENCODING_LEGACY], [POINT_ENCODING_SEC1]])
+    def test_round_trip(self, encoding):
+        for _ in range(8):  # covers both parities of y
+            point, _ = setup_CRS()
+            encoded = ecc_point_to_hex(point, encoding)
+            self.assertEqual(point, hex_to_ecc_point(encoded, "P-256"))
+            self.assertEqual(point, hex_to_ecc_point(encoded.upper(), "P-256"))
+
+    def test_sec1_is_compressed(self):
+        point, _ = setup_CRS()
+        encoded = ecc_point_to_hex(point, POINT_ENCODING_SEC1)
+        self.assertEqual(66, len(encoded))
+        key = ECC.construct(curve="P-256", point_x=point.x, point_y=point.y)
+        self.assertEqual(
+            key.public_key().export_key(format="SEC1", compress=True).hex(), encoded
+        )
+        self.assertLess(4 * len(encoded), len(ecc_point_to_hex(point)))
+
+    def test_rejects_points_off_the_curve(self):
+        with self.assertRaises(ValueError):
+            # x = p - 1 has no point on P-256
+            hex_to_ecc_point("02" + "ff" * 32, "P-256")
+        with self.assertRaises(ValueError):
+            hex_to_ecc_point("05" + "00" * 32, "P-256")
+        with self.assertRaises(ValueError):
+            ecc_point_to_hex(setup_CRS()[0], 2)
+
+    @parameterized.expand([[None, 0], [0, 0], [1, 1], [7, 1], [-1, 0]])
+    def test_negotiate(self, requested, expected):
+        self.assertEqual(expected, negotiate_point_encoding(requested))
+
+    def test_open_hex(self):
+        g, h = setup_CRS()
+        for committer in (ECCommitment(g, h), FixedBaseECCommitment(g, h)):
+            c, m_val, r = committer.commit(b"chunk")
+            for encoding in (POINT_ENCODING_LEGACY, POINT_ENCODING_SEC1):
+                c_hex = ecc_point_to_hex(c, encoding)
+                self.assertTrue(committer.open_hex(c_hex, m_val, r))
+                self.assertFalse(committer.open_hex(c_hex, m_val + 1, r))
+
+
+class TestOpenBatch(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.g, cls.h = setup_CRS()
+        committer = ECCommitment(cls.g, cls.h)
+        cls.openings = []
+        for i in range(6):
+            c, m_val, r = committer.commit(bytes([i]))
+            cls.openings.append((ecc_point_to_hex(c, i % 2), m_val, r))
+
+    def test_multi_scalar_mul(self):
+        points = [ECC.generate(curve="P-256").pointQ for _ in range(5)]
+        scalars = [0, 1, 2**128 - 1, 12345, P256_N - 1]
+        expected = points[0] * scalars[0]
+        for point, k in zip(points[1:], scalars[1:]):
+            expected += point * k
+
+        X, Y, Z = multi_scalar_mul([(int(p.x), int(p.y)) for p in points], scalars)
+        z_inv = pow(Z, -1, P256_P)
+        self.assertEqual(int(expected.x), X * z_inv**2 % P256_P)
+        self.assertEqual(int(expected.y), Y * z_inv**3 % P256_P)
+
+    @parameterized.expand([[1], [2], [6]])
+    def test_valid_openings(self, n):
+        for committer in (
+            ECCommitment(self.g, self.h),
+            FixedBaseECCommitment(self.g, self.h),
+        ):
+            self.assertEqual([True] * n, committer.open_batch(self.openings[:n]))
+
+    def test_invalid_opening_is_found(self):
+        openings = list(self.openings)
+        c_hex, m_val, r = openings[3]
+        openings[3] = (c_hex, m_val, r + 1)
+        self.assertEqual(
+            [True, True, True, False, True, True],
+            ECCommitment(self.g, self.h).open_batch(openings),
+        )
+
+    def test_malformed_commitments_do_not_open(self):
+        _, m_val, r = self.openings[0]
+        openings = list(self.openings) + [
+            ("zz", m_val, r),
+            ("00", m_val, r),
+            ("02" + "ff" * 32, m_val, r),
+            (ecc_point_to_hex(AffinePoint(1, 2)), m_val, r),
+        ]
+        self.assertEqual(
+            [True] * 6 + [False] * 4,
+            ECCommitment(self.g, self.h).open_batch(openings),
+        )
@@ -0,0 +1,242 @@
+import hashlib
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage.shared.merkle import (
+    MerkleTree,
+    build_chunk_merkle_tree,
+    get_proof_sides,
+    hash_chunk,
+    validate_merkle_multiproof,
+    validate_merkle_proof,
+    validate_merkle_proof_at_index,
+    validate_merkle_proofs,
+)
+
+
+class TestChunkMerkleTree(TestCase):
+    @parameterized.expand([[1], [2], [5], [8], [13]])
+    def test_proofs_are_bound_to_their_index(self, leaf_count):
+        data = bytes(range(256)) * leaf_count
+        tree = build_chunk_merkle_tree(data, 256)
+        root = tree.get_merkle_root()
+        self.assertEqual(leaf_count, tree.get_leaf_count())
+
+        for index in range(leaf_count):
+            proof = tree.get_proof(index)
+            leaf = hash_chunk(data[index * 256 : (index + 1) * 256])
+            self.assertEqual(
+                get_proof_sides(index, leaf_count), [next(iter(p)) for p in proof]
+            )
+            self.assertTrue(
+                validate_merkle_proof_at_index(proof, leaf, root, index, leaf_count)
+            )
+            for other in range(leaf_count):
+                if other != index:
+                    self.assertFalse(
+                        validate_merkle_proof_at_index(
+                            proof, leaf, root, other, leaf_count
+                        )
+                    )
+
+    def test_last_chunk_may_be_short(self):
+        data = b"a" * 10 + b"b" * 3
+        tree = build_chunk_merkle_tree(data, 10)
+        self.assertEqual(2, tree.get_leaf_count())
+        self.assertEqual(hash_chunk(b"b" * 3), tree.get_leaf(1))
+
+    def test_rejects_wrong_leaf_and_out_of_range_index(self):
+        data = b"x" * 40
+        tree = build_chunk_merkle_tree(data, 10)
+        root = tree.get_merkle_root()
+        proof = tree.get_proof(1)
+        self.assertFalse(
+            validate_merkle_proof_at_index(proof, hash_chunk(b"y" * 10), root, 1, 4)
+        )
+        self.assertFalse(
+            validate_merkle_proof_at_index(proof, hash_chunk(b"x" * 10), root, 4, 4)
+        )
+
+
+def hex_leaves(count):
+    return [hash_chunk(str(i).encode()) for i in range(count)]
+
+
+def variable_leaves(count):
+    # Same shape as commitment points: hex encodings that differ in width
+    return [
+        (hashlib.sha3_256(str(i).encode()).digest() * 5)[: 155 + i % 2].hex()
+        for i in range(count)
+    ]
+
+
+def reference_root(leaves):
+    # Nodes as a plain list of lists, pairs hashed and odd end nodes promoted
+    level = [bytes.fromhex(leaf) for leaf in leaves]
+    while len(level) > 1:
+        next_level = [
+            hashlib.sha3_256(level[i] + level[i + 1]).digest()
+            for i in range(0, len(level) - 1, 2)
+        ]
+        if len(level) % 2:
+            next_level.append(level[-1])
+        level = next_level
+    return level[0].hex()
+
+
+class TestMerkleTree(TestCase):
+    @parameterized.expand([[1], [2], [3], [7], [8], [33]])
+    def test_digest_leaves_match_hex_leaves(self, leaf_count):
+        leaves = hex_leaves(leaf_count)
+        from_hex = MerkleTree()
+        from_hex.add_leaf(leaves)
+        from_hex.make_tree()
+        from_digests = MerkleTree()
+        from_digests.add_leaf_digests(bytes.fromhex("".join(leaves)))
+        from_digests.make_tree()
+
+        self.assertEqual(from_hex, from_digests)
+        self.assertEqual(reference_root(leaves), from_digests.get_merkle_root())
+        self.assertEqual(leaves[-1], from_digests.get_leaf(-1))
+
+    @parameterized.expand([[1], [2], [5], [12]])
+    def test_variable_width_leaves(self, leaf_count):
+        leaves = variable_leaves(leaf_count)
+        tree = MerkleTree()
+        tree.add_leaf(leaves)
+        tree.make_tree()
+        root = tree.get_merkle_root()
+
+        self.assertEqual(reference_root(leaves), root)
+        for index, leaf in enumerate(leaves):
+            self.assertEqual(leaf, tree.get_leaf(index))
+            self.assertTrue(
+                validate_merkle_proof_at_index(
+                    tree.get_proof(index), leaf, root, index, leaf_count
+                )
+            )
+
+    @parameterized.expand([[0], [1], [6], [9]])
+    def test_serialization_round_trips(self, leaf_count):
+        for leaves in (hex_leaves(leaf_count), variable_leaves(leaf_count)):
+            tree = MerkleTree()
+            tree.add_leaf(leaves)
+            tree.make_tree()
+
+            from_json = MerkleTree.deserialize(tree.serialize())
+            from_binary = MerkleTree.deserialize_binary(tree.serialize_binary())
+            self.assertEqual(tree, from_json)
+            self.assertEqual(tree, from_binary)
+            self.assertEqual(tree.get_merkle_root(), from_binary.get_merkle_root())
+            if leaf_count:
+                self.assertEqual(
+                    tree.get_proof(leaf_count - 1),
+                    from_binary.get_proof(leaf_count - 1),
+                )
+
+    def test_binary_serialization_is_compact(self):
+        tree = build_chunk_merkle_tree(bytes(4096), 16)
+        self.assertLess(len(tree.serialize_binary()), len(tree.serialize()) / 3)
+
+    def test_deserialize_binary_rejects_bad_data(self):
+        data = build_chunk_merkle_tree(bytes(100), 10).serialize_binary()
+        with self.assertRaises(ValueError):
+            MerkleTree.deserialize_binary(data[:-1])
+        with self.assertRaises(ValueError):
+            MerkleTree.deserialize_binary(b"XXXX" + data[4:])
+        with self.assertRaises(ValueError):
+            MerkleTree.deserialize_binary(data[:3])
+
+    @parameterized.expand([[2, 0], [5, 4], [5, 2], [9, 8]])
+    def test_update_leaf_matches_rebuild(self, leaf_count, index):
+        leaves = hex_leaves(leaf_count)
+        tree = MerkleTree()
+        tree.add_leaf(leaves)
+        tree.make_tree()
+
+        for new_leaf in (hash_chunk(b"new"), variable_leaves(1)[0]):
+            tree.update_leaf(index, new_leaf)
+            leaves[index] = new_leaf
+            rebuilt = MerkleTree()
+            rebuilt.add_leaf(leaves)
+            rebuilt.make_tree()
+            self.assertEqual(rebuilt, tree)
+            self.assertEqual(reference_root(leaves), tree.get_merkle_root())
+
+
+class TestMultiproof(TestCase):
+    def setUp(self):
+        self.leaves = hex_leaves(13)
+        self.tree = MerkleTree()
+        self.tree.add_leaf(self.leaves)
+        self.tree.make_tree()
+        self.root = self.tree.get_merkle_root()
+
+    @parameterized.expand([[[0]], [[12]], [[0, 1]], [[3, 12, 7]], [list(range(13))]])
+    def test_multiproof_validates(self, indices):
+        proof = self.tree.get_multiproof(indices)
+        leaves = [self.leaves[i] for i in indices]
+        self.assertTrue(
+            validate_merkle_multiproof(proof, indices, leaves, self.root, 13)
+        )
+
+    def test_multiproof_shares_hashes(self):
+        indices = [0, 1, 2, 3]
+        # the four leaves of one subtree need only the path above it
+        self.assertEqual(2, len(self.tree.get_multiproof(indices)))
+        self.assertEqual([], self.tree.get_multiproof(range(13)))
+
+    def test_multiproof_rejects_tampering(self):
+        indices = [2, 9]
+        proof = self.tree.get_multiproof(indices)
+        leaves = [self.leaves[2], self.leaves[9]]
+        self.assertFalse(
+            validate_merkle_multiproof(proof, [2, 8], leaves, self.root, 13)
+        )
+        self.assertFalse(
+            validate_merkle_multiproof(proof, indices, leaves[::-1], self.root, 13)
+        )
+        self.assertFalse(
+            validate_merkle_multiproof(proof[:-1], indices, leaves, self.root, 13)
+        )
+        self.assertFalse(
+            validate_merkle_multiproof(
+                proof + [self.root], indices, leaves, self.root, 13
+            )
+        )
+        self.assertFalse(
+            validate_merkle_multiproof(proof, [2, 13], leaves, self.root, 13)
+        )
+
+    def test_multiproof_rejects_bad_indices(self):
+        self.assertIsNone(self.tree.get_multiproof([]))
+        self.assertIsNone(self.tree.get_multiproof([13]))
+        self.assertIsNone(self.tree.get_multiproof([-1]))
+
+
+class TestValidateMerkleProofs(TestCase):
+    def test_batch_matches_single_proofs(self):
+        trees = [build_chunk_merkle_tree(bytes([i]) * 100, 10) for i in range(3)]
+        items = [
+            (tree.get_proof(index), tree.get_leaf(index), tree.get_merkle_root())
+            for tree in trees
+            for index in range(tree.get_leaf_count())
+        ]
+        # a leaf proven against the wrong tree
+        items.append((items[0][0], items[0][1], items[-1][2]))
+
+        results = validate_merkle_proofs(items)
+        self.assertEqual([validate_merkle_proof(*item) for item in items], results)
+        self.assertEqual([True] * (len(items) - 1) + [False], results)
+
+    def test_malformed_items_fail_alone(self):
+        tree = build_chunk_merkle_tree(bytes(40), 10)
+        proof, leaf, root = tree.get_proof(1), tree.get_leaf(1), tree.get_merkle_root()
+        items = [
+            (proof, leaf, root),
+            ([{"up": proof[0]["left"]}] + proof[1:], leaf, root),
+            ([{"left": proof[0]["left"], "right": leaf}] + proof[1:], leaf, root),
+            (proof, "not hex", root),
+        ]
+        self.assertEqual([True, False, False, False], validate_merkle_proofs(items))
+        self.assertFalse(validate_merkle_proof(*items[1]))
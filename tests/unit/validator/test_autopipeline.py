@@ -0,0 +1,81 @@
+import asyncio
+from unittest import IsolatedAsyncioTestCase
+
+from storage.validator.autopipeline import AutoPipelineRedis
+
+
+class FakePipeline:
+    def __init__(self, client):
+        self.client = client
+        self.commands = []
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *args):
+        pass
+
+    def get(self, key):
+        self.commands.append(key)
+
+    async def execute(self, raise_on_error=True):
+        self.client.round_trips += 1
+        return [
+            KeyError(key) if key not in self.client.data else self.client.data[key]
+            for key in self.commands
+        ]
+
+
+class FakeRedis:
+    def __init__(self, data):
+        self.data = data
+        self.round_trips = 0
+
+    async def get(self, key):
+        self.round_trips += 1
+        if key not in self.data:
+            raise KeyError(key)
+        return self.data[key]
+
+    def pipeline(self, transaction=True):
+        return FakePipeline(self)
+
+    def register_script(self, script):
+        return script
+
+
+class TestAutoPipelineRedis(IsolatedAsyncioTestCase):
+    async def test_concurrent_commands_share_one_round_trip(self):
+        client = FakeRedis({f"k{i}": i for i in range(10)})
+        database = AutoPipelineRedis(client)
+
+        results = await asyncio.gather(*[database.get(f"k{i}") for i in range(10)])
+
+        self.assertEqual(list(range(10)), results)
+        self.assertEqual(1, client.round_trips)
+        self.assertEqual(10, database.metrics()["max_batch_size"])
+        self.assertEqual(10, database.metrics()["latency_ms"]["get"]["count"])
+
+    async def test_errors_are_returned_to_their_own_caller(self):
+        client = FakeRedis({"a": 1})
+        database = AutoPipelineRedis(client)
+
+        results = await asyncio.gather(
+            database.get("a"), database.get("missing"), return_exceptions=True
+        )
+
+        self.assertEqual(1, results[0])
+        self.assertIsInstance(results[1], KeyError)
+
+    async def test_single_command_is_sent_directly(self):
+        client = FakeRedis({"a": 1})
+        database = AutoPipelineRedis(client)
+
+        self.assertEqual(1, await database.get("a"))
+        with self.assertRaises(KeyError):
+            await database.get("missing")
+        self.assertEqual(2, database.metrics()["batches"])
+
+    def test_other_attributes_pass_through(self):
+        database = AutoPipelineRedis(FakeRedis({}))
+        self.assertEqual("script", database.register_script("script"))
@@ -0,0 +1,78 @@
+import numpy as np
+from unittest import IsolatedAsyncioTestCase, TestCase
+from unittest.mock import patch
+from parameterized import parameterized
+
+from storage.validator.bonding import (
+    TIERS,
+    StatisticsBuffer,
+    TierCache,
+    assign_tiers,
+    wilson_score_interval,
+    wilson_score_intervals,
+)
+
+
+class TestTierComputation(TestCase):
+    def test_vectorized_wilson_score_matches_scalar(self):
+        successes = np.array([0, 0, 1, 5, 50, 99, 1000])
+        totals = np.array([0, 3, 1, 10, 60, 100, 1000])
+        expected = [wilson_score_interval(s, t) for s, t in zip(successes, totals)]
+        np.testing.assert_allclose(expected, wilson_score_intervals(successes, totals))
+
+    @parameterized.expand(
+        [
+            [0.95, 20000, "Super Saiyan"],
+            [0.95, 6000, "Diamond"],
+            [0.70, 20000, "Gold"],
+            [0.60, 1500, "Silver"],
+            [0.50, 20000, "Bronze"],
+            [0.95, 0, "Bronze"],
+        ]
+    )
+    def test_assign_tiers(self, wilson_score, total_successes, expected):
+        tier_index = assign_tiers(np.array([wilson_score]), np.array([total_successes]))
+        self.assertEqual(expected, TIERS[tier_index[0]][0])
+
+
+class TestStatisticsBuffer(IsolatedAsyncioTestCase):
+    async def test_flush_writes_aggregated_counts_once(self):
+        buffer = StatisticsBuffer()
+        buffer.record("hotkey1", True, "store")
+        buffer.record("hotkey1", False, "store")
+        buffer.record("hotkey1", True, "challenge")
+        buffer.record("hotkey2", False, "retrieve")
+        self.assertEqual(2, len(buffer))
+
+        with patch("storage.validator.bonding.update_statistics_batch") as batch:
+            await buffer.flush(database=None)
+
+        batch.assert_called_once_with(
+            {
+                "hotkey1": {"store": [2, 1], "challenge": [1, 1]},
+                "hotkey2": {"retrieve": [1, 0]},
+            },
+            None,
+        )
+        self.assertEqual(0, len(buffer))
+
+
+class TestTierCache(TestCase):
+    def test_invalidate_single_and_all(self):
+        cache = TierCache()
+        cache.set("hotkey1", "Gold", 100)
+        cache.set("hotkey2", "Silver", 10)
+        self.assertEqual(("Gold", 100), cache.get("hotkey1"))
+
+        cache.invalidate("hotkey1")
+        self.assertIsNone(cache.get("hotkey1"))
+        self.assertEqual(("Silver", 10), cache.get("hotkey2"))
+
+        cache.invalidate()
+        self.assertIsNone(cache.get("hotkey2"))
+
+    def test_entries_expire(self):
+        cache = TierCache(max_age=0)
+        cache.set("hotkey1", "Gold", 100)
+        with patch("storage.validator.bonding.time.monotonic", return_value=1e12):
+            self.assertIsNone(cache.get("hotkey1"))
@@ -0,0 +1,50 @@
+import time
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    ecc_point_to_hex,
+)
+from storage.validator.crs import CRSPool, make_crs
+
+
+class TestCRS(TestCase):
+    @parameterized.expand([[POINT_ENCODING_LEGACY], [POINT_ENCODING_SEC1]])
+    def test_pre_encoded_hex(self, encoding):
+        crs = make_crs()
+        self.assertEqual(
+            (ecc_point_to_hex(crs.g, encoding), ecc_point_to_hex(crs.h, encoding)),
+            crs.hex(encoding),
+        )
+        self.assertEqual("P-256", crs.curve)
+
+
+class TestCRSPool(TestCase):
+    def test_disabled_pool_generates_on_demand(self):
+        pool = CRSPool(depth=0)
+        pool.start()
+        self.assertIsNotNone(pool.get())
+        self.assertEqual(0, pool.qsize())
+        self.assertEqual(0, pool.misses)
+
+    def test_background_refill(self):
+        pool = CRSPool(depth=3)
+        pool.start()
+        try:
+            deadline = time.time() + 10
+            while pool.qsize() < 3 and time.time() < deadline:
+                time.sleep(0.01)
+            self.assertEqual(3, pool.qsize())
+
+            handed_out = [pool.get() for _ in range(3)]
+            self.assertEqual(0, pool.misses)
+            self.assertEqual(3, len({crs.hex() for crs in handed_out}))
+        finally:
+            pool.stop()
+
+    def test_empty_pool_falls_back(self):
+        pool = CRSPool(depth=2)
+        self.assertIsNotNone(pool.get())
+        self.assertEqual(1, pool.misses)
@@ -1,4 +1,5 @@
 from unittest import TestCase
+from unittest.mock import patch
 
 from nacl import pwhash, secret
 
@@ -47,3 +48,37 @@ class TestStoreCommand(TestCase):
 
         self.assertEquals(raw_data, decrypted_data)
         """
+
+
+class TestDerivedKeyCache(TestCase):
+    def setUp(self):
+        from storage.validator.encryption import invalidate_derived_key_cache
+
+        invalidate_derived_key_cache()
+
+    def test_kdf_runs_once_per_password_and_salt(self):
+        from storage.validator import encryption
+
+        key = bytes(range(secret.SecretBox.KEY_SIZE))
+        with patch.object(encryption.pwhash.argon2i, "kdf", return_value=key) as kdf:
+            self.assertEqual(key, encryption.derive_secret_key("whatever"))
+            self.assertEqual(key, encryption.derive_secret_key(b"whatever"))
+            self.assertEqual(1, kdf.call_count)
+
+            encryption.derive_secret_key("whatever", salt=b"\x00" * 16)
+            self.assertEqual(2, kdf.call_count)
+
+            encryption.invalidate_derived_key_cache(private_key="whatever")
+            encryption.derive_secret_key("whatever")
+            self.assertEqual(3, kdf.call_count)
+
+    def test_cached_key_roundtrips_secretbox(self):
+        from storage.validator import encryption
+
+        key = os.urandom(secret.SecretBox.KEY_SIZE)
+        with patch.object(encryption.pwhash.argon2i, "kdf", return_value=key):
+            box_1 = secret.SecretBox(encryption.derive_secret_key("whatever"))
+            box_2 = secret.SecretBox(encryption.derive_secret_key("whatever"))
+
+        raw_data = b"this is so secret, you cannot believe"
+        self.assertEqual(raw_data, box_2.decrypt(box_1.encrypt(raw_data)))
@@ -0,0 +1,92 @@
+from types import SimpleNamespace
+from unittest import TestCase
+
+from storage.protocol import Store
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    ecc_point_to_hex,
+    hex_to_ecc_point,
+)
+from storage.validator.crs import make_crs
+from storage.validator.utils import encode_crs, record_point_encodings
+
+
+def make_validator(point_encoding=POINT_ENCODING_SEC1):
+    return SimpleNamespace(
+        config=SimpleNamespace(neuron=SimpleNamespace(point_encoding=point_encoding)),
+        metagraph=SimpleNamespace(hotkeys=["a", "b", "c"]),
+        point_encodings={},
+    )
+
+
+def make_response(status_code, point_encoding=None):
+    response = Store(encrypted_data="", curve="P-256", g="", h="", seed="")
+    response.dendrite.status_code = status_code
+    if point_encoding is not None:
+        response.point_encoding = point_encoding
+    return response
+
+
+class TestPointEncodingNegotiation(TestCase):
+    def setUp(self):
+        self.crs = make_crs()
+        self.g, self.h = self.crs.g, self.crs.h
+        self.synapse = Store(
+            encrypted_data="",
+            curve="P-256",
+            g=ecc_point_to_hex(self.g),
+            h=ecc_point_to_hex(self.h),
+            seed="",
+        )
+
+    def test_unknown_miners_get_legacy_points(self):
+        validator = make_validator()
+        encode_crs(validator, self.synapse, self.crs, [0, 1])
+
+        self.assertEqual(ecc_point_to_hex(self.g), self.synapse.g)
+        self.assertEqual(POINT_ENCODING_SEC1, self.synapse.point_encoding)
+
+    def test_miners_that_answered_sec1_get_sec1_points(self):
+        validator = make_validator()
+        # b predates the field and answers with its default
+        record_point_encodings(
+            validator,
+            [0, 1, 2],
+            [
+                make_response(200, POINT_ENCODING_SEC1),
+                make_response(200),
+                make_response(200, 7),
+            ],
+        )
+        self.assertEqual(
+            {
+                "a": POINT_ENCODING_SEC1,
+                "b": POINT_ENCODING_LEGACY,
+                "c": POINT_ENCODING_SEC1,
+            },
+            validator.point_encodings,
+        )
+
+        encode_crs(validator, self.synapse, self.crs, [0, 2])
+        self.assertEqual(66, len(self.synapse.g))
+        self.assertEqual(self.h, hex_to_ecc_point(self.synapse.h, "P-256"))
+
+        encode_crs(validator, self.synapse, self.crs, [0, 1])
+        self.assertEqual(ecc_point_to_hex(self.g), self.synapse.g)
+
+    def test_failed_request_forgets_encoding(self):
+        validator = make_validator()
+        record_point_encodings(
+            validator, [0], [make_response(200, POINT_ENCODING_SEC1)]
+        )
+        record_point_encodings(validator, [0], [make_response(500)])
+        self.assertEqual({}, validator.point_encodings)
+
+    def test_config_caps_encoding(self):
+        validator = make_validator(point_encoding=POINT_ENCODING_LEGACY)
+        validator.point_encodings["a"] = POINT_ENCODING_SEC1
+        encode_crs(validator, self.synapse, self.crs, [0])
+
+        self.assertEqual(ecc_point_to_hex(self.g), self.synapse.g)
+        self.assertEqual(POINT_ENCODING_LEGACY, self.synapse.point_encoding)
@@ -0,0 +1,171 @@
+import base64
+from unittest import TestCase
+from parameterized import parameterized
+
+from storage.protocol import Challenge, Store, CHALLENGE_MODE_PRECOMPUTED
+from storage.shared.ecc import (
+    POINT_ENCODING_LEGACY,
+    POINT_ENCODING_SEC1,
+    ECCommitment,
+    ecc_point_to_hex,
+    hash_data,
+    setup_CRS,
+)
+from storage.shared.merkle import MerkleTree, build_chunk_merkle_tree
+from storage.shared.utils import b64_encode
+from storage.validator.verify import (
+    verify_challenge_responses,
+    verify_challenge_with_seed,
+    verify_store_responses,
+)
+
+
+class TestVerifyPrecomputedChallenge(TestCase):
+    def setUp(self):
+        self.data = bytes(range(256)) * 8
+        self.tree = build_chunk_merkle_tree(self.data, 256)
+        self.g, self.h = setup_CRS()
+
+    def respond(
+        self, index, chunk_index=None, seed="seed", encoding=POINT_ENCODING_LEGACY
+    ):
+        chunk_index = index if chunk_index is None else chunk_index
+        chunk = self.data[chunk_index * 256 : (chunk_index + 1) * 256]
+        c, _, r = ECCommitment(self.g, self.h).commit(chunk + seed.encode())
+        return Challenge(
+            challenge_hash="hash",
+            challenge_index=index,
+            chunk_size=256,
+            g=ecc_point_to_hex(self.g),
+            h=ecc_point_to_hex(self.h),
+            curve="P-256",
+            seed=seed,
+            mode=CHALLENGE_MODE_PRECOMPUTED,
+            point_encoding=encoding,
+            commitment=ecc_point_to_hex(c, encoding),
+            data_chunk=base64.b64encode(chunk),
+            randomness=r,
+            merkle_proof=b64_encode(self.tree.get_proof(chunk_index)),
+            merkle_root=self.tree.get_merkle_root(),
+        )
+
+    def verify(self, response, index, seed="seed"):
+        return verify_challenge_with_seed(
+            response,
+            seed,
+            merkle_root=self.tree.get_merkle_root(),
+            leaf_count=self.tree.get_leaf_count(),
+            challenge_index=index,
+        )
+
+    def test_valid_response_without_chained_commitment(self):
+        self.assertTrue(self.verify(self.respond(3), 3))
+
+    def test_valid_sec1_response(self):
+        self.assertTrue(self.verify(self.respond(3, encoding=POINT_ENCODING_SEC1), 3))
+
+    def test_rejects_other_chunk(self):
+        self.assertFalse(self.verify(self.respond(3, chunk_index=4), 3))
+
+    def test_rejects_stale_seed(self):
+        self.assertFalse(self.verify(self.respond(3, seed="old"), 3, seed="new"))
+
+    def test_foreign_root_falls_back_to_full_verification(self):
+        response = self.respond(3)
+        response.merkle_root = "00" * 32
+        # A full challenge needs the chained commitment, which this response lacks
+        self.assertFalse(self.verify(response, 3))
+
+
+class TestVerifyFullChallenge(TestCase):
+    def setUp(self):
+        self.chunks = [bytes([i]) * 64 for i in range(5)]
+        self.g, self.h = setup_CRS()
+
+    def respond(self, index, encoding, seed="seed"):
+        committer = ECCommitment(self.g, self.h)
+        commitments = [committer.commit(chunk + seed.encode()) for chunk in self.chunks]
+        points = [ecc_point_to_hex(c, encoding) for c, _, _ in commitments]
+        tree = MerkleTree()
+        tree.add_leaf(points)
+        tree.make_tree()
+        return Challenge(
+            challenge_hash="hash",
+            challenge_index=index,
+            chunk_size=64,
+            g=ecc_point_to_hex(self.g, encoding),
+            h=ecc_point_to_hex(self.h, encoding),
+            curve="P-256",
+            seed=seed,
+            point_encoding=encoding,
+            commitment_hash=str(hash_data(b"proof" + seed.encode())),
+            commitment_proof="proof",
+            commitment=points[index],
+            data_chunk=base64.b64encode(self.chunks[index]),
+            randomness=commitments[index][2],
+            merkle_proof=b64_encode(tree.get_proof(index)),
+            merkle_root=tree.get_merkle_root(),
+        )
+
+    @parameterized.expand([[POINT_ENCODING_LEGACY], [POINT_ENCODING_SEC1]])
+    def test_valid_response(self, encoding):
+        self.assertTrue(verify_challenge_with_seed(self.respond(2, encoding), "seed"))
+
+    def test_rejects_leaf_in_other_encoding(self):
+        response = self.respond(2, POINT_ENCODING_SEC1)
+        response.point_encoding = POINT_ENCODING_LEGACY
+        self.assertFalse(verify_challenge_with_seed(response, "seed"))
+
+    def test_rejects_unsupported_encoding(self):
+        response = self.respond(2, POINT_ENCODING_SEC1)
+        response.point_encoding = 9
+        self.assertFalse(verify_challenge_with_seed(response, "seed"))
+
+    def test_batch_matches_single_verification(self):
+        responses = [
+            self.respond(i, encoding)
+            for i in range(4)
+            for encoding in (POINT_ENCODING_LEGACY, POINT_ENCODING_SEC1)
+        ]
+        responses[5].randomness += 1
+        responses[6].commitment_proof = "other"
+        expected = [verify_challenge_with_seed(r, "seed") for r in responses]
+
+        self.assertEqual([True] * 5 + [False] * 2 + [True], expected)
+        self.assertEqual(
+            expected,
+            verify_challenge_responses(
+                [{"synapse": response, "seed": "seed"} for response in responses]
+            ),
+        )
+
+
+class TestVerifyStoreResponses(TestCase):
+    def setUp(self):
+        self.data = b"encrypted data"
+        self.g, self.h = setup_CRS()
+
+    def respond(self, seed="seed"):
+        c, m_val, r = ECCommitment(self.g, self.h).commit(self.data + seed.encode())
+        return Store(
+            encrypted_data=base64.b64encode(self.data).decode(),
+            curve="P-256",
+            g=ecc_point_to_hex(self.g),
+            h=ecc_point_to_hex(self.h),
+            seed=seed,
+            commitment=ecc_point_to_hex(c),
+            randomness=r,
+            commitment_hash=str(m_val),
+        )
+
+    def test_verifies_each_response(self):
+        responses = [self.respond() for _ in range(5)]
+        responses[1].randomness += 1
+        responses[3] = self.respond(seed="other")
+
+        self.assertEqual(
+            [True, False, True, False, True],
+            verify_store_responses(
+                responses, base64.b64encode(self.data).decode(), "seed"
+            ),
+        )